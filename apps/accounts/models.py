@@ -3,6 +3,7 @@ Modèles pour l'authentification et les profils utilisateurs
 """
 
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
+from django.contrib.contenttypes.fields import GenericRelation
 from django.core.mail import send_mail
 from django.db import models
 from django.utils import timezone
@@ -137,6 +138,8 @@ class ArtistProfile(models.Model):
     profile_picture = models.ImageField(
         _("Photo de profil"), upload_to="profiles/artists/", blank=True, null=True
     )
+    # Variantes responsive de la photo de profil (générées par le worker)
+    derivatives = GenericRelation("media_files.MediaDerivative")
     city = models.CharField(
         _("Ville"), max_length=100, blank=True, help_text=_("Ville de résidence")
     )
@@ -9,3 +9,6 @@ class ArtistsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.artists"
     verbose_name = "Artistes"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -7,6 +7,7 @@ from django.db.models import Q
 
 from apps.accounts.models import ArtistProfile
 from .models import MusicGenre, ArtistRole, Instrument
+from .services import ArtistSearchService
 
 
 class ArtistSearchForm(forms.Form):
@@ -156,6 +157,7 @@ class ArtistSearchForm(forms.Form):
 
     # Tri des résultats
     SORT_CHOICES = [
+        ("", "Pertinence"),
         ("name", "Nom (A-Z)"),
         ("-name", "Nom (Z-A)"),
         ("-total_reviews", "Plus d'avis"),
@@ -168,7 +170,7 @@ class ArtistSearchForm(forms.Form):
         label="Trier par",
         choices=SORT_CHOICES,
         required=False,
-        initial="-profile_views",
+        initial="",
         widget=forms.Select(
             attrs={
                 "class": "w-full px-4 py-2 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-primary-500 focus:border-transparent",
@@ -190,6 +192,18 @@ class ArtistSearchForm(forms.Form):
             is_active=True
         ).order_by("name")
 
+    def filter_documents(self, documents):
+        """
+        Applique les filtres aux documents de recherche (PostgreSQL, voir
+        ArtistSearchService), tri compris
+        """
+        if not self.is_valid():
+            return ArtistSearchService.order_documents(documents)
+        documents = ArtistSearchService.filter_documents(documents, self.cleaned_data)
+        return ArtistSearchService.order_documents(
+            documents, self.cleaned_data.get("sort_by")
+        )
+
     def filter_queryset(self, queryset):
         """
         Applique les filtres au queryset d'artistes
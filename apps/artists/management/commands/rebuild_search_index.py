@@ -0,0 +1,36 @@
+"""
+Commande Django pour reconstruire les index de recherche des artistes
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.accounts.models import ArtistProfile
+from apps.artists.services import ArtistSearchService, AutocompleteService
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruit les documents de recherche plein texte (PostgreSQL) et "
+        "l'index d'autocomplétion (Redis), scores de popularité compris"
+    )
+
+    def handle(self, *args, **options):
+        if ArtistSearchService.is_enabled():
+            count = ArtistSearchService.update_artists(ArtistProfile.objects.all())
+            self.stdout.write(
+                self.style.SUCCESS(f"{count} documents de recherche recalculés")
+            )
+        else:
+            self.stdout.write(
+                self.style.WARNING("Recherche plein texte ignorée (PostgreSQL requis)")
+            )
+
+        if AutocompleteService.get_client() is not None:
+            count = AutocompleteService.rebuild()
+            self.stdout.write(
+                self.style.SUCCESS(f"Index d'autocomplétion reconstruit ({count} artistes)")
+            )
+        else:
+            self.stdout.write(
+                self.style.WARNING("Autocomplétion ignorée (cache Redis requis)")
+            )
@@ -0,0 +1,131 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:29
+
+import django.contrib.postgres.fields
+from django.contrib.postgres.operations import TrigramExtension, UnaccentExtension
+import django.contrib.postgres.search
+from django.db import migrations, models
+import django.db.models.deletion
+
+# unaccent() n'est pas IMMUTABLE (dictionnaire modifiable) : enveloppe
+# utilisable dans les index d'expression, appelée par ArtistSearchService
+UNACCENT_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION immutable_unaccent(text) RETURNS text AS
+$$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+"""
+
+# Pondération et normalisation identiques à ArtistSearchService
+BACKFILL_SQL = """
+INSERT INTO artists_search_document (
+    artist_id, display_name, search_name, city, region, is_available,
+    rating_average, total_reviews, profile_views, genre_ids, role_ids,
+    instrument_ids, search_vector, created_at, updated_at
+)
+SELECT
+    p.id,
+    COALESCE(NULLIF(p.stage_name, ''), trim(concat_ws(' ', u.first_name, u.last_name))),
+    lower(immutable_unaccent(concat_ws(' ', NULLIF(p.stage_name, ''), NULLIF(u.first_name, ''), NULLIF(u.last_name, '')))),
+    p.city, p.region, p.is_available, p.rating_average, p.total_reviews, p.profile_views,
+    ARRAY(SELECT ag.genre_id FROM artists_artist_genre ag WHERE ag.artist_id = p.id),
+    ARRAY(SELECT ar.role_id FROM artists_artist_role_assignment ar WHERE ar.artist_id = p.id),
+    ARRAY(SELECT ai.instrument_id FROM artists_artist_instrument ai WHERE ai.artist_id = p.id),
+    setweight(to_tsvector('french', concat_ws(' ', p.stage_name, u.first_name, u.last_name)), 'A')
+    || setweight(to_tsvector('french', concat_ws(' ', p.city, p.region)), 'B')
+    || setweight(to_tsvector('french', p.bio), 'C')
+    || setweight(to_tsvector('french', concat_ws(' ',
+        (SELECT string_agg(g.name, ' ') FROM artists_artist_genre ag
+         JOIN artists_music_genre g ON g.id = ag.genre_id WHERE ag.artist_id = p.id),
+        (SELECT string_agg(r.name, ' ') FROM artists_artist_role_assignment ar
+         JOIN artists_artist_role r ON r.id = ar.role_id WHERE ar.artist_id = p.id),
+        (SELECT string_agg(i.name, ' ') FROM artists_artist_instrument ai
+         JOIN artists_instrument i ON i.id = ai.instrument_id WHERE ai.artist_id = p.id)
+    )), 'D'),
+    p.created_at,
+    now()
+FROM accounts_artist_profile AS p
+JOIN accounts_user AS u ON u.id = p.user_id
+ON CONFLICT (artist_id) DO NOTHING
+"""
+
+SEARCH_INDEXES = [
+    ("artists_search_document_genres_gin", "genre_ids"),
+    ("artists_search_document_roles_gin", "role_ids"),
+    ("artists_search_document_instruments_gin", "instrument_ids"),
+    ("artists_search_document_vector_gin", "search_vector"),
+    ("artists_search_document_name_trgm", "search_name gin_trgm_ops"),
+    ("artists_search_document_city_trgm", "(lower(immutable_unaccent(city))) gin_trgm_ops"),
+]
+
+# Données de référence (rapprochement approximatif des genres, rôles et instruments)
+REFERENCE_TRIGRAM_INDEXES = [
+    ("artists_music_genre_name_trgm", "artists_music_genre"),
+    ("artists_artist_role_name_trgm", "artists_artist_role"),
+    ("artists_instrument_name_trgm", "artists_instrument"),
+]
+
+
+def create_search_document(apps, schema_editor):
+    # Tableaux, tsvector et trigrammes : PostgreSQL uniquement (SQLite en
+    # développement, où la recherche interroge directement les profils)
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(UNACCENT_FUNCTION_SQL)
+    for name, expression in SEARCH_INDEXES:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON artists_search_document "
+            f"USING gin ({expression})"
+        )
+    for name, table in REFERENCE_TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON {table} "
+            f"USING gin ((lower(immutable_unaccent(name))) gin_trgm_ops)"
+        )
+    schema_editor.execute(BACKFILL_SQL)
+
+
+def drop_search_document(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _ in SEARCH_INDEXES + REFERENCE_TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+    schema_editor.execute("DROP FUNCTION IF EXISTS immutable_unaccent(text)")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_organizerprofile_address_organizerprofile_bio_and_more'),
+        ('artists', '0001_initial'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        UnaccentExtension(),
+        migrations.CreateModel(
+            name='ArtistSearchDocument',
+            fields=[
+                ('artist', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='accounts.artistprofile', verbose_name='Artiste')),
+                ('display_name', models.CharField(max_length=255, verbose_name='Nom affiché')),
+                ('search_name', models.CharField(blank=True, max_length=255, verbose_name='Nom normalisé')),
+                ('city', models.CharField(blank=True, max_length=100, verbose_name='Ville')),
+                ('region', models.CharField(blank=True, max_length=100, verbose_name='Région')),
+                ('is_available', models.BooleanField(default=True, verbose_name='Disponible')),
+                ('rating_average', models.DecimalField(decimal_places=2, default=0.0, max_digits=3, verbose_name='Note moyenne')),
+                ('total_reviews', models.PositiveIntegerField(default=0, verbose_name="Nombre total d'avis")),
+                ('profile_views', models.PositiveIntegerField(default=0, verbose_name='Vues du profil')),
+                ('genre_ids', django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), blank=True, default=list, size=None, verbose_name='Genres')),
+                ('role_ids', django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), blank=True, default=list, size=None, verbose_name='Rôles')),
+                ('instrument_ids', django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), blank=True, default=list, size=None, verbose_name='Instruments')),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(null=True, verbose_name='Index de recherche')),
+                ('created_at', models.DateTimeField(verbose_name='Inscrit le')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Modifié le')),
+            ],
+            options={
+                'verbose_name': 'Document de recherche',
+                'verbose_name_plural': 'Documents de recherche',
+                'db_table': 'artists_search_document',
+                'indexes': [models.Index(fields=['-rating_average', '-total_reviews'], name='artists_sea_rating__77c737_idx'), models.Index(fields=['-profile_views'], name='artists_sea_profile_386f7d_idx'), models.Index(fields=['created_at'], name='artists_sea_created_b76544_idx'), models.Index(fields=['display_name'], name='artists_sea_display_d28804_idx'), models.Index(fields=['is_available'], name='artists_sea_is_avai_0a2cba_idx')],
+            },
+        ),
+        migrations.RunPython(create_search_document, drop_search_document),
+    ]
@@ -2,6 +2,8 @@
 Modèles pour les données de référence musicales et les relations artistes
 """
 
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
@@ -331,6 +333,67 @@ class ArtistInstrument(models.Model):
         return f"{self.artist.get_display_name()} - {self.instrument.name} ({self.get_proficiency_level_display()})"
 
 
+class ArtistSearchDocument(models.Model):
+    """
+    Modèle de lecture dénormalisé (PostgreSQL) : une ligne par artiste avec
+    tout ce que filtrent, trient et comptent la recherche et les listes, pour
+    interroger une seule table au lieu de joindre profils, utilisateurs et
+    relations. Tenu à jour par ArtistSearchService (signaux et commande
+    rebuild_search_index) ; index GIN créés par la migration
+    """
+
+    artist = models.OneToOneField(
+        "accounts.ArtistProfile",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="search_document",
+        verbose_name=_("Artiste"),
+    )
+    display_name = models.CharField(_("Nom affiché"), max_length=255)
+    # Nom de scène et nom complet sans accents ni majuscules (index trigramme)
+    search_name = models.CharField(_("Nom normalisé"), max_length=255, blank=True)
+    city = models.CharField(_("Ville"), max_length=100, blank=True)
+    region = models.CharField(_("Région"), max_length=100, blank=True)
+    is_available = models.BooleanField(_("Disponible"), default=True)
+    rating_average = models.DecimalField(
+        _("Note moyenne"), max_digits=3, decimal_places=2, default=0.00
+    )
+    total_reviews = models.PositiveIntegerField(_("Nombre total d'avis"), default=0)
+    profile_views = models.PositiveIntegerField(_("Vues du profil"), default=0)
+    genre_ids = ArrayField(
+        models.BigIntegerField(), verbose_name=_("Genres"), default=list, blank=True
+    )
+    role_ids = ArrayField(
+        models.BigIntegerField(), verbose_name=_("Rôles"), default=list, blank=True
+    )
+    instrument_ids = ArrayField(
+        models.BigIntegerField(),
+        verbose_name=_("Instruments"),
+        default=list,
+        blank=True,
+    )
+    # Document plein texte pondéré (noms A, localisation B, bio C, genres,
+    # rôles et instruments D)
+    search_vector = SearchVectorField(_("Index de recherche"), null=True)
+    created_at = models.DateTimeField(_("Inscrit le"))
+    updated_at = models.DateTimeField(_("Modifié le"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Document de recherche")
+        verbose_name_plural = _("Documents de recherche")
+        db_table = "artists_search_document"
+        indexes = [
+            models.Index(fields=["-rating_average", "-total_reviews"]),
+            models.Index(fields=["-profile_views"]),
+            models.Index(fields=["created_at"]),
+            models.Index(fields=["display_name"]),
+            models.Index(fields=["is_available"]),
+        ]
+
+    def __str__(self):
+        return self.display_name
+
+
 class ProfileView(models.Model):
     """
     Tracking des vues de profils d'artistes
@@ -0,0 +1,698 @@
+"""
+Services de recherche d'artistes
+"""
+
+import hashlib
+import json
+import logging
+import unicodedata
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.redis import RedisCache
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramSimilarity,
+    TrigramWordSimilarity,
+)
+from django.db import connection
+from django.db.models import Count, F, Func, Q, TextField, Value
+from django.db.models.functions import Greatest, Lower
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from apps.accounts.models import ArtistProfile
+
+from .models import (
+    ArtistGenre,
+    ArtistInstrument,
+    ArtistRole,
+    ArtistRoleAssignment,
+    ArtistSearchDocument,
+    Instrument,
+    MusicGenre,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ImmutableUnaccent(Func):
+    """unaccent() IMMUTABLE créée par la migration artists 0002 (index trigrammes)"""
+
+    function = "immutable_unaccent"
+    output_field = TextField()
+
+
+class ArtistSearchService:
+    """
+    Recherche et listes d'artistes sur le modèle de lecture dénormalisé
+    ArtistSearchDocument (PostgreSQL) : filtres, tris et comptages sur une
+    seule table (index GIN sur les tableaux d'identifiants, le tsvector et
+    les trigrammes). Recherche plein texte classée par SearchRank, avec repli
+    par similarité de trigrammes (sans accents, tolérant aux fautes) quand
+    elle ne trouve rien. Sur une autre base (SQLite en développement), les
+    vues interrogent directement les profils.
+    """
+
+    # Champs du profil dont la modification se recopie telle quelle
+    COUNTER_FIELDS = {"is_available", "rating_average", "total_reviews", "profile_views"}
+    USER_FIELDS = {"first_name", "last_name"}
+
+    # Tris proposés par ArtistSearchForm -> colonnes du document
+    SORT_FIELDS = {
+        "name": ["display_name"],
+        "-name": ["-display_name"],
+        "-total_reviews": ["-total_reviews"],
+        "-profile_views": ["-profile_views"],
+        "-created_at": ["-created_at"],
+        "created_at": ["created_at"],
+    }
+
+    @staticmethod
+    def is_enabled():
+        return connection.vendor == "postgresql"
+
+    @staticmethod
+    def normalize(expression):
+        """Expression SQL sans accents ni majuscules (identique à celle des index)"""
+        return Lower(ImmutableUnaccent(expression))
+
+    @staticmethod
+    def get_search_vector(artist, tags):
+        """
+        Document pondéré d'un artiste : noms (A), localisation (B),
+        biographie (C), genres, rôles et instruments (D)
+        """
+        config = settings.ARTIST_SEARCH_CONFIG
+        weighted = [
+            (
+                [artist.stage_name, artist.user.first_name, artist.user.last_name],
+                "A",
+            ),
+            ([artist.city, artist.region], "B"),
+            ([artist.bio], "C"),
+            (tags, "D"),
+        ]
+
+        vector = None
+        for values, weight in weighted:
+            part = SearchVector(
+                Value(" ".join(v for v in values if v)), weight=weight, config=config
+            )
+            vector = part if vector is None else vector + part
+        return vector
+
+    @staticmethod
+    def update_artist(artist):
+        """Recalcule le document de recherche d'un artiste"""
+        if not ArtistSearchService.is_enabled():
+            return
+        genres = ArtistGenre.objects.filter(artist=artist).values_list(
+            "genre_id", "genre__name"
+        )
+        roles = ArtistRoleAssignment.objects.filter(artist=artist).values_list(
+            "role_id", "role__name"
+        )
+        instruments = ArtistInstrument.objects.filter(artist=artist).values_list(
+            "instrument_id", "instrument__name"
+        )
+        genres, roles, instruments = list(genres), list(roles), list(instruments)
+        names = [artist.stage_name, artist.user.first_name, artist.user.last_name]
+
+        # save() avec clé primaire fixée : UPDATE, puis INSERT si absent
+        ArtistSearchDocument(
+            artist_id=artist.pk,
+            display_name=artist.get_display_name(),
+            search_name=ArtistSearchService.normalize(
+                Value(" ".join(n for n in names if n))
+            ),
+            city=artist.city,
+            region=artist.region,
+            is_available=artist.is_available,
+            rating_average=artist.rating_average,
+            total_reviews=artist.total_reviews,
+            profile_views=artist.profile_views,
+            genre_ids=[pk for pk, _ in genres],
+            role_ids=[pk for pk, _ in roles],
+            instrument_ids=[pk for pk, _ in instruments],
+            search_vector=ArtistSearchService.get_search_vector(
+                artist, [name for _, name in genres + roles + instruments]
+            ),
+            created_at=artist.created_at,
+        ).save()
+
+    @staticmethod
+    def update_fields(artist, fields):
+        """Recopie des champs simples (compteurs, disponibilité) sans tout recalculer"""
+        if not ArtistSearchService.is_enabled():
+            return
+        updated = ArtistSearchDocument.objects.filter(pk=artist.pk).update(
+            **{field: getattr(artist, field) for field in fields}
+        )
+        if not updated:
+            ArtistSearchService.update_artist(artist)
+
+    @staticmethod
+    def update_artists(queryset):
+        """Recalcule le document de plusieurs artistes (ex. genre renommé)"""
+        if not ArtistSearchService.is_enabled():
+            return 0
+        count = 0
+        artists = queryset.select_related("user")
+        for artist in artists.iterator(chunk_size=500):
+            ArtistSearchService.update_artist(artist)
+            count += 1
+        return count
+
+    @staticmethod
+    def filter_documents(documents, data):
+        """
+        Applique les filtres de ArtistSearchForm (cleaned_data) aux documents,
+        sans jointure ni distinct() : les relations sont des tableaux
+        d'identifiants (opérateur && indexé)
+        """
+        if data.get("search"):
+            documents = ArtistSearchService.search(documents, data["search"])
+        if data.get("region"):
+            documents = documents.filter(region__icontains=data["region"])
+        if data.get("city"):
+            documents = documents.filter(city__icontains=data["city"])
+        for field, key in (
+            ("genre_ids", "genres"),
+            ("role_ids", "roles"),
+            ("instrument_ids", "instruments"),
+        ):
+            if data.get(key):
+                documents = documents.filter(
+                    **{f"{field}__overlap": [obj.pk for obj in data[key]]}
+                )
+        if data.get("is_available"):
+            documents = documents.filter(is_available=True)
+        if data.get("min_rating"):
+            documents = documents.filter(rating_average__gte=float(data["min_rating"]))
+        return documents
+
+    @staticmethod
+    def order_documents(documents, sort_by=None):
+        """Tri demandé, sinon pertinence (recherche) puis note ; pk en départage"""
+        if sort_by in ArtistSearchService.SORT_FIELDS:
+            ordering = list(ArtistSearchService.SORT_FIELDS[sort_by])
+        else:
+            ordering = ["-rating_average", "-total_reviews"]
+            if "search_rank" in documents.query.annotations:
+                ordering.insert(0, "-search_rank")
+        return documents.order_by(*ordering, "pk")
+
+    @staticmethod
+    def hydrate(documents, queryset):
+        """
+        Profils complets (pour l'affichage) d'une page de documents, dans le
+        même ordre : une requête par clé primaire, bornée à la page
+        """
+        documents = list(documents)
+        profiles = queryset.in_bulk([document.pk for document in documents])
+        return [profiles[d.pk] for d in documents if d.pk in profiles]
+
+    @staticmethod
+    def search(documents, text):
+        """
+        Filtre les documents sur `text` et les annote de `search_rank`
+        (syntaxe websearch : guillemets, OR, -exclusion)
+        """
+        query = SearchQuery(
+            text, config=settings.ARTIST_SEARCH_CONFIG, search_type="websearch"
+        )
+        results = documents.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F("search_vector"), query)
+        )
+        if results.exists():
+            return results
+        return ArtistSearchService.fuzzy_search(documents, text)
+
+    @staticmethod
+    def fuzzy_search(documents, text):
+        """
+        Recherche approchée, sans accents : nom (similarité de mots), ville,
+        genres, rôles et instruments (similarité de trigrammes). Tous les
+        critères portent sur la table des documents : PostgreSQL combine
+        leurs index GIN (BitmapOr)
+        """
+        normalize = ArtistSearchService.normalize
+        term = normalize(Value(text))
+
+        def similar(model):
+            return list(
+                model.objects.annotate(search_key=normalize(F("name")))
+                .filter(search_key__trigram_similar=term)
+                .values_list("pk", flat=True)
+            )
+
+        conditions = Q(search_name__trigram_word_similar=term) | Q(
+            city_key__trigram_similar=term
+        )
+        for field, model in (
+            ("genre_ids", MusicGenre),
+            ("role_ids", ArtistRole),
+            ("instrument_ids", Instrument),
+        ):
+            ids = similar(model)
+            if ids:
+                conditions |= Q(**{f"{field}__overlap": ids})
+
+        return (
+            documents.annotate(city_key=normalize(F("city")))
+            .filter(conditions)
+            .annotate(
+                search_rank=Greatest(
+                    TrigramWordSimilarity(term, "search_name"),
+                    TrigramSimilarity("city_key", term),
+                )
+            )
+        )
+
+
+class ArtistFacetService:
+    """
+    Compteurs de la recherche (genres, rôles, instruments, régions, villes,
+    disponibilité, tranches de note) pour l'ensemble de filtres courant.
+
+    Sous PostgreSQL, une seule requête sur les documents filtrés : les
+    résultats sont matérialisés une fois (CTE) puis agrégés par facette
+    (UNION ALL). Ailleurs, quelques requêtes groupées sur les profils.
+    Le résultat est mis en cache par signature normalisée des filtres ; la
+    génération est renouvelée à chaque modification d'un champ compté.
+    """
+
+    GENERATION_KEY = "artist_facets:generation"
+
+    # Champs du profil qui changent les compteurs (voir signals)
+    FIELDS = {"city", "region", "is_available", "rating_average"}
+
+    FACETS_SQL = """
+        WITH results AS MATERIALIZED ({results})
+        SELECT 'total', '', count(*) FROM results
+        UNION ALL
+        SELECT 'genres', value::text, count(*)
+        FROM results, unnest(genre_ids) AS value GROUP BY value
+        UNION ALL
+        SELECT 'roles', value::text, count(*)
+        FROM results, unnest(role_ids) AS value GROUP BY value
+        UNION ALL
+        SELECT 'instruments', value::text, count(*)
+        FROM results, unnest(instrument_ids) AS value GROUP BY value
+        UNION ALL
+        SELECT 'regions', lower(immutable_unaccent(trim(region))) AS value, count(*)
+        FROM results WHERE trim(region) <> '' GROUP BY value
+        UNION ALL
+        SELECT 'cities', lower(immutable_unaccent(trim(city))) AS value, count(*)
+        FROM results WHERE trim(city) <> '' GROUP BY value
+        UNION ALL
+        SELECT 'available', '', count(*) FROM results WHERE is_available
+        UNION ALL
+        SELECT 'ratings', floor(rating_average)::int::text AS value, count(*)
+        FROM results GROUP BY value
+    """
+
+    @staticmethod
+    def normalize(value):
+        """Minuscules, sans accents (clé des régions et villes)"""
+        value = unicodedata.normalize("NFKD", (value or "").strip())
+        return "".join(c for c in value if not unicodedata.combining(c)).lower()
+
+    @staticmethod
+    def get_signature(data):
+        """Filtres de ArtistSearchForm (cleaned_data) hors tri, normalisés"""
+        return {
+            "search": " ".join((data.get("search") or "").lower().split()),
+            "region": data.get("region") or "",
+            "city": data.get("city") or "",
+            "genres": sorted(obj.pk for obj in data.get("genres") or []),
+            "roles": sorted(obj.pk for obj in data.get("roles") or []),
+            "instruments": sorted(obj.pk for obj in data.get("instruments") or []),
+            "is_available": bool(data.get("is_available")),
+            "min_rating": data.get("min_rating") or "",
+        }
+
+    @staticmethod
+    def get_cache_key(data):
+        signature = json.dumps(ArtistFacetService.get_signature(data), sort_keys=True)
+        digest = hashlib.sha1(signature.encode()).hexdigest()
+        generation = cache.get_or_set(
+            ArtistFacetService.GENERATION_KEY, lambda: uuid.uuid4().hex, None
+        )
+        return f"artist_facets:{generation}:{digest}"
+
+    @staticmethod
+    def invalidate():
+        """Périme tous les compteurs en cache (nouvelle génération)"""
+        cache.set(ArtistFacetService.GENERATION_KEY, uuid.uuid4().hex, None)
+
+    @staticmethod
+    def get_facets(results, data, choices):
+        """
+        Compteurs des résultats `results` (documents filtrés sous PostgreSQL,
+        profils filtrés sinon) pour les filtres `data`. `choices` : choix du
+        formulaire (regions, cities, ratings) pour les libellés et les liens.
+        """
+        key = ArtistFacetService.get_cache_key(data)
+        facets = cache.get(key)
+        if facets is None:
+            if ArtistSearchService.is_enabled():
+                counts = ArtistFacetService.count_documents(results)
+            else:
+                counts = ArtistFacetService.count_profiles(results)
+            facets = ArtistFacetService.build(counts, choices)
+            cache.set(key, facets, settings.ARTIST_FACET_TIMEOUT)
+        return facets
+
+    @staticmethod
+    def count_documents(documents):
+        """{facette: Counter(valeur -> nombre)} en une requête (PostgreSQL)"""
+        results = documents.order_by().values(
+            "pk",
+            "genre_ids",
+            "role_ids",
+            "instrument_ids",
+            "region",
+            "city",
+            "is_available",
+            "rating_average",
+        )
+        sql, params = results.query.sql_with_params()
+        counts = {}
+        with connection.cursor() as cursor:
+            cursor.execute(ArtistFacetService.FACETS_SQL.format(results=sql), params)
+            for facet, value, count in cursor.fetchall():
+                counts.setdefault(facet, Counter())[value] = count
+        return counts
+
+    @staticmethod
+    def count_profiles(queryset):
+        """Même résultat que count_documents, sur les profils (SQLite)"""
+        pks = queryset.order_by().values("pk")
+        counts = {facet: Counter() for facet in ("total", "available", "ratings")}
+        counts["regions"], counts["cities"] = Counter(), Counter()
+        rows = ArtistProfile.objects.filter(pk__in=pks).values_list(
+            "region", "city", "is_available", "rating_average"
+        )
+        for region, city, is_available, rating in rows:
+            counts["total"][""] += 1
+            counts["available"][""] += bool(is_available)
+            counts["ratings"][str(int(rating or 0))] += 1
+            for facet, value in (("regions", region), ("cities", city)):
+                if value and value.strip():
+                    counts[facet][ArtistFacetService.normalize(value)] += 1
+
+        for facet, model, field in (
+            ("genres", ArtistGenre, "genre_id"),
+            ("roles", ArtistRoleAssignment, "role_id"),
+            ("instruments", ArtistInstrument, "instrument_id"),
+        ):
+            rows = (
+                model.objects.filter(artist__in=pks)
+                .values_list(field)
+                .annotate(count=Count("artist", distinct=True))
+            )
+            counts[facet] = Counter({str(pk): count for pk, count in rows})
+        return counts
+
+    @staticmethod
+    def build(counts, choices):
+        """Compteurs bruts -> listes triées et libellées pour le gabarit"""
+        limit = settings.ARTIST_FACET_LIMIT
+        facets = {
+            "total": counts.get("total", Counter())[""],
+            "available": counts.get("available", Counter())[""],
+        }
+
+        for facet, model in (
+            ("genres", MusicGenre),
+            ("roles", ArtistRole),
+            ("instruments", Instrument),
+        ):
+            top = counts.get(facet, Counter()).most_common(limit)
+            names = model.objects.in_bulk([int(pk) for pk, _ in top])
+            facets[facet] = [
+                {"value": int(pk), "label": names[int(pk)].name, "count": count}
+                for pk, count in top
+                if int(pk) in names
+            ]
+
+        for facet in ("regions", "cities"):
+            labels = {value: label for value, label in choices[facet] if value}
+            facets[facet] = [
+                {
+                    # Valeur du filtre seulement si le formulaire la propose
+                    "value": value if value in labels else "",
+                    "label": labels.get(value, value.title()),
+                    "count": count,
+                }
+                for value, count in counts.get(facet, Counter()).most_common(limit)
+            ]
+
+        # Tranches cumulées, comme le filtre « N étoiles et plus »
+        ratings = counts.get("ratings", Counter())
+        facets["ratings"] = []
+        for value, label in choices["ratings"]:
+            count = value and sum(c for r, c in ratings.items() if int(r) >= int(value))
+            if count:
+                facets["ratings"].append({"value": value, "label": label, "count": count})
+        return facets
+
+
+class AutocompleteService:
+    """
+    Index d'autocomplétion par préfixe dans le cache Redis : un sorted set
+    par (type, préfixe normalisé), dont les membres sont les réponses JSON
+    précalculées et le score la popularité. Une suggestion = un seul
+    aller-retour Redis, sans requête SQL.
+
+    Types indexés : artistes (nom de scène, nom complet), villes, genres et
+    instruments. Le hash `autocomplete:entries` garde pour chaque entrée son
+    membre et ses clés, pour la retirer avant une mise à jour.
+    """
+
+    KEY_PREFIX = "autocomplete"
+
+    @staticmethod
+    def get_client():
+        """Client redis-py du cache par défaut (None hors Redis, ex. LocMem)"""
+        # `cache` n'est qu'un proxy : le type se vérifie sur le backend
+        backend = caches["default"]
+        if not isinstance(backend, RedisCache):
+            return None
+        return backend._cache.get_client(write=True)
+
+    @staticmethod
+    def normalize(text):
+        """Minuscules, sans accents ni ponctuation, espaces simples"""
+        text = unicodedata.normalize("NFKD", text or "")
+        text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+        return " ".join("".join(c if c.isalnum() else " " for c in text).split())
+
+    @staticmethod
+    def get_prefixes(terms):
+        """Préfixes de chaque terme, depuis chacun de ses mots"""
+        max_length = settings.AUTOCOMPLETE_MAX_PREFIX
+        prefixes = set()
+        for term in terms:
+            words = AutocompleteService.normalize(term).split()
+            for i in range(len(words)):
+                tail = " ".join(words[i:])[:max_length]
+                prefixes.update(
+                    tail[:n] for n in range(1, len(tail) + 1) if tail[n - 1] != " "
+                )
+        return prefixes
+
+    @staticmethod
+    def _key(*parts):
+        return cache.make_key(":".join((AutocompleteService.KEY_PREFIX, *parts)))
+
+    @staticmethod
+    def index(entry_id, kind, terms, payload, score):
+        """Ajoute ou remplace une entrée (ses anciens préfixes sont retirés)"""
+        client = AutocompleteService.get_client()
+        if client is None:
+            return
+        entries_key = AutocompleteService._key("entries")
+        member = json.dumps(payload, separators=(",", ":"))
+        keys = [
+            AutocompleteService._key(kind, prefix)
+            for prefix in AutocompleteService.get_prefixes(terms)
+        ]
+
+        previous = client.hget(entries_key, entry_id)
+        pipe = client.pipeline()
+        if previous:
+            previous = json.loads(previous)
+            for key in previous["keys"]:
+                pipe.zrem(key, previous["member"])
+        for key in keys:
+            pipe.zadd(key, {member: score})
+        pipe.hset(entries_key, entry_id, json.dumps({"member": member, "keys": keys}))
+        pipe.execute()
+
+    @staticmethod
+    def remove(entry_id):
+        client = AutocompleteService.get_client()
+        if client is None:
+            return
+        entries_key = AutocompleteService._key("entries")
+        previous = client.hget(entries_key, entry_id)
+        if not previous:
+            return
+        previous = json.loads(previous)
+        pipe = client.pipeline()
+        for key in previous["keys"]:
+            pipe.zrem(key, previous["member"])
+        pipe.hdel(entries_key, entry_id)
+        pipe.execute()
+
+    @staticmethod
+    def update_score(entry_id, score):
+        """Nouvelle popularité d'une entrée déjà indexée (ZADD XX)"""
+        client = AutocompleteService.get_client()
+        if client is None:
+            return
+        previous = client.hget(AutocompleteService._key("entries"), entry_id)
+        if not previous:
+            return
+        previous = json.loads(previous)
+        pipe = client.pipeline(transaction=False)
+        for key in previous["keys"]:
+            pipe.zadd(key, {previous["member"]: score}, xx=True)
+        pipe.execute()
+
+    @staticmethod
+    def index_artist(artist):
+        user = artist.user
+        AutocompleteService.index(
+            f"artist:{artist.pk}",
+            "artist",
+            [artist.stage_name, user.get_full_name()],
+            {
+                "type": "artist",
+                "id": artist.pk,
+                "name": artist.get_display_name(),
+                "subtitle": ", ".join(v for v in (artist.city, artist.region) if v),
+                "url": reverse("artists:detail", args=[artist.pk]),
+                "avatar": (
+                    artist.profile_picture.url if artist.profile_picture else None
+                ),
+            },
+            artist.profile_views,
+        )
+
+    @staticmethod
+    def index_city(city):
+        """Entrée ville (score : nombre d'artistes), retirée s'il n'en reste aucun"""
+        key = AutocompleteService.normalize(city)
+        if not key:
+            return
+        count = ArtistProfile.objects.filter(city__iexact=city.strip()).count()
+        if not count:
+            AutocompleteService.remove(f"city:{key}")
+            return
+        AutocompleteService.index(
+            f"city:{key}",
+            "city",
+            [city],
+            {
+                "type": "city",
+                "name": city.strip(),
+                "subtitle": f"{count} artiste{'s' if count > 1 else ''}",
+                "url": f"{reverse('artists:search')}?{urlencode({'search': city.strip()})}",
+            },
+            count,
+        )
+
+    @staticmethod
+    def _index_reference(obj, kind, param, count):
+        """Genre ou instrument actif, retiré s'il n'a (plus) aucun artiste"""
+        if not obj.is_active or not count:
+            AutocompleteService.remove(f"{kind}:{obj.pk}")
+            return
+        AutocompleteService.index(
+            f"{kind}:{obj.pk}",
+            kind,
+            [obj.name],
+            {
+                "type": kind,
+                "id": obj.pk,
+                "name": obj.name,
+                "subtitle": f"{count} artiste{'s' if count > 1 else ''}",
+                "url": f"{reverse('artists:search')}?{urlencode({param: obj.pk})}",
+            },
+            count,
+        )
+
+    @staticmethod
+    def index_genre(genre):
+        AutocompleteService._index_reference(
+            genre, "genre", "genres", genre.artists.count()
+        )
+
+    @staticmethod
+    def index_instrument(instrument):
+        AutocompleteService._index_reference(
+            instrument, "instrument", "instruments", instrument.artists.count()
+        )
+
+    @staticmethod
+    def rebuild():
+        """Reconstruit tout l'index (commande rebuild_search_index)"""
+        client = AutocompleteService.get_client()
+        if client is None:
+            return 0
+        for key in client.scan_iter(match=AutocompleteService._key("*"), count=1000):
+            client.delete(key)
+
+        count = 0
+        for artist in ArtistProfile.objects.select_related("user").iterator(
+            chunk_size=500
+        ):
+            AutocompleteService.index_artist(artist)
+            count += 1
+        cities = (
+            ArtistProfile.objects.exclude(city="")
+            .values_list("city", flat=True)
+            .distinct()
+        )
+        for city in cities:
+            AutocompleteService.index_city(city)
+        for genre in MusicGenre.objects.annotate(artist_count=Count("artists")):
+            AutocompleteService._index_reference(
+                genre, "genre", "genres", genre.artist_count
+            )
+        for instrument in Instrument.objects.annotate(artist_count=Count("artists")):
+            AutocompleteService._index_reference(
+                instrument, "instrument", "instruments", instrument.artist_count
+            )
+        return count
+
+    @staticmethod
+    def suggest(query):
+        """
+        Suggestions pour `query` (les plus populaires de chaque type, voir
+        AUTOCOMPLETE_LIMITS). None si l'index Redis n'est pas disponible
+        """
+        client = AutocompleteService.get_client()
+        if client is None:
+            return None
+        prefix = AutocompleteService.normalize(query)[: settings.AUTOCOMPLETE_MAX_PREFIX]
+        if not prefix:
+            return []
+
+        limits = settings.AUTOCOMPLETE_LIMITS
+        pipe = client.pipeline(transaction=False)
+        for kind, limit in limits.items():
+            pipe.zrevrange(AutocompleteService._key(kind, prefix), 0, limit - 1)
+        return [
+            json.loads(member)
+            for members in pipe.execute()
+            for member in members
+        ]
@@ -0,0 +1,237 @@
+"""
+Signaux de l'application artists
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.accounts.models import ArtistProfile, User
+
+from .models import (
+    ArtistGenre,
+    ArtistInstrument,
+    ArtistRole,
+    ArtistRoleAssignment,
+    Instrument,
+    MusicGenre,
+)
+from .services import ArtistFacetService, ArtistSearchService, AutocompleteService
+
+# Champs du profil repris dans la suggestion d'autocomplétion
+AUTOCOMPLETE_FIELDS = {"stage_name", "city", "region", "profile_picture"}
+
+
+def _touches(update_fields, fields):
+    return update_fields is None or bool(set(update_fields) & fields)
+
+
+@receiver(post_save, sender=ArtistProfile)
+def update_profile_search_vector(sender, instance, update_fields=None, **kwargs):
+    """Tient à jour le document de recherche de l'artiste"""
+    # Compteurs (vues, notes) enregistrés avec update_fields : simple recopie
+    if update_fields and set(update_fields) <= ArtistSearchService.COUNTER_FIELDS:
+        ArtistSearchService.update_fields(instance, update_fields)
+    else:
+        ArtistSearchService.update_artist(instance)
+
+
+@receiver(post_save, sender=User)
+def update_user_search_vector(sender, instance, update_fields=None, **kwargs):
+    """Prénom et nom font partie du document de l'artiste"""
+    if not _touches(update_fields, ArtistSearchService.USER_FIELDS):
+        return
+    ArtistSearchService.update_artists(ArtistProfile.objects.filter(user=instance))
+
+
+@receiver(post_save, sender=ArtistGenre)
+@receiver(post_save, sender=ArtistRoleAssignment)
+@receiver(post_save, sender=ArtistInstrument)
+def update_assignment_search_vector(sender, instance, **kwargs):
+    """Ajout d'un genre, rôle ou instrument"""
+    ArtistSearchService.update_artists(
+        ArtistProfile.objects.filter(pk=instance.artist_id)
+    )
+
+
+@receiver(post_delete, sender=ArtistGenre)
+@receiver(post_delete, sender=ArtistRoleAssignment)
+@receiver(post_delete, sender=ArtistInstrument)
+def remove_assignment_search_vector(sender, instance, **kwargs):
+    """
+    Retrait d'un genre, rôle ou instrument. Recalcul après le commit : lors
+    de la suppression en cascade d'un profil, celui-ci existe encore ici
+    (supprimé après ses attributions) et son document serait recréé
+    """
+    artists = ArtistProfile.objects.filter(pk=instance.artist_id)
+    transaction.on_commit(lambda: ArtistSearchService.update_artists(artists))
+
+
+# Relation ArtistProfile -> donnée de référence, pour retrouver les artistes
+REFERENCE_LOOKUPS = {
+    MusicGenre: "genres__genre",
+    ArtistRole: "roles__role",
+    Instrument: "instruments__instrument",
+}
+
+
+@receiver(pre_save, sender=MusicGenre)
+@receiver(pre_save, sender=ArtistRole)
+@receiver(pre_save, sender=Instrument)
+def detect_reference_rename(sender, instance, **kwargs):
+    """Repère un changement de nom avant l'enregistrement"""
+    previous = (
+        sender.objects.filter(pk=instance.pk).values_list("name", flat=True).first()
+        if instance.pk
+        else None
+    )
+    instance._name_changed = previous is not None and previous != instance.name
+
+
+@receiver(post_save, sender=MusicGenre)
+@receiver(post_save, sender=ArtistRole)
+@receiver(post_save, sender=Instrument)
+def update_reference_search_vector(sender, instance, **kwargs):
+    """Un genre, rôle ou instrument renommé change le document de ses artistes"""
+    if not getattr(instance, "_name_changed", False):
+        return
+    ArtistSearchService.update_artists(
+        ArtistProfile.objects.filter(**{REFERENCE_LOOKUPS[sender]: instance})
+    )
+
+
+# Compteurs de la recherche : nouvelle génération après le commit
+
+
+@receiver(post_save, sender=ArtistProfile)
+def invalidate_profile_facets(sender, instance, update_fields=None, **kwargs):
+    # Les vues du profil (les plus fréquentes) ne changent aucun compteur
+    if _touches(update_fields, ArtistFacetService.FIELDS):
+        transaction.on_commit(ArtistFacetService.invalidate)
+
+
+@receiver(post_delete, sender=ArtistProfile)
+@receiver(post_save, sender=ArtistGenre)
+@receiver(post_delete, sender=ArtistGenre)
+@receiver(post_save, sender=ArtistRoleAssignment)
+@receiver(post_delete, sender=ArtistRoleAssignment)
+@receiver(post_save, sender=ArtistInstrument)
+@receiver(post_delete, sender=ArtistInstrument)
+@receiver(post_save, sender=MusicGenre)
+@receiver(post_delete, sender=MusicGenre)
+@receiver(post_save, sender=ArtistRole)
+@receiver(post_delete, sender=ArtistRole)
+@receiver(post_save, sender=Instrument)
+@receiver(post_delete, sender=Instrument)
+def invalidate_facets(sender, **kwargs):
+    """Attributions et libellés (genres, rôles, instruments) comptés"""
+    transaction.on_commit(ArtistFacetService.invalidate)
+
+
+# Autocomplétion (Redis) : mise à jour après le commit de la transaction
+
+
+@receiver(pre_save, sender=ArtistProfile)
+def detect_city_change(sender, instance, update_fields=None, **kwargs):
+    """Mémorise l'ancienne ville (son nombre d'artistes change aussi)"""
+    if not _touches(update_fields, {"city"}):
+        instance._previous_city = None
+        return
+    instance._previous_city = (
+        ArtistProfile.objects.filter(pk=instance.pk)
+        .values_list("city", flat=True)
+        .first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=ArtistProfile)
+def update_profile_autocomplete(sender, instance, update_fields=None, **kwargs):
+    if not _touches(update_fields, AUTOCOMPLETE_FIELDS):
+        # Vue du profil : seul le score (popularité) de l'entrée change
+        if _touches(update_fields, {"profile_views"}):
+            entry_id, score = f"artist:{instance.pk}", instance.profile_views
+            transaction.on_commit(
+                lambda: AutocompleteService.update_score(entry_id, score)
+            )
+        return
+
+    def update():
+        AutocompleteService.index_artist(instance)
+        AutocompleteService.index_city(instance.city)
+        previous = getattr(instance, "_previous_city", None)
+        if previous and previous != instance.city:
+            AutocompleteService.index_city(previous)
+
+    transaction.on_commit(update)
+
+
+@receiver(post_delete, sender=ArtistProfile)
+def remove_profile_autocomplete(sender, instance, **kwargs):
+    # La clé primaire est remise à None après la suppression
+    entry_id, city = f"artist:{instance.pk}", instance.city
+
+    def update():
+        AutocompleteService.remove(entry_id)
+        AutocompleteService.index_city(city)
+
+    transaction.on_commit(update)
+
+
+@receiver(post_save, sender=User)
+def update_user_autocomplete(sender, instance, update_fields=None, **kwargs):
+    if not _touches(update_fields, ArtistSearchService.USER_FIELDS):
+        return
+    artist = ArtistProfile.objects.filter(user=instance).first()
+    if artist:
+        transaction.on_commit(lambda: AutocompleteService.index_artist(artist))
+
+
+@receiver(post_save, sender=ArtistGenre)
+@receiver(post_delete, sender=ArtistGenre)
+def update_genre_autocomplete(sender, instance, **kwargs):
+    """Le nombre d'artistes du genre (score) a changé"""
+    genre_id = instance.genre_id
+
+    def update():
+        genre = MusicGenre.objects.filter(pk=genre_id).first()
+        if genre:
+            AutocompleteService.index_genre(genre)
+
+    transaction.on_commit(update)
+
+
+@receiver(post_save, sender=ArtistInstrument)
+@receiver(post_delete, sender=ArtistInstrument)
+def update_instrument_autocomplete(sender, instance, **kwargs):
+    instrument_id = instance.instrument_id
+
+    def update():
+        instrument = Instrument.objects.filter(pk=instrument_id).first()
+        if instrument:
+            AutocompleteService.index_instrument(instrument)
+
+    transaction.on_commit(update)
+
+
+@receiver(post_save, sender=MusicGenre)
+def update_reference_genre_autocomplete(sender, instance, created=False, **kwargs):
+    if not created:
+        transaction.on_commit(lambda: AutocompleteService.index_genre(instance))
+
+
+@receiver(post_save, sender=Instrument)
+def update_reference_instrument_autocomplete(
+    sender, instance, created=False, **kwargs
+):
+    if not created:
+        transaction.on_commit(lambda: AutocompleteService.index_instrument(instance))
+
+
+@receiver(post_delete, sender=MusicGenre)
+@receiver(post_delete, sender=Instrument)
+def remove_reference_autocomplete(sender, instance, **kwargs):
+    kind = "genre" if sender is MusicGenre else "instrument"
+    entry_id = f"{kind}:{instance.pk}"
+    transaction.on_commit(lambda: AutocompleteService.remove(entry_id))
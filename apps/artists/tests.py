@@ -1,3 +1,334 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import redis
+from django.core.cache import cache, caches
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.db.models import Value
+from django.test import TestCase, override_settings
+
+from apps.accounts.models import ArtistProfile, User
+from apps.media_files.models import MediaDerivative, VideoFile
+
+from .forms import ArtistSearchForm
+from .models import (
+    ArtistGenre,
+    ArtistInstrument,
+    ArtistRole,
+    ArtistRoleAssignment,
+    ArtistSearchDocument,
+    Instrument,
+    MusicGenre,
+)
+from .services import ArtistFacetService, ArtistSearchService, AutocompleteService
+
+# Base Redis dédiée aux tests (vidée par chaque test qui l'utilise)
+TEST_REDIS_URL = os.environ.get("TEST_REDIS_URL", "redis://127.0.0.1:6379/15")
+REDIS_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": TEST_REDIS_URL,
+        "KEY_PREFIX": "tests",
+    }
+}
+
+
+def redis_available():
+    try:
+        return redis.Redis.from_url(TEST_REDIS_URL, socket_timeout=1).ping()
+    except redis.RedisError:
+        return False
+
+
+def make_artist(email, **kwargs):
+    user = User.objects.create_user(
+        email=email,
+        password="motdepasse123",
+        first_name=kwargs.pop("first_name", "Jean"),
+        last_name=kwargs.pop("last_name", "Dupont"),
+        user_type="artist",
+    )
+    return ArtistProfile.objects.create(user=user, **kwargs)
+
+
+class ArtistDetailHlsTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.artist = make_artist("pp@example.com", stage_name="Petit Pays")
+        self.video = VideoFile.objects.create(
+            artist=self.artist, title="Live", file=ContentFile(b"mp4", name="live.mp4")
+        )
+
+    def get_page(self):
+        response = self.client.get(f"/artists/{self.artist.pk}/")
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_no_player_without_hls(self):
+        self.assertNotIn("hls.min.js", self.get_page())
+
+    def test_pinned_player_with_hls(self):
+        MediaDerivative.objects.create(
+            content_object=self.video,
+            kind="hls",
+            file="media/video/hls/2026/10/1/master.m3u8",
+        )
+        page = self.get_page()
+        self.assertIn("hls.js@1.5.17/dist/hls.min.js", page)
+        playlist = "/media/media/video/hls/2026/10/1/master.m3u8"
+        self.assertIn(f'data-hls-src="{playlist}"', page)
+
+
+class AutocompleteClientTests(TestCase):
+    def test_no_client_without_redis(self):
+        self.assertIsNone(AutocompleteService.get_client())
+        self.assertIsNone(AutocompleteService.suggest("pet"))
+
+    @override_settings(CACHES=REDIS_CACHES)
+    def test_client_from_redis_backend(self):
+        # `cache` est un proxy : le backend Redis doit tout de même être reconnu
+        self.assertIsInstance(AutocompleteService.get_client(), redis.Redis)
+
+
+@skipUnless(redis_available(), f"Redis indisponible ({TEST_REDIS_URL})")
+@override_settings(CACHES=REDIS_CACHES)
+class AutocompleteRedisTests(TestCase):
+    def setUp(self):
+        caches["default"].clear()
+        self.addCleanup(caches["default"].clear)
+
+    def test_suggest_indexed_artists(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            make_artist("pp@example.com", stage_name="Petit Pays", city="Douala")
+            make_artist("pe@example.com", stage_name="Petrolia", city="Yaoundé")
+
+        names = [
+            r["name"] for r in AutocompleteService.suggest("pet") if r["type"] == "artist"
+        ]
+        self.assertCountEqual(names, ["Petit Pays", "Petrolia"])
+        cities = [r["name"] for r in AutocompleteService.suggest("yaou")]
+        self.assertEqual(cities, ["Yaoundé"])
+
+    def test_quick_search_without_sql(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            make_artist("pp@example.com", stage_name="Petit Pays")
+
+        with self.assertNumQueries(0):
+            response = self.client.get("/artists/api/quick-search/", {"q": "petit"})
+        self.assertEqual(response.json()["results"][0]["name"], "Petit Pays")
+
+    def test_profile_views_update_score(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first = make_artist("a@example.com", stage_name="Makossa Star")
+            second = make_artist(
+                "b@example.com", stage_name="Makossa King", profile_views=5
+            )
+        self.assertEqual(AutocompleteService.suggest("makossa")[0]["id"], second.pk)
+
+        first.profile_views = 10
+        with self.captureOnCommitCallbacks(execute=True):
+            first.save(update_fields=["profile_views"])
+        self.assertEqual(AutocompleteService.suggest("makossa")[0]["id"], first.pk)
+
+    def test_removed_artist(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            artist = make_artist("pp@example.com", stage_name="Petit Pays")
+        with self.captureOnCommitCallbacks(execute=True):
+            artist.delete()
+        self.assertEqual(AutocompleteService.suggest("petit"), [])
+
+    def test_score_update_does_not_revive_removed_artist(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            artist = make_artist("pp@example.com", stage_name="Petit Pays")
+        entry_id = f"artist:{artist.pk}"
+        client = AutocompleteService.get_client()
+        entry = client.hget(AutocompleteService._key("entries"), entry_id)
+        AutocompleteService.remove(entry_id)
+
+        # Entrée lue juste avant une suppression concurrente : ZADD XX ne
+        # réinsère pas les préfixes retirés
+        with mock.patch.object(
+            AutocompleteService, "get_client", return_value=client
+        ), mock.patch.object(client, "hget", return_value=entry):
+            AutocompleteService.update_score(entry_id, 50)
+        self.assertEqual(AutocompleteService.suggest("petit"), [])
+
+
+class ArtistFacetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.makossa = MusicGenre.objects.create(name="Makossa")
+        self.bikutsi = MusicGenre.objects.create(name="Bikutsi")
+
+        first = make_artist(
+            "a@example.com", region="Littoral", city="Douala", rating_average=4.5
+        )
+        second = make_artist(
+            "b@example.com",
+            region=" littoral",
+            city="douala",
+            rating_average=3.2,
+            is_available=False,
+        )
+        self.third = make_artist(
+            "c@example.com", region="Centre", city="Yaoundé", rating_average=0
+        )
+        for artist, genre in (
+            (first, self.makossa),
+            (second, self.makossa),
+            (second, self.bikutsi),
+            (self.third, self.bikutsi),
+        ):
+            ArtistGenre.objects.create(artist=artist, genre=genre)
+
+    def get_facets(self, **params):
+        response = self.client.get("/artists/search/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.context["facets"]
+
+    def counts(self, entries):
+        return {entry["label"]: entry["count"] for entry in entries}
+
+    def test_counts(self):
+        facets = self.get_facets()
+
+        self.assertEqual(facets["total"], 3)
+        self.assertEqual(facets["available"], 2)
+        self.assertEqual(self.counts(facets["genres"]), {"Makossa": 2, "Bikutsi": 2})
+        # Régions et villes regroupées sans casse, espaces ni accents
+        self.assertEqual(self.counts(facets["regions"]), {"Littoral": 2, "Centre": 1})
+        self.assertEqual(self.counts(facets["cities"]), {"Douala": 2, "Yaoundé": 1})
+        # Tranches cumulées « N étoiles et plus »
+        self.assertEqual(
+            self.counts(facets["ratings"]),
+            {
+                "4 étoiles et plus": 1,
+                "3 étoiles et plus": 2,
+                "2 étoiles et plus": 2,
+                "1 étoile et plus": 2,
+            },
+        )
+
+    def test_counts_follow_filters(self):
+        facets = self.get_facets(genres=self.bikutsi.pk)
+
+        self.assertEqual(facets["total"], 2)
+        self.assertEqual(facets["available"], 1)
+        self.assertEqual(self.counts(facets["genres"]), {"Bikutsi": 2, "Makossa": 1})
+
+    def test_profile_change_invalidates(self):
+        self.get_facets()
+
+        self.third.city = "Douala"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.third.save()
+        self.assertEqual(self.counts(self.get_facets()["cities"]), {"Douala": 3})
+
+    def test_profile_views_keep_cache(self):
+        self.get_facets()
+        generation = cache.get(ArtistFacetService.GENERATION_KEY)
+
+        self.third.profile_views = 10
+        with self.captureOnCommitCallbacks(execute=True):
+            self.third.save(update_fields=["profile_views"])
+        self.assertEqual(cache.get(ArtistFacetService.GENERATION_KEY), generation)
+
+
+class ArtistSearchOrderTests(TestCase):
+    def ordering(self, documents, sort_by=None):
+        return ArtistSearchService.order_documents(documents, sort_by).query.order_by
+
+    def test_default_order(self):
+        self.assertEqual(
+            self.ordering(ArtistSearchDocument.objects.all()),
+            ("-rating_average", "-total_reviews", "pk"),
+        )
+
+    def test_relevance_first(self):
+        documents = ArtistSearchDocument.objects.annotate(search_rank=Value(1.0))
+        self.assertEqual(
+            self.ordering(documents),
+            ("-search_rank", "-rating_average", "-total_reviews", "pk"),
+        )
+
+    def test_requested_sort_replaces_relevance(self):
+        documents = ArtistSearchDocument.objects.annotate(search_rank=Value(1.0))
+        self.assertEqual(
+            self.ordering(documents, "-profile_views"), ("-profile_views", "pk")
+        )
+
+
+@skipUnless(connection.vendor == "postgresql", "Recherche plein texte PostgreSQL")
+class ArtistSearchRankingTests(TestCase):
+    def setUp(self):
+        # Meilleure note pour l'artiste qui ne cite le terme que dans sa bio
+        self.name_match = make_artist(
+            "a@example.com", stage_name="Makossa King", city="Douala", rating_average=1
+        )
+        self.bio_match = make_artist(
+            "b@example.com",
+            stage_name="Petit Pays",
+            bio="Grand amateur de makossa",
+            city="Yaoundé",
+            rating_average=5,
+        )
+        make_artist("c@example.com", stage_name="Coco Argentée", rating_average=4)
+
+    def search(self, text):
+        form = ArtistSearchForm({"search": text})
+        documents = form.filter_documents(ArtistSearchDocument.objects.all())
+        return list(documents.values_list("pk", flat=True))
+
+    def test_name_outranks_bio(self):
+        self.assertEqual(
+            self.search("makossa"), [self.name_match.pk, self.bio_match.pk]
+        )
+
+    def test_typo_tolerant_fallback(self):
+        self.assertEqual(self.search("Makosa")[0], self.name_match.pk)
+
+    def test_accent_insensitive_city(self):
+        self.assertEqual(self.search("yaounde"), [self.bio_match.pk])
+
+    def test_document_follows_profile(self):
+        self.bio_match.stage_name = "Makossa Queen"
+        self.bio_match.save()
+        self.assertEqual(self.search("queen"), [self.bio_match.pk])
+
+
+@skipUnless(connection.vendor == "postgresql", "Document de recherche PostgreSQL")
+class ArtistSearchDocumentTests(TestCase):
+    def setUp(self):
+        self.artist = make_artist("a@example.com", stage_name="Makossa King")
+        ArtistGenre.objects.create(
+            artist=self.artist, genre=MusicGenre.objects.create(name="Makossa")
+        )
+        ArtistRoleAssignment.objects.create(
+            artist=self.artist, role=ArtistRole.objects.create(name="Chanteur")
+        )
+        ArtistInstrument.objects.create(
+            artist=self.artist, instrument=Instrument.objects.create(name="Guitare")
+        )
+
+    def test_assignment_removed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ArtistGenre.objects.filter(artist=self.artist).delete()
+        document = ArtistSearchDocument.objects.get(artist=self.artist)
+        self.assertEqual(document.genre_ids, [])
+        self.assertEqual(len(document.role_ids), 1)
+
+    def test_delete_populated_artist(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.artist.user.delete()
+
+        self.assertFalse(ArtistSearchDocument.objects.exists())
+        # Clés étrangères différées : aucun document orphelin recréé
+        connection.check_constraints()
@@ -7,21 +7,24 @@ from django.views.generic import ListView, DetailView, TemplateView
 from django.http import JsonResponse, HttpResponseRedirect
 from django.urls import reverse
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-from django.db.models import Q, Count, Avg
+from django.db.models import Q, Count, Avg, Prefetch
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
 from django.contrib import messages
 
 from apps.accounts.models import ArtistProfile
+from apps.media_files.models import AudioFile
 from .models import (
     MusicGenre,
     ArtistRole,
+    ArtistSearchDocument,
     Instrument,
     ProfileView,
     WhatsAppClick,
     SearchQuery,
 )
 from .forms import ArtistSearchForm, QuickSearchForm
+from .services import ArtistFacetService, ArtistSearchService, AutocompleteService
 
 
 class ArtistListView(ListView):
@@ -33,20 +36,50 @@ class ArtistListView(ListView):
     paginate_by = 12
 
     def get_queryset(self):
-        """Récupère tous les artistes triés par note"""
-        return (
-            ArtistProfile.objects.select_related("user")
-            .prefetch_related("genres", "roles", "instruments")
-            .order_by("-rating_average", "-total_reviews")
+        """
+        Récupère tous les artistes triés par note (documents de recherche
+        sous PostgreSQL : tri et comptage sur une seule table)
+        """
+        if ArtistSearchService.is_enabled():
+            # Seule la clé primaire sert (profils rechargés pour la page)
+            return ArtistSearchService.order_documents(
+                ArtistSearchDocument.objects.only("pk")
+            )
+        return self.get_artist_queryset().order_by("-rating_average", "-total_reviews")
+
+    def get_artist_queryset(self):
+        """Profils avec ce qu'affichent les cartes"""
+        return ArtistProfile.objects.select_related("user").prefetch_related(
+            "genres",
+            "roles",
+            "instruments",
+            "derivatives",
+            # Premier extrait audio de chaque carte
+            Prefetch(
+                "audio_files",
+                queryset=AudioFile.objects.filter(is_active=True)
+                .order_by("order", "-upload_date")
+                .prefetch_related("derivatives"),
+                to_attr="active_audio_files",
+            ),
         )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        if ArtistSearchService.is_enabled():
+            # Page de documents -> profils complets pour l'affichage
+            context["artists"] = ArtistSearchService.hydrate(
+                context["object_list"], self.get_artist_queryset()
+            )
         context.update(
             {
                 "page_title": "Tous les artistes",
                 "page_description": "Découvrez tous les talents musicaux camerounais sur TalentZik",
-                "total_artists": self.get_queryset().count(),
+                "total_artists": (
+                    context["paginator"].count
+                    if context["paginator"]
+                    else len(context["object_list"])
+                ),
             }
         )
         return context
@@ -74,32 +107,23 @@ class ArtistSearchView(TemplateView):
 
         # Récupérer tous les artistes de base
         queryset = ArtistProfile.objects.select_related("user").prefetch_related(
-            "genres", "roles", "instruments"
+            "genres", "roles", "instruments", "derivatives"
         )
 
-        # Appliquer les filtres si le formulaire est valide
-        if form.is_valid():
-            queryset = form.filter_queryset(queryset)
-
-            # Enregistrer la recherche pour les statistiques
-            search_query = form.cleaned_data.get("search")
-            if search_query:
-                SearchQuery.objects.create(
-                    query=search_query,
-                    user=(
-                        self.request.user
-                        if self.request.user.is_authenticated
-                        else None
-                    ),
-                    user_ip=self.get_client_ip(),
-                    results_count=queryset.count(),
-                )
-
-        # Assurer un ordering cohérent pour la pagination
-        queryset = queryset.order_by("-rating_average", "-total_reviews", "id")
+        if ArtistSearchService.is_enabled():
+            # Filtres, tri et comptage sur les documents de recherche (une
+            # seule table), puis profils complets de la seule page affichée
+            results = form.filter_documents(ArtistSearchDocument.objects.only("pk"))
+        else:
+            results = queryset
+            # Appliquer les filtres si le formulaire est valide
+            if form.is_valid():
+                results = form.filter_queryset(results)
+            # Assurer un ordering cohérent pour la pagination
+            results = results.order_by("-rating_average", "-total_reviews", "id")
 
         # Pagination
-        paginator = Paginator(queryset, 12)  # 12 artistes par page
+        paginator = Paginator(results, 12)  # 12 artistes par page
         page = self.request.GET.get("page")
 
         try:
@@ -109,31 +133,55 @@ class ArtistSearchView(TemplateView):
         except EmptyPage:
             artists = paginator.page(paginator.num_pages)
 
-        # Statistiques pour la sidebar
-        stats = {
-            "total_artists": ArtistProfile.objects.count(),
-            "available_artists": ArtistProfile.objects.filter(
-                is_available=True
-            ).count(),
-            "top_genres": MusicGenre.objects.annotate(artist_count=Count("artists"))
-            .filter(artist_count__gt=0)
-            .order_by("-artist_count")[:5],
-            "regions_count": ArtistProfile.objects.values("region")
-            .annotate(count=Count("id"))
-            .order_by("-count")[:5],
-        }
+        if ArtistSearchService.is_enabled():
+            artists.object_list = ArtistSearchService.hydrate(
+                artists.object_list, queryset
+            )
+
+        # Enregistrer la recherche pour les statistiques
+        if form.is_valid() and form.cleaned_data.get("search"):
+            SearchQuery.objects.create(
+                query=form.cleaned_data["search"],
+                user=(self.request.user if self.request.user.is_authenticated else None),
+                user_ip=self.get_client_ip(),
+                results_count=paginator.count,
+            )
+
+        # Compteurs de la sidebar pour les filtres courants (en cache)
+        facets = ArtistFacetService.get_facets(
+            results,
+            form.cleaned_data if form.is_valid() else {},
+            {
+                "regions": form.CAMEROON_REGIONS,
+                "cities": form.MAJOR_CITIES,
+                "ratings": form.RATING_CHOICES,
+            },
+        )
+
+        # Paramètres courants, pour les liens qui ajoutent un filtre
+        params = self.request.GET.copy()
+        params.pop("page", None)
 
         context.update(
             {
                 "form": form,
                 "artists": artists,
-                "stats": stats,
+                "facets": facets,
+                "facet_groups": [
+                    ("Genres", "fa-music", "genres", facets["genres"]),
+                    ("Rôles", "fa-user-tag", "roles", facets["roles"]),
+                    ("Instruments", "fa-guitar", "instruments", facets["instruments"]),
+                    ("Régions", "fa-map", "region", facets["regions"]),
+                    ("Villes", "fa-city", "city", facets["cities"]),
+                    ("Note", "fa-star", "min_rating", facets["ratings"]),
+                ],
+                "facet_query": params.urlencode(),
                 "page_title": "Recherche d'artistes",
                 "page_description": "Trouvez l'artiste parfait pour votre événement",
                 "has_filters": (
                     any(form.cleaned_data.values()) if form.is_valid() else False
                 ),
-                "results_count": queryset.count() if form.is_valid() else 0,
+                "results_count": paginator.count if form.is_valid() else 0,
             }
         )
 
@@ -151,7 +199,7 @@ class ArtistDetailView(DetailView):
         """Récupère l'artiste et enregistre la vue"""
         artist = get_object_or_404(
             ArtistProfile.objects.select_related("user").prefetch_related(
-                "genres", "roles", "instruments"
+                "genres", "roles", "instruments", "derivatives"
             ),
             pk=self.kwargs["pk"],
         )
@@ -190,9 +238,15 @@ class ArtistDetailView(DetailView):
         artist = self.object
 
         # Récupérer les fichiers multimédia
-        audio_files = artist.audio_files.filter(is_active=True)[:3]
-        video_files = artist.video_files.filter(is_active=True)[:2]
-        photo_files = artist.photo_files.filter(is_active=True)[:6]
+        audio_files = artist.audio_files.filter(is_active=True).prefetch_related(
+            "derivatives"
+        )[:3]
+        video_files = artist.video_files.filter(is_active=True).prefetch_related(
+            "derivatives"
+        )[:2]
+        photo_files = artist.photo_files.filter(is_active=True).prefetch_related(
+            "derivatives"
+        )[:6]
         documents = artist.documents.filter(is_active=True)[:3]
 
         # Récupérer les avis récents (à implémenter plus tard)
@@ -204,6 +258,7 @@ class ArtistDetailView(DetailView):
                 Q(genres__in=artist.genres.all()) | Q(city__iexact=artist.city)
             )
             .exclude(id=artist.id)
+            .prefetch_related("derivatives")
             .distinct()[:4]
         )
 
@@ -214,6 +269,10 @@ class ArtistDetailView(DetailView):
                 "similar_artists": similar_artists,
                 "audio_files": audio_files,
                 "video_files": video_files,
+                # hls.js n'est chargé que pour les vidéos empaquetées en HLS
+                "has_hls": any(
+                    video.file and video.get_hls_playlist() for video in video_files
+                ),
                 "photo_files": photo_files,
                 "documents": documents,
                 "can_contact": self.request.user.is_authenticated
@@ -434,31 +493,35 @@ class QuickSearchAPIView(TemplateView):
         if form.is_valid() and form.cleaned_data["q"]:
             query = form.cleaned_data["q"]
 
-            # Rechercher dans les artistes
-            artists = ArtistProfile.objects.filter(
-                Q(user__first_name__icontains=query)
-                | Q(user__last_name__icontains=query)
-                | Q(stage_name__icontains=query)
-            ).select_related("user")[:5]
-
-            for artist in artists:
-                results.append(
-                    {
-                        "type": "artist",
-                        "id": artist.id,
-                        "name": artist.display_name,
-                        "subtitle": f"{artist.city}, {artist.region}",
-                        "url": f"/artists/{artist.id}/",
-                        "avatar": (
-                            artist.profile_picture.url
-                            if artist.profile_picture
-                            else None
-                        ),
-                    }
-                )
+            # Index de préfixes Redis : réponses précalculées, sans requête SQL
+            results = AutocompleteService.suggest(query)
+            if results is None:
+                results = self.search_artists(query)
 
         return JsonResponse({"results": results})
 
+    def search_artists(self, query):
+        """Repli sans Redis (cache local en développement)"""
+        artists = ArtistProfile.objects.filter(
+            Q(user__first_name__icontains=query)
+            | Q(user__last_name__icontains=query)
+            | Q(stage_name__icontains=query)
+        ).select_related("user")[:5]
+
+        return [
+            {
+                "type": "artist",
+                "id": artist.id,
+                "name": artist.get_display_name(),
+                "subtitle": ", ".join(v for v in (artist.city, artist.region) if v),
+                "url": reverse("artists:detail", args=[artist.id]),
+                "avatar": (
+                    artist.profile_picture.url if artist.profile_picture else None
+                ),
+            }
+            for artist in artists
+        ]
+
 
 class WhatsAppStatsView(TemplateView):
     """Statistiques WhatsApp pour les artistes"""
@@ -5,7 +5,17 @@ from django.utils.safestring import mark_safe
 from django.db import models
 from django.forms import Textarea
 
-from .models import AudioFile, VideoFile, PhotoFile, DocumentFile, MediaFileQuota
+from .models import (
+    AudioFile,
+    VideoFile,
+    PhotoFile,
+    DocumentFile,
+    MediaBlob,
+    MediaFileQuota,
+    MediaMetadata,
+    ProcessingJob,
+    UploadSession,
+)
 
 
 # Inline pour les quotas
@@ -27,6 +37,41 @@ class MediaFileQuotaInline(admin.StackedInline):
     )
 
 
+# Inline pour les métadonnées techniques (lecture seule)
+class MediaMetadataInline(admin.StackedInline):
+    model = MediaMetadata
+    extra = 0
+    max_num = 1
+    can_delete = False
+    fieldsets = (
+        (
+            "Conteneur",
+            {"fields": (("duration", "format_name", "bit_rate"), "probed_at")},
+        ),
+        (
+            "Flux vidéo",
+            {
+                "fields": (
+                    ("video_codec", "video_bit_rate"),
+                    ("width", "height", "frame_rate"),
+                )
+            },
+        ),
+        (
+            "Flux audio",
+            {
+                "fields": (
+                    ("audio_codec", "audio_bit_rate"),
+                    ("sample_rate", "channels", "channel_layout"),
+                )
+            },
+        ),
+    )
+
+    def get_readonly_fields(self, request, obj=None):
+        return [field.name for field in MediaMetadata._meta.fields]
+
+
 @admin.register(AudioFile)
 class AudioFileAdmin(admin.ModelAdmin):
     list_display = [
@@ -75,6 +120,7 @@ class AudioFileAdmin(admin.ModelAdmin):
         ),
     )
 
+    inlines = [MediaMetadataInline]
     actions = ["activate_files", "deactivate_files", "reset_order"]
 
     def artist_link(self, obj):
@@ -228,6 +274,8 @@ class VideoFileAdmin(admin.ModelAdmin):
         ),
     )
 
+    inlines = [MediaMetadataInline]
+
     def artist_link(self, obj):
         if obj.artist:
             url = reverse("admin:accounts_artistprofile_change", args=[obj.artist.pk])
@@ -695,7 +743,93 @@ class MediaFileQuotaAdmin(admin.ModelAdmin):
     refresh_quotas.short_description = "Actualiser les quotas"
 
 
+@admin.register(ProcessingJob)
+class ProcessingJobAdmin(admin.ModelAdmin):
+    list_display = [
+        "__str__",
+        "content_type",
+        "object_id",
+        "status_display",
+        "created_at",
+        "started_at",
+        "completed_at",
+    ]
+    list_filter = ["status", "content_type", "created_at"]
+    search_fields = ["task_id", "error_message"]
+    readonly_fields = [
+        "content_type",
+        "object_id",
+        "task_id",
+        "error_message",
+        "created_at",
+        "started_at",
+        "completed_at",
+    ]
+    list_per_page = 50
+    date_hierarchy = "created_at"
+
+    def status_display(self, obj):
+        colors = {
+            "pending": "gray",
+            "processing": "orange",
+            "ready": "green",
+            "failed": "red",
+        }
+        return format_html(
+            '<span style="color: {};">● {}</span>',
+            colors.get(obj.status, "gray"),
+            obj.get_status_display(),
+        )
+
+    status_display.short_description = "Statut"
+    status_display.admin_order_field = "status"
+
+
 # Configuration de l'admin
 admin.site.site_header = "TalentZik Administration"
 admin.site.site_title = "TalentZik Admin"
 admin.site.index_title = "Gestion des Fichiers Média"
+
+
+@admin.register(MediaBlob)
+class MediaBlobAdmin(admin.ModelAdmin):
+    list_display = ["content_hash", "media_type", "size", "ref_count", "created_at"]
+    list_filter = ["media_type", "created_at"]
+    search_fields = ["content_hash"]
+    readonly_fields = ["content_hash", "media_type", "size", "ref_count", "created_at"]
+    list_per_page = 50
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = [
+        "filename",
+        "artist",
+        "media_type",
+        "offset",
+        "size",
+        "created_at",
+        "updated_at",
+    ]
+    list_filter = ["media_type", "created_at"]
+    search_fields = ["filename", "artist__stage_name"]
+    readonly_fields = [
+        "artist",
+        "media_type",
+        "filename",
+        "size",
+        "offset",
+        "created_at",
+        "updated_at",
+    ]
+    list_per_page = 50
+    actions = ["cleanup_expired"]
+
+    def cleanup_expired(self, request, queryset):
+        """Supprime les uploads expirés parmi la sélection"""
+        from .services import ChunkedUploadService
+
+        count = ChunkedUploadService.cleanup_expired(queryset)
+        self.message_user(request, f"{count} upload(s) expiré(s) supprimé(s).")
+
+    cleanup_expired.short_description = "Supprimer les uploads expirés"
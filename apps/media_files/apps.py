@@ -9,3 +9,6 @@ class MediaFilesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.media_files"
     verbose_name = "Fichiers multimédia"
+
+    def ready(self):
+        from . import signals  # noqa: F401
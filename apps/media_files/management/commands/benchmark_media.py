@@ -0,0 +1,471 @@
+"""
+Banc d'essai des traitements multimédia (apps/media_files/services.py).
+
+Génère des fichiers synthétiques (sources lavfi de FFmpeg, images PIL), exécute
+chaque étape du pipeline et mesure, par étape : temps réel, temps CPU (Python
+et processus FFmpeg), pic de mémoire résidente et taille des fichiers produits.
+Les résultats sont écrits en JSON pour comparer deux exécutions (--compare).
+
+Chaque mesure tourne dans un processus forké : les compteurs getrusage() et le
+pic de mémoire ne concernent que l'étape mesurée.
+"""
+
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+import traceback
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.utils import timezone
+from PIL import Image
+
+from apps.media_files.services import (
+    AudioProcessingService,
+    DocumentProcessingService,
+    FFmpegRunner,
+    ImageProcessingService,
+    MediaProbeService,
+    MediaProcessingService,
+    VideoProcessingService,
+)
+
+
+def _output_size(paths):
+    """Taille totale (octets) des fichiers et dossiers produits"""
+    total = 0
+    for path in paths:
+        if path and os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+        elif path and os.path.exists(path):
+            total += os.path.getsize(path)
+    return total
+
+
+def _measure(step, connection):
+    """Exécute une étape dans le processus forké et renvoie ses mesures"""
+    result = {"ok": True, "error": "", "output_bytes": 0}
+    start = time.perf_counter()
+    try:
+        result["output_bytes"] = _output_size(step() or [])
+    except Exception as e:
+        result.update(ok=False, error=f"{type(e).__name__}: {e}")
+        result["traceback"] = traceback.format_exc(limit=3)
+    wall = time.perf_counter() - start
+
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    # ru_maxrss est en Ko sous Linux (en octets sous macOS). Côté FFmpeg, la
+    # valeur inclut la mémoire du fork Python qui a lancé le binaire : c'est
+    # un majorant, à comparer d'une exécution à l'autre
+    scale = 1024 if platform.system() == "Darwin" else 1
+    result.update(
+        wall_s=round(wall, 3),
+        cpu_user_s=round(own.ru_utime + children.ru_utime, 3),
+        cpu_system_s=round(own.ru_stime + children.ru_stime, 3),
+        peak_rss_kb=own.ru_maxrss // scale,
+        ffmpeg_peak_rss_kb=children.ru_maxrss // scale,
+    )
+    connection.send(result)
+    connection.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure les traitements multimédia sur des fichiers synthétiques et "
+        "écrit les résultats (temps, CPU, mémoire, taille) en JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            help="Fichier JSON de résultats (défaut : media_benchmark_<date>.json)",
+        )
+        parser.add_argument(
+            "--duration",
+            type=int,
+            default=30,
+            help="Durée des fichiers audio/vidéo générés, en secondes (défaut : 30)",
+        )
+        parser.add_argument(
+            "--video-size",
+            default="1280x720",
+            help="Résolution de la vidéo générée (défaut : 1280x720)",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Nombre d'exécutions de chaque étape (médiane retenue, défaut : 3)",
+        )
+        parser.add_argument(
+            "--only",
+            nargs="+",
+            metavar="ETAPE",
+            help="Limiter le banc d'essai à ces étapes",
+        )
+        parser.add_argument(
+            "--compare",
+            metavar="JSON",
+            help="Résultats précédents à comparer (temps réel médian par étape)",
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Conserver le dossier de travail (fichiers générés et produits)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            width, height = (int(v) for v in options["video_size"].lower().split("x"))
+        except ValueError:
+            raise CommandError("--video-size attend une valeur du type 1280x720")
+        if options["duration"] < 5 or options["repeat"] < 1:
+            raise CommandError("--duration doit valoir au moins 5 et --repeat au moins 1")
+
+        work_dir = tempfile.mkdtemp(prefix="media_benchmark_")
+        self.stdout.write(f"Dossier de travail : {work_dir}")
+        try:
+            # Staging et watermark dans le dossier de travail : aucun effet de bord
+            with override_settings(
+                MEDIA_PROCESSING_TMP_DIR=os.path.join(work_dir, "staging"),
+                MEDIA_WATERMARK_DIR=os.path.join(work_dir, "watermarks"),
+            ):
+                fixtures = self.generate_fixtures(
+                    work_dir, options["duration"], width, height
+                )
+                fixture_sizes = {
+                    name: os.path.getsize(path) for name, path in fixtures.items()
+                }
+                # Préparé avant les forks : les étapes héritent du cache
+                MediaProcessingService.prepare_watermarks()
+                steps = self.get_steps(work_dir, fixtures, options["duration"], height)
+                if options["only"]:
+                    unknown = set(options["only"]) - set(steps)
+                    if unknown:
+                        raise CommandError(
+                            f"Étapes inconnues : {', '.join(sorted(unknown))} "
+                            f"(disponibles : {', '.join(steps)})"
+                        )
+                    steps = {name: steps[name] for name in options["only"]}
+                results = self.run_steps(work_dir, steps, options["repeat"])
+        finally:
+            if options["keep"]:
+                self.stdout.write(f"Fichiers conservés dans {work_dir}")
+            else:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+        report = {
+            "created_at": timezone.now().isoformat(),
+            "host": platform.node(),
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "ffmpeg": self.get_ffmpeg_version(),
+            "cpu_count": os.cpu_count(),
+            "parameters": {
+                "duration": options["duration"],
+                "video_size": f"{width}x{height}",
+                "repeat": options["repeat"],
+                "ffmpeg_budgets": settings.MEDIA_FFMPEG_BUDGETS,
+            },
+            "fixtures": fixture_sizes,
+            "steps": results,
+        }
+
+        output = options["output"] or timezone.now().strftime(
+            "media_benchmark_%Y%m%d_%H%M%S.json"
+        )
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+        self.print_table(results)
+        if options["compare"]:
+            self.print_comparison(options["compare"], results)
+        self.stdout.write(self.style.SUCCESS(f"Résultats écrits dans {output}"))
+
+    # Fichiers synthétiques
+
+    def generate_fixtures(self, work_dir, duration, width, height):
+        """Génère l'audio, la vidéo, l'image et le PDF de test"""
+        fixtures_dir = os.path.join(work_dir, "fixtures")
+        os.makedirs(fixtures_dir)
+        self.stdout.write("Génération des fichiers de test...")
+
+        audio = os.path.join(fixtures_dir, "audio.mp3")
+        self.run_ffmpeg(
+            [
+                "-f", "lavfi", "-i", f"sine=frequency=440:duration={duration}",
+                "-f", "lavfi", "-i", f"anoisesrc=duration={duration}:amplitude=0.05",
+                "-filter_complex", "amix=inputs=2",
+                "-ac", "2", "-ar", "44100", "-b:a", "192k",
+                audio,
+            ]
+        )
+
+        video = os.path.join(fixtures_dir, "video.mp4")
+        self.run_ffmpeg(
+            [
+                "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate=25:duration={duration}",
+                "-f", "lavfi", "-i", f"sine=frequency=220:duration={duration}",
+                "-shortest",
+                "-c:v", "libx264", "-preset", "veryfast", "-b:v", "4M",
+                "-pix_fmt", "yuv420p", "-c:a", "aac",
+                video,
+            ]
+        )
+
+        # Photo : bruit + dégradé (peu compressible, comme une vraie photo)
+        image = os.path.join(fixtures_dir, "photo.jpg")
+        noise = Image.effect_noise((4000, 3000), 64).convert("RGB")
+        gradient = Image.linear_gradient("L").resize((4000, 3000)).convert("RGB")
+        Image.blend(noise, gradient, 0.5).save(image, "JPEG", quality=95)
+
+        document = os.path.join(fixtures_dir, "document.pdf")
+        pages = [Image.new("RGB", (1240, 1754), color) for color in ("white", "ivory", "gray")]
+        pages[0].save(document, "PDF", save_all=True, append_images=pages[1:])
+
+        return {"audio": audio, "video": video, "image": image, "document": document}
+
+    def run_ffmpeg(self, args):
+        result = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y", *args],
+            capture_output=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(
+                f"Impossible de générer un fichier de test : {result.stderr.decode()[-500:]}"
+            )
+
+    def get_ffmpeg_version(self):
+        try:
+            output = subprocess.run(["ffmpeg", "-version"], capture_output=True).stdout
+        except OSError:
+            return None
+        return output.decode(errors="replace").split("\n", 1)[0]
+
+    # Étapes
+
+    def get_steps(self, work_dir, fixtures, duration, height):
+        """
+        Étapes mesurées : nom -> fonction sans argument renvoyant les chemins
+        produits (pour la taille de sortie)
+        """
+        audio, video = fixtures["audio"], fixtures["video"]
+        image, document = fixtures["image"], fixtures["document"]
+        out = os.path.join(work_dir, "outputs")
+
+        def path(name):
+            os.makedirs(out, exist_ok=True)
+            return os.path.join(out, name)
+
+        def fresh_dir(name):
+            directory = path(name)
+            shutil.rmtree(directory, ignore_errors=True)
+            os.makedirs(directory)
+            return directory
+
+        def audio_renditions():
+            outputs = [path("audio.mp3"), path("audio_mobile.m4a"), path("audio_preview.m4a")]
+            FFmpegRunner.run(
+                AudioProcessingService.build_renditions_output(
+                    audio,
+                    *outputs,
+                    AudioProcessingService.get_preview_window(duration),
+                    gain=-3.0,
+                ).overwrite_output(),
+                "fast",
+                duration,
+            )
+            return outputs
+
+        def video_encode():
+            frames_dir = fresh_dir("frames")
+            output = path("video.mp4")
+            VideoProcessingService.encode_video(
+                video,
+                output,
+                frames_dir,
+                VideoProcessingService.get_target_bitrate(duration, 4_000_000),
+                settings.VIDEO_SPRITE_FRAMES,
+                duration=duration,
+                height=height,
+            )
+            return [output, frames_dir]
+
+        def video_sprite():
+            frames_dir = fresh_dir("sprite_frames")
+            frames = VideoProcessingService.extract_frames(
+                video, frames_dir, settings.VIDEO_SPRITE_FRAMES, duration
+            )
+            max(frames, key=VideoProcessingService.score_frame)
+            sprite = path("sprite.jpg")
+            VideoProcessingService.build_sprite(
+                frames,
+                sprite,
+                settings.VIDEO_SPRITE_COLUMNS,
+                settings.VIDEO_SPRITE_TILE_WIDTH,
+            )
+            return [sprite]
+
+        def video_hls():
+            output_dir = fresh_dir("hls")
+            VideoProcessingService.package_hls(
+                video,
+                output_dir,
+                VideoProcessingService.get_hls_renditions(height),
+                duration=duration,
+            )
+            return [output_dir]
+
+        def watermark_render():
+            with override_settings(MEDIA_WATERMARK_DIR=fresh_dir("watermarks")):
+                MediaProcessingService.prepare_watermarks()
+                return [settings.MEDIA_WATERMARK_DIR]
+
+        def image_variants():
+            variants = ImageProcessingService.create_variants(
+                image, settings.IMAGE_VARIANT_WIDTHS
+            )
+            return [variant["path"] for variant in variants]
+
+        def document_preview():
+            return [
+                DocumentProcessingService.render_first_page(
+                    document, path("document.png"), settings.DOCUMENT_PREVIEW_WIDTH
+                )
+            ]
+
+        def document_linearize():
+            return [DocumentProcessingService.linearize(document, path("document_web.pdf"))]
+
+        def expect(result):
+            # Les anciens helpers renvoient None au lieu de lever une exception
+            if not result:
+                raise RuntimeError("aucun fichier produit (voir les logs)")
+            return [result]
+
+        return {
+            "probe_audio": lambda: MediaProbeService.probe(audio) and [],
+            "probe_video": lambda: MediaProbeService.probe(video) and [],
+            "audio_waveform": lambda: AudioProcessingService.compute_waveform_peaks(
+                audio, duration, buckets=settings.AUDIO_WAVEFORM_PEAKS
+            )
+            and [],
+            "audio_loudness": lambda: AudioProcessingService.measure_loudness(
+                audio, duration
+            )
+            and [],
+            "audio_renditions": audio_renditions,
+            "watermark_render": watermark_render,
+            "video_encode": video_encode,
+            "video_thumbnail": lambda: expect(
+                VideoProcessingService.generate_thumbnail(video, path("thumb.jpg"))
+            ),
+            "video_sprite": video_sprite,
+            "video_hls": video_hls,
+            "image_optimize": lambda: expect(
+                ImageProcessingService.optimize_image(image, path("photo_optimized.jpg"))
+            ),
+            "image_webp": lambda: expect(
+                ImageProcessingService.create_webp_version(image, path("photo.webp"))
+            ),
+            "image_variants": image_variants,
+            "document_preview": document_preview,
+            "document_linearize": document_linearize,
+        }
+
+    def run_steps(self, work_dir, steps, repeat):
+        """Mesure chaque étape `repeat` fois, chacune dans son propre processus"""
+        context = multiprocessing.get_context("fork")
+        results = []
+        for name, step in steps.items():
+            runs = []
+            for _ in range(repeat):
+                receiver, sender = context.Pipe(duplex=False)
+                process = context.Process(target=_measure, args=(step, sender))
+                process.start()
+                sender.close()
+                try:
+                    runs.append(receiver.recv())
+                except EOFError:
+                    runs.append(
+                        {"ok": False, "error": f"processus terminé (code {process.exitcode})"}
+                    )
+                process.join()
+                if not runs[-1]["ok"]:
+                    break
+
+            results.append(self.summarize(name, runs))
+            status = "ok" if results[-1]["ok"] else f"échec : {results[-1]['error']}"
+            self.stdout.write(f"  {name:<20} {status}")
+        return results
+
+    def summarize(self, name, runs):
+        """Médiane des exécutions réussies (toutes les mesures restent dans `runs`)"""
+        ok = [run for run in runs if run["ok"]]
+        summary = {
+            "name": name,
+            "ok": len(ok) == len(runs),
+            "error": next((run["error"] for run in runs if not run["ok"]), ""),
+            "runs": runs,
+        }
+        for key in (
+            "wall_s",
+            "cpu_user_s",
+            "cpu_system_s",
+            "peak_rss_kb",
+            "ffmpeg_peak_rss_kb",
+            "output_bytes",
+        ):
+            summary[key] = statistics.median(run[key] for run in ok) if ok else None
+        return summary
+
+    # Affichage
+
+    def print_table(self, results):
+        self.stdout.write("")
+        self.stdout.write(
+            f"{'Étape':<20} {'Réel (s)':>9} {'CPU (s)':>9} {'RSS (Mo)':>9} "
+            f"{'FFmpeg (Mo)':>12} {'Sortie (Ko)':>12}"
+        )
+        for result in results:
+            if not result["ok"]:
+                self.stdout.write(f"{result['name']:<20} {'échec':>9}")
+                continue
+            cpu = result["cpu_user_s"] + result["cpu_system_s"]
+            self.stdout.write(
+                f"{result['name']:<20} {result['wall_s']:>9.3f} {cpu:>9.3f} "
+                f"{result['peak_rss_kb'] / 1024:>9.1f} "
+                f"{result['ffmpeg_peak_rss_kb'] / 1024:>12.1f} "
+                f"{result['output_bytes'] / 1024:>12.1f}"
+            )
+
+    def print_comparison(self, previous_path, results):
+        """Écart du temps réel médian par rapport à une exécution précédente"""
+        try:
+            with open(previous_path) as f:
+                previous = {step["name"]: step for step in json.load(f)["steps"]}
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f"Résultats illisibles ({previous_path}) : {e}")
+
+        self.stdout.write("")
+        self.stdout.write(f"Comparaison avec {previous_path} (temps réel médian)")
+        for result in results:
+            before = previous.get(result["name"], {}).get("wall_s")
+            after = result["wall_s"]
+            if not before or after is None:
+                self.stdout.write(f"  {result['name']:<20} -")
+                continue
+            change = (after - before) / before * 100
+            self.stdout.write(
+                f"  {result['name']:<20} {before:>8.3f} s -> {after:>8.3f} s ({change:+.1f} %)"
+            )
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('media_files', '0003_alter_audiofile_file_size_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProcessingJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='ID du fichier')),
+                ('status', models.CharField(choices=[('pending', 'En attente'), ('processing', 'En cours'), ('ready', 'Prêt'), ('failed', 'Échec')], default='pending', max_length=20, verbose_name='Statut')),
+                ('task_id', models.CharField(blank=True, max_length=255, verbose_name='ID de tâche Celery')),
+                ('error_message', models.TextField(blank=True, verbose_name="Message d'erreur")),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Créé le')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Démarré le')),
+                ('completed_at', models.DateTimeField(blank=True, null=True, verbose_name='Terminé le')),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype', verbose_name='Type de fichier')),
+            ],
+            options={
+                'verbose_name': 'Traitement de fichier',
+                'verbose_name_plural': 'Traitements de fichiers',
+                'db_table': 'media_files_processing_job',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['content_type', 'object_id'], name='media_files_content_3da112_idx'), models.Index(fields=['status'], name='media_files_status_fd367e_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('media_files', '0004_processingjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaMetadata',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('duration', models.FloatField(blank=True, help_text='Durée en secondes', null=True, verbose_name='Durée')),
+                ('format_name', models.CharField(blank=True, max_length=100, verbose_name='Conteneur')),
+                ('bit_rate', models.PositiveIntegerField(blank=True, help_text='Débit en bits/s', null=True, verbose_name='Débit global')),
+                ('video_codec', models.CharField(blank=True, max_length=50, verbose_name='Codec vidéo')),
+                ('video_bit_rate', models.PositiveIntegerField(blank=True, help_text='Débit en bits/s', null=True, verbose_name='Débit vidéo')),
+                ('width', models.PositiveIntegerField(blank=True, null=True, verbose_name='Largeur')),
+                ('height', models.PositiveIntegerField(blank=True, null=True, verbose_name='Hauteur')),
+                ('frame_rate', models.FloatField(blank=True, null=True, verbose_name='Images par seconde')),
+                ('audio_codec', models.CharField(blank=True, max_length=50, verbose_name='Codec audio')),
+                ('audio_bit_rate', models.PositiveIntegerField(blank=True, help_text='Débit en bits/s', null=True, verbose_name='Débit audio')),
+                ('sample_rate', models.PositiveIntegerField(blank=True, help_text='En Hz', null=True, verbose_name="Fréquence d'échantillonnage")),
+                ('channels', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Canaux')),
+                ('channel_layout', models.CharField(blank=True, max_length=50, verbose_name='Disposition des canaux')),
+                ('probed_at', models.DateTimeField(auto_now=True, verbose_name='Analysé le')),
+                ('audio_file', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='metadata', to='media_files.audiofile', verbose_name='Fichier audio')),
+                ('video_file', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='metadata', to='media_files.videofile', verbose_name='Fichier vidéo')),
+            ],
+            options={
+                'verbose_name': 'Métadonnées média',
+                'verbose_name_plural': 'Métadonnées média',
+                'db_table': 'media_files_metadata',
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('media_files', '0005_mediametadata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaDerivative',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='ID du fichier')),
+                ('kind', models.CharField(choices=[('hls', 'Playlist HLS')], max_length=30, verbose_name='Type')),
+                ('label', models.CharField(blank=True, help_text='Ex : 720p, 480w', max_length=50, verbose_name='Libellé')),
+                ('file', models.FileField(max_length=255, upload_to='media/derivatives/%Y/%m/', verbose_name='Fichier')),
+                ('width', models.PositiveIntegerField(blank=True, null=True, verbose_name='Largeur')),
+                ('height', models.PositiveIntegerField(blank=True, null=True, verbose_name='Hauteur')),
+                ('bit_rate', models.PositiveIntegerField(blank=True, help_text='Débit en bits/s', null=True, verbose_name='Débit')),
+                ('file_size', models.PositiveBigIntegerField(blank=True, null=True, verbose_name='Taille du fichier')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Créé le')),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype', verbose_name='Type de fichier')),
+            ],
+            options={
+                'verbose_name': 'Déclinaison de média',
+                'verbose_name_plural': 'Déclinaisons de médias',
+                'db_table': 'media_files_derivative',
+                'ordering': ['kind', 'width'],
+                'indexes': [models.Index(fields=['content_type', 'object_id', 'kind'], name='media_files_content_102d81_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('media_files', '0006_mediaderivative'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediaderivative',
+            name='mime_type',
+            field=models.CharField(blank=True, max_length=50, verbose_name='Type MIME'),
+        ),
+        migrations.AlterField(
+            model_name='mediaderivative',
+            name='kind',
+            field=models.CharField(choices=[('hls', 'Playlist HLS'), ('image', "Variante d'image")], max_length=30, verbose_name='Type'),
+        ),
+    ]
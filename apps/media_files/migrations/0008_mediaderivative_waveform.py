@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('media_files', '0007_mediaderivative_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='mediaderivative',
+            name='kind',
+            field=models.CharField(choices=[('hls', 'Playlist HLS'), ('image', "Variante d'image"), ('waveform', "Forme d'onde")], max_length=30, verbose_name='Type'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('media_files', '0008_mediaderivative_waveform'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='mediaderivative',
+            name='kind',
+            field=models.CharField(choices=[('hls', 'Playlist HLS'), ('image', "Variante d'image"), ('waveform', "Forme d'onde"), ('audio', 'Rendu audio mobile'), ('preview', 'Extrait audio')], max_length=30, verbose_name='Type'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('media_files', '0009_mediaderivative_audio_renditions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, verbose_name='Empreinte SHA-256')),
+                ('media_type', models.CharField(help_text='Ex : audiofile, photofile', max_length=20, verbose_name='Type de média')),
+                ('size', models.PositiveBigIntegerField(default=0, verbose_name='Taille')),
+                ('ref_count', models.PositiveIntegerField(default=0, help_text='Nombre de fichiers du portfolio qui partagent ce contenu', verbose_name='Références')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Créé le')),
+            ],
+            options={
+                'verbose_name': 'Contenu uploadé',
+                'verbose_name_plural': 'Contenus uploadés',
+                'db_table': 'media_files_blob',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='mediablob',
+            constraint=models.UniqueConstraint(fields=('content_hash', 'media_type'), name='unique_media_blob'),
+        ),
+        migrations.AddField(
+            model_name='audiofile',
+            name='blob',
+            field=models.ForeignKey(blank=True, help_text='Empreinte du fichier uploadé (détection des doublons)', null=True, on_delete=django.db.models.deletion.SET_NULL, to='media_files.mediablob', verbose_name='Contenu'),
+        ),
+        migrations.AddField(
+            model_name='documentfile',
+            name='blob',
+            field=models.ForeignKey(blank=True, help_text='Empreinte du fichier uploadé (détection des doublons)', null=True, on_delete=django.db.models.deletion.SET_NULL, to='media_files.mediablob', verbose_name='Contenu'),
+        ),
+        migrations.AddField(
+            model_name='photofile',
+            name='blob',
+            field=models.ForeignKey(blank=True, help_text='Empreinte du fichier uploadé (détection des doublons)', null=True, on_delete=django.db.models.deletion.SET_NULL, to='media_files.mediablob', verbose_name='Contenu'),
+        ),
+        migrations.AddField(
+            model_name='videofile',
+            name='blob',
+            field=models.ForeignKey(blank=True, help_text='Empreinte du fichier uploadé (détection des doublons)', null=True, on_delete=django.db.models.deletion.SET_NULL, to='media_files.mediablob', verbose_name='Contenu'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_organizerprofile_address_organizerprofile_bio_and_more'),
+        ('media_files', '0010_mediablob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('media_type', models.CharField(choices=[('audio', 'Audio'), ('video', 'Vidéo')], max_length=10, verbose_name='Type de média')),
+                ('filename', models.CharField(max_length=255, verbose_name='Nom du fichier')),
+                ('size', models.PositiveBigIntegerField(help_text='Taille annoncée en bytes', verbose_name='Taille totale')),
+                ('offset', models.PositiveBigIntegerField(default=0, help_text='Offset du prochain morceau', verbose_name='Octets reçus')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Créé le')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Modifié le')),
+                ('artist', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to='accounts.artistprofile', verbose_name='Artiste')),
+            ],
+            options={
+                'verbose_name': 'Upload en cours',
+                'verbose_name_plural': 'Uploads en cours',
+                'db_table': 'media_files_upload_session',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
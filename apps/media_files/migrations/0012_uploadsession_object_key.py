@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('media_files', '0011_uploadsession'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadsession',
+            name='object_key',
+            field=models.CharField(blank=True, help_text='Upload direct vers le bucket (vide : upload par morceaux)', max_length=500, verbose_name='Clé dans le bucket'),
+        ),
+    ]
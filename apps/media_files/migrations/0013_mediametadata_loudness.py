@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('media_files', '0012_uploadsession_object_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediametadata',
+            name='loudness_gain',
+            field=models.FloatField(blank=True, help_text="Gain total appliqué à l'original, en dB", null=True, verbose_name='Gain de normalisation'),
+        ),
+        migrations.AddField(
+            model_name='mediametadata',
+            name='loudness_integrated',
+            field=models.FloatField(blank=True, help_text='En LUFS', null=True, verbose_name='Loudness intégrée'),
+        ),
+        migrations.AddField(
+            model_name='mediametadata',
+            name='loudness_range',
+            field=models.FloatField(blank=True, help_text='En LU', null=True, verbose_name='Plage de loudness'),
+        ),
+        migrations.AddField(
+            model_name='mediametadata',
+            name='loudness_source',
+            field=models.CharField(blank=True, help_text='Fichier auquel correspond la mesure de loudness', max_length=255, verbose_name='Fichier mesuré'),
+        ),
+        migrations.AddField(
+            model_name='mediametadata',
+            name='loudness_threshold',
+            field=models.FloatField(blank=True, help_text='En LUFS', null=True, verbose_name='Seuil de loudness'),
+        ),
+        migrations.AddField(
+            model_name='mediametadata',
+            name='loudness_true_peak',
+            field=models.FloatField(blank=True, help_text='En dBTP', null=True, verbose_name='True peak'),
+        ),
+    ]
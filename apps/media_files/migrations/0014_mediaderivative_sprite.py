@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('media_files', '0013_mediametadata_loudness'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='mediaderivative',
+            name='kind',
+            field=models.CharField(choices=[('hls', 'Playlist HLS'), ('image', "Variante d'image"), ('waveform', "Forme d'onde"), ('audio', 'Rendu audio mobile'), ('preview', 'Extrait audio'), ('sprite', 'Planche de vignettes'), ('vtt', 'Index des vignettes (WebVTT)')], max_length=30, verbose_name='Type'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('media_files', '0014_mediaderivative_sprite'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documentfile',
+            name='is_linearized',
+            field=models.BooleanField(default=False, help_text="PDF linéarisé : la première page s'affiche avant la fin du téléchargement", verbose_name='Optimisé pour le web'),
+        ),
+        migrations.AddField(
+            model_name='documentfile',
+            name='page_count',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Nombre de pages'),
+        ),
+        migrations.AddField(
+            model_name='documentfile',
+            name='thumbnail',
+            field=models.ImageField(blank=True, help_text='Rendu de la première page du document', null=True, upload_to='media/documents/previews/%Y/%m/', verbose_name='Aperçu'),
+        ),
+    ]
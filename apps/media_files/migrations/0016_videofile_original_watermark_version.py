@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('media_files', '0015_documentfile_preview'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='videofile',
+            name='original',
+            field=models.FileField(blank=True, help_text='Fichier uploadé, conservé (non servi) pour réappliquer le filigrane', null=True, upload_to='media/video/%Y/%m/', verbose_name='Original'),
+        ),
+        migrations.AddField(
+            model_name='videofile',
+            name='watermark_version',
+            field=models.CharField(blank=True, help_text='Version du watermark incrustée dans la vidéo servie', max_length=20, verbose_name='Version du filigrane'),
+        ),
+    ]
@@ -1,6 +1,12 @@
+import os
+import uuid
+
 from django.db import models
+from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
+from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
 from django.core.validators import FileExtensionValidator
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
 
@@ -68,16 +74,66 @@ class MediaFileBase(models.Model):
         null=True,
         blank=True,
     )
+    blob = models.ForeignKey(
+        "media_files.MediaBlob",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name=_("Contenu"),
+        help_text=_("Empreinte du fichier uploadé (détection des doublons)"),
+    )
+    processing_jobs = GenericRelation("media_files.ProcessingJob")
+    derivatives = GenericRelation("media_files.MediaDerivative")
 
     class Meta:
         abstract = True
         ordering = ["order", "-upload_date"]
 
     def save(self, *args, **kwargs):
-        if self.file and hasattr(self.file, "size"):
+        # Original encore dans le bucket (upload direct) : taille déjà connue
+        if self.file and not self.is_pending_upload and hasattr(self.file, "size"):
             self.file_size = self.file.size
         super().save(*args, **kwargs)
 
+    @property
+    def is_pending_upload(self):
+        """
+        Indique si l'original est encore dans le bucket d'upload direct, en
+        attente de son rapatriement par le worker
+        """
+        return bool(self.file) and self.file.name.startswith(
+            settings.DIRECT_UPLOAD_PREFIX
+        )
+
+    def get_processing_job(self):
+        """
+        Retourne le dernier traitement lancé pour ce fichier (ou None)
+        """
+        # .all() pour profiter d'un éventuel prefetch_related("processing_jobs")
+        jobs = list(self.processing_jobs.all())
+        return jobs[0] if jobs else None
+
+    @property
+    def processing_status(self):
+        """Statut du dernier traitement, "ready" si aucun traitement n'existe"""
+        job = self.get_processing_job()
+        return job.status if job else "ready"
+
+    def get_derivative(self, kind):
+        """
+        Retourne la première déclinaison de ce type (ou None)
+        """
+        # .all() pour profiter d'un éventuel prefetch_related("derivatives")
+        for derivative in self.derivatives.all():
+            if derivative.kind == kind:
+                return derivative
+        return None
+
+    @property
+    def is_processing(self):
+        """Indique si le fichier est en attente ou en cours de traitement"""
+        return self.processing_status in ("pending", "processing")
+
     def get_file_size_display(self):
         """
         Retourne la taille du fichier dans un format lisible
@@ -138,6 +194,25 @@ class AudioFile(MediaFileBase):
         seconds = self.duration % 60
         return f"{minutes:02d}:{seconds:02d}"
 
+    def get_waveform(self):
+        """
+        Retourne la forme d'onde précalculée (pics en JSON) si disponible
+        """
+        return self.get_derivative("waveform")
+
+    def get_mobile_rendition(self):
+        """
+        Retourne le rendu audio basse qualité (AAC) si disponible
+        """
+        return self.get_derivative("audio")
+
+    def get_preview(self):
+        """
+        Retourne l'extrait le plus léger disponible : l'extrait court, ou
+        à défaut le rendu mobile (pistes plus courtes que l'extrait)
+        """
+        return self.get_derivative("preview") or self.get_mobile_rendition()
+
 
 class VideoFile(MediaFileBase):
     """
@@ -181,6 +256,19 @@ class VideoFile(MediaFileBase):
         default=False,
         help_text=_("Indique si le filigrane a été ajouté à la vidéo"),
     )
+    watermark_version = models.CharField(
+        _("Version du filigrane"),
+        max_length=20,
+        blank=True,
+        help_text=_("Version du watermark incrustée dans la vidéo servie"),
+    )
+    original = models.FileField(
+        _("Original"),
+        upload_to="media/video/%Y/%m/",
+        blank=True,
+        null=True,
+        help_text=_("Fichier uploadé, conservé (non servi) pour réappliquer le filigrane"),
+    )
 
     class Meta:
         verbose_name = _("Fichier Vidéo")
@@ -212,6 +300,19 @@ class VideoFile(MediaFileBase):
         seconds = self.duration % 60
         return f"{minutes:02d}:{seconds:02d}"
 
+    def get_hls_playlist(self):
+        """
+        Retourne la playlist HLS maître si la vidéo a été empaquetée
+        """
+        return self.get_derivative("hls")
+
+    def get_sprite_track(self):
+        """
+        Retourne l'index WebVTT de la planche de vignettes (aperçu au survol)
+        si disponible
+        """
+        return self.get_derivative("vtt")
+
     def get_video_source(self):
         """
         Retourne la source de la vidéo (fichier local ou URL externe)
@@ -311,6 +412,19 @@ class DocumentFile(MediaFileBase):
         default="other",
         help_text=_("Type de document"),
     )
+    thumbnail = models.ImageField(
+        _("Aperçu"),
+        upload_to="media/documents/previews/%Y/%m/",
+        blank=True,
+        null=True,
+        help_text=_("Rendu de la première page du document"),
+    )
+    page_count = models.PositiveIntegerField(_("Nombre de pages"), null=True, blank=True)
+    is_linearized = models.BooleanField(
+        _("Optimisé pour le web"),
+        default=False,
+        help_text=_("PDF linéarisé : la première page s'affiche avant la fin du téléchargement"),
+    )
 
     class Meta:
         verbose_name = _("Document")
@@ -382,3 +496,330 @@ class MediaFileQuota(models.Model):
             artist=self.artist, is_active=True
         ).count()
         self.save()
+
+
+class MediaMetadata(models.Model):
+    """
+    Métadonnées techniques d'un fichier audio/vidéo, extraites en une seule
+    passe ffprobe à l'upload et réutilisées par toutes les étapes du traitement
+    """
+
+    audio_file = models.OneToOneField(
+        AudioFile,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="metadata",
+        verbose_name=_("Fichier audio"),
+    )
+    video_file = models.OneToOneField(
+        VideoFile,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="metadata",
+        verbose_name=_("Fichier vidéo"),
+    )
+    duration = models.FloatField(
+        _("Durée"), null=True, blank=True, help_text=_("Durée en secondes")
+    )
+    format_name = models.CharField(_("Conteneur"), max_length=100, blank=True)
+    bit_rate = models.PositiveIntegerField(
+        _("Débit global"), null=True, blank=True, help_text=_("Débit en bits/s")
+    )
+    video_codec = models.CharField(_("Codec vidéo"), max_length=50, blank=True)
+    video_bit_rate = models.PositiveIntegerField(
+        _("Débit vidéo"), null=True, blank=True, help_text=_("Débit en bits/s")
+    )
+    width = models.PositiveIntegerField(_("Largeur"), null=True, blank=True)
+    height = models.PositiveIntegerField(_("Hauteur"), null=True, blank=True)
+    frame_rate = models.FloatField(
+        _("Images par seconde"), null=True, blank=True
+    )
+    audio_codec = models.CharField(_("Codec audio"), max_length=50, blank=True)
+    audio_bit_rate = models.PositiveIntegerField(
+        _("Débit audio"), null=True, blank=True, help_text=_("Débit en bits/s")
+    )
+    sample_rate = models.PositiveIntegerField(
+        _("Fréquence d'échantillonnage"), null=True, blank=True, help_text=_("En Hz")
+    )
+    channels = models.PositiveSmallIntegerField(_("Canaux"), null=True, blank=True)
+    channel_layout = models.CharField(
+        _("Disposition des canaux"), max_length=50, blank=True
+    )
+    # Mesure de loudness EBU R128 (filtre loudnorm), conservée pour que
+    # les rendus suivants sautent la passe d'analyse
+    loudness_integrated = models.FloatField(
+        _("Loudness intégrée"), null=True, blank=True, help_text=_("En LUFS")
+    )
+    loudness_true_peak = models.FloatField(
+        _("True peak"), null=True, blank=True, help_text=_("En dBTP")
+    )
+    loudness_range = models.FloatField(
+        _("Plage de loudness"), null=True, blank=True, help_text=_("En LU")
+    )
+    loudness_threshold = models.FloatField(
+        _("Seuil de loudness"), null=True, blank=True, help_text=_("En LUFS")
+    )
+    loudness_gain = models.FloatField(
+        _("Gain de normalisation"),
+        null=True,
+        blank=True,
+        help_text=_("Gain total appliqué à l'original, en dB"),
+    )
+    loudness_source = models.CharField(
+        _("Fichier mesuré"),
+        max_length=255,
+        blank=True,
+        help_text=_("Fichier auquel correspond la mesure de loudness"),
+    )
+    probed_at = models.DateTimeField(_("Analysé le"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Métadonnées média")
+        verbose_name_plural = _("Métadonnées média")
+        db_table = "media_files_metadata"
+
+    def __str__(self):
+        media_file = self.audio_file or self.video_file
+        return f"Métadonnées de {media_file.title if media_file else '-'}"
+
+    @property
+    def has_video(self):
+        return bool(self.video_codec)
+
+    @property
+    def has_audio(self):
+        return bool(self.audio_codec)
+
+
+class ProcessingJob(models.Model):
+    """
+    Suivi des traitements asynchrones (FFmpeg/PIL) exécutés par Celery
+    """
+
+    STATUS_CHOICES = [
+        ("pending", _("En attente")),
+        ("processing", _("En cours")),
+        ("ready", _("Prêt")),
+        ("failed", _("Échec")),
+    ]
+
+    content_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.CASCADE,
+        verbose_name=_("Type de fichier"),
+    )
+    object_id = models.PositiveBigIntegerField(_("ID du fichier"))
+    content_object = GenericForeignKey("content_type", "object_id")
+    status = models.CharField(
+        _("Statut"),
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default="pending",
+    )
+    task_id = models.CharField(
+        _("ID de tâche Celery"), max_length=255, blank=True
+    )
+    error_message = models.TextField(_("Message d'erreur"), blank=True)
+    created_at = models.DateTimeField(_("Créé le"), auto_now_add=True)
+    started_at = models.DateTimeField(_("Démarré le"), null=True, blank=True)
+    completed_at = models.DateTimeField(_("Terminé le"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Traitement de fichier")
+        verbose_name_plural = _("Traitements de fichiers")
+        db_table = "media_files_processing_job"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["content_type", "object_id"]),
+            models.Index(fields=["status"]),
+        ]
+
+    def __str__(self):
+        return f"{self.content_type.model} #{self.object_id} - {self.get_status_display()}"
+
+    def mark_processing(self):
+        """Passe le traitement à l'état "en cours" """
+        self.status = "processing"
+        self.started_at = timezone.now()
+        self.save(update_fields=["status", "started_at"])
+
+    def mark_ready(self):
+        """Passe le traitement à l'état "prêt" """
+        self.status = "ready"
+        self.completed_at = timezone.now()
+        self.save(update_fields=["status", "completed_at"])
+
+    def mark_failed(self, error_message=""):
+        """Passe le traitement à l'état "échec" en conservant l'erreur"""
+        self.status = "failed"
+        self.error_message = error_message
+        self.completed_at = timezone.now()
+        self.save(update_fields=["status", "error_message", "completed_at"])
+
+
+class MediaDerivative(models.Model):
+    """
+    Déclinaisons produites par le worker à partir d'un fichier multimédia
+    (rendus HLS, variantes d'images, etc.)
+    """
+
+    KIND_CHOICES = [
+        ("hls", _("Playlist HLS")),
+        ("image", _("Variante d'image")),
+        ("waveform", _("Forme d'onde")),
+        ("audio", _("Rendu audio mobile")),
+        ("preview", _("Extrait audio")),
+        ("sprite", _("Planche de vignettes")),
+        ("vtt", _("Index des vignettes (WebVTT)")),
+    ]
+
+    content_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.CASCADE,
+        verbose_name=_("Type de fichier"),
+    )
+    object_id = models.PositiveBigIntegerField(_("ID du fichier"))
+    content_object = GenericForeignKey("content_type", "object_id")
+    kind = models.CharField(_("Type"), max_length=30, choices=KIND_CHOICES)
+    label = models.CharField(
+        _("Libellé"), max_length=50, blank=True, help_text=_("Ex : 720p, 480w")
+    )
+    file = models.FileField(
+        _("Fichier"), upload_to="media/derivatives/%Y/%m/", max_length=255
+    )
+    width = models.PositiveIntegerField(_("Largeur"), null=True, blank=True)
+    height = models.PositiveIntegerField(_("Hauteur"), null=True, blank=True)
+    bit_rate = models.PositiveIntegerField(
+        _("Débit"), null=True, blank=True, help_text=_("Débit en bits/s")
+    )
+    file_size = models.PositiveBigIntegerField(
+        _("Taille du fichier"), null=True, blank=True
+    )
+    mime_type = models.CharField(_("Type MIME"), max_length=50, blank=True)
+    created_at = models.DateTimeField(_("Créé le"), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Déclinaison de média")
+        verbose_name_plural = _("Déclinaisons de médias")
+        db_table = "media_files_derivative"
+        ordering = ["kind", "width"]
+        indexes = [
+            models.Index(fields=["content_type", "object_id", "kind"]),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.label} - {self.content_type.model} #{self.object_id}"
+
+    def delete_files(self):
+        """
+        Supprime les fichiers de la déclinaison du stockage (pour une
+        playlist HLS : tout le dossier des segments)
+        """
+        if not self.file:
+            return
+
+        storage = self.file.storage
+        if self.kind == "hls":
+            root = os.path.dirname(self.file.name)
+            pending = [root]
+            while pending:
+                directory = pending.pop()
+                try:
+                    subdirs, files = storage.listdir(directory)
+                except FileNotFoundError:
+                    continue
+                for filename in files:
+                    storage.delete(f"{directory}/{filename}")
+                pending.extend(f"{directory}/{subdir}" for subdir in subdirs)
+        else:
+            storage.delete(self.file.name)
+
+
+class MediaBlob(models.Model):
+    """
+    Index des contenus uploadés (SHA-256 du fichier reçu) : un même fichier
+    uploadé plusieurs fois réutilise le résultat du premier traitement
+    (fichier traité et déclinaisons) au lieu d'être retraité et restocké
+    """
+
+    content_hash = models.CharField(_("Empreinte SHA-256"), max_length=64)
+    media_type = models.CharField(
+        _("Type de média"), max_length=20, help_text=_("Ex : audiofile, photofile")
+    )
+    size = models.PositiveBigIntegerField(_("Taille"), default=0)
+    ref_count = models.PositiveIntegerField(
+        _("Références"),
+        default=0,
+        help_text=_("Nombre de fichiers du portfolio qui partagent ce contenu"),
+    )
+    created_at = models.DateTimeField(_("Créé le"), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Contenu uploadé")
+        verbose_name_plural = _("Contenus uploadés")
+        db_table = "media_files_blob"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content_hash", "media_type"], name="unique_media_blob"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.media_type} {self.content_hash[:12]} ({self.ref_count})"
+
+
+class UploadSession(models.Model):
+    """
+    Upload en plusieurs morceaux (reprise possible) : les morceaux sont
+    ajoutés à un fichier de staging et le serveur tient à jour l'offset
+    reçu. Le fichier assemblé passe ensuite par le formulaire d'upload
+    habituel (validation, quotas). Avec `object_key`, le fichier est envoyé
+    directement au bucket S3 via un formulaire pré-signé
+    """
+
+    MEDIA_TYPE_CHOICES = [
+        ("audio", _("Audio")),
+        ("video", _("Vidéo")),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    artist = models.ForeignKey(
+        "accounts.ArtistProfile",
+        on_delete=models.CASCADE,
+        related_name="upload_sessions",
+        verbose_name=_("Artiste"),
+    )
+    media_type = models.CharField(
+        _("Type de média"), max_length=10, choices=MEDIA_TYPE_CHOICES
+    )
+    filename = models.CharField(_("Nom du fichier"), max_length=255)
+    size = models.PositiveBigIntegerField(
+        _("Taille totale"), help_text=_("Taille annoncée en bytes")
+    )
+    offset = models.PositiveBigIntegerField(
+        _("Octets reçus"), default=0, help_text=_("Offset du prochain morceau")
+    )
+    object_key = models.CharField(
+        _("Clé dans le bucket"),
+        max_length=500,
+        blank=True,
+        help_text=_("Upload direct vers le bucket (vide : upload par morceaux)"),
+    )
+    created_at = models.DateTimeField(_("Créé le"), auto_now_add=True)
+    updated_at = models.DateTimeField(_("Modifié le"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Upload en cours")
+        verbose_name_plural = _("Uploads en cours")
+        db_table = "media_files_upload_session"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size}) - {self.artist}"
+
+    @property
+    def is_complete(self):
+        """Indique si tous les octets annoncés ont été reçus"""
+        return self.offset >= self.size
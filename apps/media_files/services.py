@@ -2,69 +2,713 @@
 Services pour le traitement des fichiers multimédia avec FFmpeg
 """
 
+import hashlib
+import json
 import os
+import shutil
 import subprocess
 import tempfile
+import threading
 import logging
+import math
+import time
+import uuid
+from datetime import timedelta
 from pathlib import Path
+from urllib.parse import quote, urlencode
 from django.conf import settings
+from django.core.cache import cache
+from django.core.files import File
 from django.core.files.base import ContentFile
-from PIL import Image
+from django.core.files.uploadedfile import UploadedFile
+from django.core.exceptions import ValidationError
+from django.core import signing
+from django.core.signing import Signer
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from django.utils.text import get_valid_filename
+from django.db import transaction
+from django.db.models import F, Q
+from PIL import Image, ImageFilter, ImageOps, ImageStat
 import ffmpeg
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
 
+class StagedFile(File):
+    """
+    Fichier produit par FFmpeg/PIL dans le dossier de staging.
+
+    Expose temporary_file_path() comme un TemporaryUploadedFile : le
+    FileSystemStorage le déplace (simple rename, le staging est sur le même
+    volume que MEDIA_ROOT) au lieu de le recopier, et les autres backends le
+    lisent par blocs via chunks().
+    """
+
+    def __init__(self, path, name=None):
+        super().__init__(open(path, "rb"), name=name or os.path.basename(path))
+        self._staged_path = path
+
+    def temporary_file_path(self):
+        return self._staged_path
+
+
+class StagedUploadedFile(UploadedFile):
+    """
+    Fichier du staging présenté comme un fichier uploadé (formulaires) :
+    FileSystemStorage le déplace au lieu de le copier
+    """
+
+    def __init__(self, path, name, size):
+        super().__init__(open(path, "rb"), name=name, size=size)
+        self.path = path
+
+    def temporary_file_path(self):
+        return self.path
+
+
+class RemoteUploadedFile(UploadedFile):
+    """
+    Original déposé dans le bucket d'upload direct, présenté aux formulaires
+    (nom et taille seulement, le contenu n'est pas lu par le serveur web)
+    """
+
+    def __init__(self, object_key, name, size):
+        super().__init__(None, name=name, size=size)
+        self.object_key = object_key
+
+
+class FFmpegRunner:
+    """
+    Exécute les commandes FFmpeg dans un budget (voir MEDIA_FFMPEG_BUDGETS) :
+    threads par sortie, priorité CPU (nice) et durée maximale proportionnelle
+    à la durée du média. Profils : "fast" (analyse, miniatures, audio) et
+    "heavy" (transcodage vidéo)
+    """
+
+    @staticmethod
+    def get_budget(profile):
+        return settings.MEDIA_FFMPEG_BUDGETS[profile]
+
+    @staticmethod
+    def get_timeout(profile, duration=None):
+        """Durée maximale (secondes) d'une commande pour un média de `duration` s"""
+        budget = FFmpegRunner.get_budget(profile)
+        timeout = budget["timeout_base"] + budget["timeout_factor"] * (duration or 0)
+        return min(timeout, budget["timeout_max"])
+
+    @staticmethod
+    def _get_output_filenames(stream):
+        """Fichiers de sortie d'une commande ffmpeg-python, dans l'ordre des arguments"""
+        from ffmpeg.dag import topo_sort
+        from ffmpeg.nodes import OutputNode, get_stream_spec_nodes
+
+        sorted_nodes, _ = topo_sort(get_stream_spec_nodes(stream))
+        return [
+            node.kwargs["filename"]
+            for node in sorted_nodes
+            if isinstance(node, OutputNode)
+        ]
+
+    @staticmethod
+    def get_args(command, profile):
+        """
+        Ligne de commande complète : `nice`, puis la commande FFmpeg (flux
+        ffmpeg-python ou liste d'arguments) avec `-threads` devant chaque sortie
+        """
+        budget = FFmpegRunner.get_budget(profile)
+        threads = ["-threads", str(budget["threads"])]
+        if isinstance(command, list):
+            # Commande construite à la main : une seule sortie, en dernier
+            args = command[:-1] + threads + command[-1:]
+        else:
+            args = ffmpeg.compile(command, overwrite_output=True)
+            position = 0
+            for filename in FFmpegRunner._get_output_filenames(command):
+                position = args.index(filename, position)
+                args[position:position] = threads
+                position += len(threads) + 1
+        return ["nice", "-n", str(budget["nice"])] + args
+
+    @staticmethod
+    def run(command, profile, duration=None, progress=None):
+        """
+        Exécute FFmpeg jusqu'au bout ; RuntimeError en cas d'échec ou de
+        dépassement. `progress(fraction)` reçoit l'avancement (0-1) lu sur
+        la sortie `-progress` de FFmpeg, si la durée du média est connue
+        """
+        timeout = FFmpegRunner.get_timeout(profile, duration)
+        args = FFmpegRunner.get_args(command, profile)
+        if progress is not None and duration:
+            return FFmpegRunner._run_with_progress(args, timeout, duration, progress)
+
+        try:
+            result = subprocess.run(args, capture_output=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            raise RuntimeError(f"FFmpeg a dépassé son budget de {timeout:.0f} s")
+        if result.returncode != 0:
+            stderr = result.stderr.decode(errors="replace")
+            raise RuntimeError(f"Échec de FFmpeg : {stderr[-500:]}")
+        return result
+
+    @staticmethod
+    def _run_with_progress(args, timeout, duration, progress):
+        """Variante de run() qui lit les lignes `clé=valeur` de `-progress pipe:1`"""
+        position = args.index("ffmpeg") + 1
+        args[position:position] = ["-progress", "pipe:1", "-nostats"]
+
+        # stderr dans un fichier : pas de blocage si FFmpeg écrit beaucoup
+        with tempfile.TemporaryFile() as stderr:
+            process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=stderr)
+            FFmpegRunner._start_timer(process, timeout)
+            try:
+                for line in process.stdout:
+                    key, _, value = line.decode(errors="replace").strip().partition("=")
+                    if key == "out_time_us" and value.isdigit():
+                        progress(min(1, int(value) / 1_000_000 / duration))
+            finally:
+                process.stdout.close()
+
+            if FFmpegRunner.wait(process) != 0:
+                stderr.seek(0)
+                message = stderr.read().decode(errors="replace")
+                raise RuntimeError(f"Échec de FFmpeg : {message[-500:]}")
+        return process
+
+    @staticmethod
+    def _start_timer(process, timeout):
+        """Tue le processus s'il dépasse `timeout` secondes (voir wait)"""
+        process.timed_out = False
+
+        def expire():
+            process.timed_out = True
+            process.kill()
+
+        process.timer = threading.Timer(timeout, expire)
+        process.timer.daemon = True
+        process.timer.start()
+
+    @staticmethod
+    def popen(command, profile, duration=None):
+        """
+        Lance FFmpeg avec sa sortie sur stdout (`pipe:`). Le processus est
+        tué s'il dépasse son budget ; terminer par FFmpegRunner.wait()
+        """
+        process = subprocess.Popen(
+            FFmpegRunner.get_args(command, profile), stdout=subprocess.PIPE
+        )
+        FFmpegRunner._start_timer(process, FFmpegRunner.get_timeout(profile, duration))
+        return process
+
+    @staticmethod
+    def wait(process):
+        """Attend la fin d'un processus FFmpeg lancé avec un budget et renvoie son code"""
+        returncode = process.wait()
+        process.timer.cancel()
+        if process.timed_out:
+            raise RuntimeError("FFmpeg a dépassé son budget de temps")
+        return returncode
+
+
+class MediaStorageService:
+    """Transfert des fichiers traités vers le stockage sans les charger en mémoire"""
+
+    @staticmethod
+    def get_staging_dir():
+        """
+        Dossier de travail de FFmpeg/PIL, sur le même volume que MEDIA_ROOT
+        pour que l'enregistrement final soit un rename et non une copie
+        """
+        staging_dir = getattr(settings, "MEDIA_PROCESSING_TMP_DIR", None) or (
+            os.path.join(settings.MEDIA_ROOT, "tmp")
+        )
+        os.makedirs(staging_dir, exist_ok=True)
+        return str(staging_dir)
+
+    @staticmethod
+    def staging_path(suffix=""):
+        """Réserve un chemin unique dans le dossier de staging"""
+        fd, path = tempfile.mkstemp(
+            suffix=suffix, dir=MediaStorageService.get_staging_dir()
+        )
+        os.close(fd)
+        return path
+
+    @staticmethod
+    def _restore(field_file, old_name):
+        """Remet l'ancien fichier en place après un échec"""
+        if field_file.name and field_file.name != old_name:
+            field_file.storage.delete(field_file.name)
+        setattr(field_file.instance, field_file.field.attname, old_name)
+
+    @staticmethod
+    def _delete_replaced(field_file, old_name):
+        """Supprime du stockage le fichier remplacé par la version traitée"""
+        if old_name and old_name != field_file.name:
+            field_file.storage.delete(old_name)
+
+    @staticmethod
+    def save_processed(field_file, processed_path, name, replace=True):
+        """
+        Enregistre un fichier du staging dans un FileField (déplacement sans
+        copie en mémoire) et supprime l'ancien fichier si `replace`
+        """
+        old_name = field_file.name
+        staged = StagedFile(processed_path, name=name)
+        try:
+            field_file.save(name, staged, save=False)
+        finally:
+            staged.close()
+            if os.path.exists(processed_path):
+                os.unlink(processed_path)
+
+        if replace:
+            MediaStorageService._delete_replaced(field_file, old_name)
+
+    @staticmethod
+    def save_ffmpeg_output(
+        field_file, name, output_stream, replace=True, profile="fast", duration=None
+    ):
+        """
+        Exécute FFmpeg avec une sortie sur stdout (`pipe:`) et transmet le
+        flux au stockage par blocs : aucun fichier intermédiaire, mémoire
+        bornée quelle que soit la taille du média
+        """
+        old_name = field_file.name
+        process = FFmpegRunner.popen(
+            output_stream.global_args("-hide_banner", "-loglevel", "error"),
+            profile,
+            duration,
+        )
+        try:
+            field_file.save(name, File(process.stdout, name=name), save=False)
+        except Exception:
+            process.kill()
+            process.wait()
+            process.timer.cancel()
+            MediaStorageService._restore(field_file, old_name)
+            raise
+        finally:
+            process.stdout.close()
+
+        try:
+            returncode = FFmpegRunner.wait(process)
+        except RuntimeError:
+            MediaStorageService._restore(field_file, old_name)
+            raise
+        if returncode != 0 or not field_file.size:
+            MediaStorageService._restore(field_file, old_name)
+            raise RuntimeError(f"FFmpeg n'a produit aucun fichier (code {returncode})")
+
+        if replace:
+            MediaStorageService._delete_replaced(field_file, old_name)
+
+    @staticmethod
+    def save_directory(local_dir, prefix, storage=None):
+        """
+        Transfère un dossier du staging (ex : rendus HLS) vers le stockage en
+        conservant les chemins relatifs, puis le supprime du staging
+        """
+        from django.core.files.storage import default_storage
+
+        storage = storage or default_storage
+        saved = []
+        for root, _dirs, files in os.walk(local_dir):
+            for filename in files:
+                path = os.path.join(root, filename)
+                relative = os.path.relpath(path, local_dir).replace(os.sep, "/")
+                target = f"{prefix}/{relative}"
+                staged = StagedFile(path)
+                try:
+                    name = storage.save(target, staged)
+                finally:
+                    staged.close()
+                # Les playlists référencent les segments par chemin relatif
+                if name != target:
+                    raise RuntimeError(f"Chemin de stockage inattendu : {name}")
+                saved.append(name)
+
+        shutil.rmtree(local_dir, ignore_errors=True)
+        return saved
+
+
 class MediaProcessingService:
     """Service principal pour le traitement des fichiers multimédia"""
 
+    # Déclinaisons du watermark préparées dans ce processus : version et
+    # {hauteur de sortie: chemin}, voir prepare_watermarks()
+    _watermark_version = None
+    _watermark_paths = None
+
+    @staticmethod
+    def get_watermark_dir():
+        """Dossier des déclinaisons du watermark, sur le volume média partagé"""
+        return Path(
+            settings.MEDIA_WATERMARK_DIR or os.path.join(settings.MEDIA_ROOT, "watermarks")
+        )
+
+    @staticmethod
+    def _load_watermark_source():
+        """
+        Image source du watermark et son contenu (pour la version). Sans
+        fichier source, un logo texte par défaut est rendu en mémoire
+        """
+        source = Path(settings.MEDIA_WATERMARK_SOURCE)
+        if source.exists():
+            content = source.read_bytes()
+            with Image.open(source) as image:
+                return image.convert("RGBA"), content
+
+        from PIL import ImageDraw, ImageFont
+
+        image = Image.new("RGBA", (200, 50), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(image)
+        try:
+            font = ImageFont.truetype("arial.ttf", 20)
+        except OSError:
+            font = ImageFont.load_default()
+        # Texte semi-transparent
+        draw.text((10, 15), "TalentZik", fill=(255, 255, 255, 128), font=font)
+        return image, b"default"
+
     @staticmethod
-    def get_watermark_path():
-        """Retourne le chemin vers le logo TalentZik pour watermarking"""
-        watermark_path = (
-            Path(settings.STATIC_ROOT or settings.STATICFILES_DIRS[0])
-            / "images"
-            / "watermark.png"
+    def get_watermark_version(content):
+        """Version du watermark : empreinte de la source et des réglages de rendu"""
+        digest = hashlib.sha256(content)
+        digest.update(
+            json.dumps(
+                [settings.MEDIA_WATERMARK_HEIGHTS, settings.MEDIA_WATERMARK_HEIGHT_RATIO]
+            ).encode()
         )
+        return digest.hexdigest()[:12]
+
+    @staticmethod
+    def prepare_watermarks():
+        """
+        Rend (si besoin) puis valide une déclinaison du watermark par hauteur
+        de sortie, et les garde en cache pour le processus. Appelé une fois
+        au démarrage des workers (voir tasks.py) ; retourne la version
+        """
+        source, content = MediaProcessingService._load_watermark_source()
+        version = MediaProcessingService.get_watermark_version(content)
+        directory = MediaProcessingService.get_watermark_dir() / version
+        directory.mkdir(parents=True, exist_ok=True)
+
+        paths = {}
+        for height in sorted(settings.MEDIA_WATERMARK_HEIGHTS):
+            path = directory / f"watermark_{height}p.png"
+            if not path.exists():
+                mark_height = max(8, round(height * settings.MEDIA_WATERMARK_HEIGHT_RATIO))
+                mark_width = max(1, round(source.width * mark_height / source.height))
+                # Écriture atomique : plusieurs workers peuvent démarrer ensemble
+                fd, staged = tempfile.mkstemp(suffix=".png", dir=directory)
+                os.close(fd)
+                source.resize((mark_width, mark_height), Image.Resampling.LANCZOS).save(
+                    staged, "PNG"
+                )
+                os.replace(staged, path)
+
+            with Image.open(path) as image:
+                image.verify()
+            paths[height] = str(path)
+
+        MediaProcessingService._watermark_paths = paths
+        MediaProcessingService._watermark_version = version
+        logger.info(f"Watermark {version} prêt ({len(paths)} déclinaisons)")
+        return version
+
+    @staticmethod
+    def get_current_watermark_version():
+        """Version du watermark préparé pour ce processus"""
+        if MediaProcessingService._watermark_paths is None:
+            MediaProcessingService.prepare_watermarks()
+        return MediaProcessingService._watermark_version
+
+    @staticmethod
+    def get_watermark_path(height=None):
+        """
+        Retourne le chemin du watermark TalentZik adapté à une vidéo de
+        `height` pixels de haut (défaut : 720p), sans accès disque une fois
+        le processus préparé
+        """
+        if MediaProcessingService._watermark_paths is None:
+            MediaProcessingService.prepare_watermarks()
+
+        paths = MediaProcessingService._watermark_paths
+        height = height or 720
+        # Plus petite déclinaison couvrant la hauteur, sinon la plus grande
+        fitting = [h for h in paths if h >= height]
+        return paths[min(fitting) if fitting else max(paths)]
 
-        # Si le watermark n'existe pas, on en crée un simple
-        if not watermark_path.exists():
-            MediaProcessingService._create_default_watermark(watermark_path)
 
-        return str(watermark_path)
+class MediaProbeService:
+    """Extraction des métadonnées techniques en un seul appel ffprobe"""
 
     @staticmethod
-    def _create_default_watermark(watermark_path):
-        """Crée un watermark par défaut si il n'existe pas"""
+    def _to_int(value):
         try:
-            # Créer le dossier si nécessaire
-            watermark_path.parent.mkdir(parents=True, exist_ok=True)
+            return int(float(value))
+        except (TypeError, ValueError):
+            return None
 
-            # Créer une image simple avec le texte TalentZik
-            from PIL import Image, ImageDraw, ImageFont
+    @staticmethod
+    def _to_float(value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
 
-            img = Image.new("RGBA", (200, 50), (0, 0, 0, 0))
-            draw = ImageDraw.Draw(img)
+    @staticmethod
+    def _frame_rate(value):
+        """Convertit un débit d'images ffprobe ("30000/1001") en float"""
+        try:
+            num, _, den = str(value).partition("/")
+            return round(float(num) / float(den or 1), 3)
+        except (TypeError, ValueError, ZeroDivisionError):
+            return None
 
-            # Utiliser une police par défaut
-            try:
-                font = ImageFont.truetype("arial.ttf", 20)
-            except:
-                font = ImageFont.load_default()
+    @staticmethod
+    def probe(file_path):
+        """
+        Lance ffprobe une seule fois et retourne un dictionnaire aux clés
+        des champs de MediaMetadata
+        """
+        probe = ffmpeg.probe(file_path)
+        fmt = probe.get("format", {})
+        streams = probe.get("streams", [])
+
+        video = next(
+            (
+                s
+                for s in streams
+                if s.get("codec_type") == "video"
+                # Les pochettes d'album MP3 sont exposées comme flux vidéo
+                and not s.get("disposition", {}).get("attached_pic")
+            ),
+            None,
+        )
+        audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+
+        to_int = MediaProbeService._to_int
+        duration = MediaProbeService._to_float(fmt.get("duration"))
+        if duration is None:
+            stream = video or audio or {}
+            duration = MediaProbeService._to_float(stream.get("duration"))
+
+        data = {
+            "duration": duration,
+            "format_name": fmt.get("format_name", "")[:100],
+            "bit_rate": to_int(fmt.get("bit_rate")),
+            "video_codec": "",
+            "video_bit_rate": None,
+            "width": None,
+            "height": None,
+            "frame_rate": None,
+            "audio_codec": "",
+            "audio_bit_rate": None,
+            "sample_rate": None,
+            "channels": None,
+            "channel_layout": "",
+        }
 
-            # Texte semi-transparent
-            draw.text((10, 15), "TalentZik", fill=(255, 255, 255, 128), font=font)
+        if video:
+            data.update(
+                {
+                    "video_codec": video.get("codec_name", ""),
+                    "video_bit_rate": to_int(video.get("bit_rate")),
+                    "width": to_int(video.get("width")),
+                    "height": to_int(video.get("height")),
+                    "frame_rate": MediaProbeService._frame_rate(
+                        video.get("avg_frame_rate") or video.get("r_frame_rate")
+                    ),
+                }
+            )
 
-            img.save(watermark_path)
-            logger.info(f"Watermark par défaut créé : {watermark_path}")
+        if audio:
+            data.update(
+                {
+                    "audio_codec": audio.get("codec_name", ""),
+                    "audio_bit_rate": to_int(audio.get("bit_rate")),
+                    "sample_rate": to_int(audio.get("sample_rate")),
+                    "channels": to_int(audio.get("channels")),
+                    "channel_layout": audio.get("channel_layout", ""),
+                }
+            )
 
-        except Exception as e:
-            logger.error(f"Erreur lors de la création du watermark : {e}")
+        return data
+
+    @staticmethod
+    def probe_and_store(media_file, file_path=None):
+        """
+        Analyse le fichier d'un AudioFile/VideoFile (ou `file_path`) et
+        enregistre le résultat dans son MediaMetadata
+        """
+        from .models import MediaMetadata, VideoFile
+
+        data = MediaProbeService.probe(file_path or media_file.file.path)
+        owner = "video_file" if isinstance(media_file, VideoFile) else "audio_file"
+        metadata, _ = MediaMetadata.objects.update_or_create(
+            **{owner: media_file}, defaults=data
+        )
+        return metadata
 
 
 class AudioProcessingService:
     """Service pour le traitement des fichiers audio"""
 
+    @staticmethod
+    def _watermark_output(audio_stream, output_path):
+        """Sortie MP3 192k du watermark audio pour un flux audio donné"""
+        # Métadonnées de distribution (la normalisation se fait en amont, voir
+        # build_renditions_output)
+        return ffmpeg.output(
+            audio_stream,
+            output_path,
+            **{
+                "format": "mp3",
+                "metadata": "title=TalentZik",
+                "metadata:s:a:0": "comment=Distribué par TalentZik - Plateforme musicale camerounaise",
+                "acodec": "mp3",
+                "audio_bitrate": "192k",
+            },
+        )
+
+    @staticmethod
+    def build_watermark_output(audio_file_path, output_path):
+        """
+        Construit la commande FFmpeg du watermark audio. `output_path` peut
+        être "pipe:" pour une sortie en flux (voir MediaStorageService)
+        """
+        # Pour le MVP, on ajoute simplement des métadonnées
+        # Le watermarking audio complexe sera ajouté plus tard
+        input_stream = ffmpeg.input(audio_file_path)
+        return AudioProcessingService._watermark_output(input_stream.audio, output_path)
+
+    @staticmethod
+    def get_preview_window(duration):
+        """
+        Début et durée de l'extrait (secondes), décalé vers le début si la
+        piste est trop courte. None si la piste n'est pas plus longue que
+        l'extrait lui-même
+        """
+        length = settings.AUDIO_PREVIEW_DURATION
+        if not duration or duration <= length:
+            return None
+        return min(settings.AUDIO_PREVIEW_START, duration - length), length
+
+    @staticmethod
+    def measure_loudness(audio_file_path, duration=None):
+        """
+        Passe d'analyse EBU R128 (filtre loudnorm, sans sortie). Retourne la
+        loudness intégrée, le true peak, la plage et le seuil mesurés ; None
+        pour une valeur non mesurable (piste silencieuse)
+        """
+        command = (
+            ffmpeg.input(audio_file_path)
+            .audio.filter(
+                "loudnorm",
+                I=settings.AUDIO_LOUDNESS_TARGET,
+                TP=settings.AUDIO_LOUDNESS_TRUE_PEAK,
+                print_format="json",
+            )
+            .output("-", format="null")
+            .global_args("-hide_banner", "-nostats")
+        )
+        stderr = FFmpegRunner.run(command, "fast", duration).stderr.decode(
+            errors="replace"
+        )
+        # loudnorm écrit son rapport JSON à la fin de la sortie d'erreur
+        report = json.loads(stderr[stderr.rindex("{") : stderr.rindex("}") + 1])
+
+        def value(key):
+            number = MediaProbeService._to_float(report.get(key))
+            return number if number is not None and math.isfinite(number) else None
+
+        return {
+            "loudness_integrated": value("input_i"),
+            "loudness_true_peak": value("input_tp"),
+            "loudness_range": value("input_lra"),
+            "loudness_threshold": value("input_thresh"),
+        }
+
+    @staticmethod
+    def get_normalization_gain(integrated, true_peak):
+        """
+        Gain linéaire (dB) amenant la piste à la loudness cible, réduit si
+        besoin pour que le true peak ne dépasse pas le plafond
+        """
+        if integrated is None:
+            return None
+        gain = settings.AUDIO_LOUDNESS_TARGET - integrated
+        if true_peak is not None:
+            gain = min(gain, settings.AUDIO_LOUDNESS_TRUE_PEAK - true_peak)
+        return round(gain, 2)
+
+    @staticmethod
+    def build_renditions_output(
+        audio_file_path,
+        output_path,
+        mobile_path,
+        preview_path=None,
+        preview_window=None,
+        gain=None,
+    ):
+        """
+        Construit une commande FFmpeg unique (un seul décodage) produisant :
+        - la version watermarkée MP3 192k (`output_path`, "pipe:" possible)
+        - le rendu mobile AAC basse qualité (`mobile_path`)
+        - l'extrait AAC avec fondus (`preview_path`, si `preview_window`)
+
+        `gain` (dB) normalise la loudness de toutes les sorties
+        """
+        audio = ffmpeg.input(audio_file_path).audio
+        bitrate = settings.AUDIO_MOBILE_BITRATE
+        comment = "comment=Distribué par TalentZik - Plateforme musicale camerounaise"
+
+        count = 3 if preview_path and preview_window else 2
+        if gain:
+            # Gain appliqué une seule fois, avant la répartition vers les sorties
+            split = audio.filter("volume", f"{gain}dB").filter_multi_output(
+                "asplit", count
+            )
+            streams = [split[i] for i in range(count)]
+        else:
+            streams = [audio] * count
+
+        outputs = [
+            AudioProcessingService._watermark_output(streams[0], output_path),
+            ffmpeg.output(
+                streams[1],
+                mobile_path,
+                format="mp4",
+                acodec="aac",
+                audio_bitrate=bitrate,
+                movflags="+faststart",
+                **{"metadata:s:a:0": comment},
+            ),
+        ]
+        if preview_path and preview_window:
+            start, length = preview_window
+            outputs.append(
+                ffmpeg.output(
+                    streams[2]
+                    .filter("afade", t="in", st=start, d=1)
+                    .filter("afade", t="out", st=start + length - 2, d=2),
+                    preview_path,
+                    format="mp4",
+                    acodec="aac",
+                    audio_bitrate=bitrate,
+                    movflags="+faststart",
+                    # Découpe côté sortie : le décodage reste partagé
+                    ss=start,
+                    t=length,
+                    **{"metadata:s:a:0": comment},
+                )
+            )
+        return ffmpeg.merge_outputs(*outputs)
+
     @staticmethod
     def add_watermark_to_audio(audio_file_path, output_path=None):
         """
@@ -73,30 +717,17 @@ class AudioProcessingService:
         try:
             if not output_path:
                 # Générer un nom de fichier temporaire
-                temp_dir = tempfile.gettempdir()
+                temp_dir = MediaStorageService.get_staging_dir()
                 filename = os.path.basename(audio_file_path)
                 name, ext = os.path.splitext(filename)
                 output_path = os.path.join(temp_dir, f"{name}_watermarked{ext}")
 
-            # Pour le MVP, on va simplement normaliser l'audio et ajouter des métadonnées
-            # Le watermarking audio complexe sera ajouté plus tard
-
-            input_stream = ffmpeg.input(audio_file_path)
-
-            # Normaliser le volume et ajouter des métadonnées
-            output_stream = ffmpeg.output(
-                input_stream,
-                output_path,
-                **{
-                    "metadata": "title=TalentZik",
-                    "metadata:s:a:0": "comment=Distribué par TalentZik - Plateforme musicale camerounaise",
-                    "acodec": "mp3",
-                    "audio_bitrate": "192k",
-                },
+            output_stream = AudioProcessingService.build_watermark_output(
+                audio_file_path, output_path
             )
 
             # Exécuter la commande FFmpeg
-            ffmpeg.run(output_stream, overwrite_output=True, quiet=True)
+            FFmpegRunner.run(output_stream, "fast")
 
             logger.info(f"Watermark audio ajouté : {output_path}")
             return output_path
@@ -107,11 +738,13 @@ class AudioProcessingService:
 
     @staticmethod
     def get_audio_duration(audio_file_path):
-        """Récupère la durée d'un fichier audio en secondes"""
+        """
+        Récupère la durée d'un fichier audio en secondes
+
+        Le pipeline lit plutôt MediaMetadata.duration (voir MediaProbeService)
+        """
         try:
-            probe = ffmpeg.probe(audio_file_path)
-            duration = float(probe["streams"][0]["duration"])
-            return int(duration)
+            return int(MediaProbeService.probe(audio_file_path)["duration"] or 0)
         except Exception as e:
             logger.error(f"Erreur lors de la lecture de la durée audio : {e}")
             return 0
@@ -121,7 +754,7 @@ class AudioProcessingService:
         """Convertit un fichier audio en MP3"""
         try:
             if not output_path:
-                temp_dir = tempfile.gettempdir()
+                temp_dir = MediaStorageService.get_staging_dir()
                 filename = os.path.basename(audio_file_path)
                 name, _ = os.path.splitext(filename)
                 output_path = os.path.join(temp_dir, f"{name}.mp3")
@@ -131,7 +764,7 @@ class AudioProcessingService:
                 input_stream, output_path, acodec="mp3", audio_bitrate=bitrate
             )
 
-            ffmpeg.run(output_stream, overwrite_output=True, quiet=True)
+            FFmpegRunner.run(output_stream, "fast")
             return output_path
 
         except Exception as e:
@@ -139,9 +772,67 @@ class AudioProcessingService:
             return None
 
 
+    @staticmethod
+    def compute_waveform_peaks(
+        audio_file_path, duration, buckets=1000, sample_rate=8000
+    ):
+        """
+        Décode l'audio une seule fois (mono, `sample_rate` Hz, PCM 16 bits)
+        et le réduit à `buckets` pics d'amplitude (0-127), lus par blocs
+        pour garder une mémoire bornée quelle que soit la durée
+        """
+        if not duration or duration <= 0:
+            raise ValueError("Durée inconnue : impossible de calculer la forme d'onde")
+
+        samples_per_bucket = max(1, math.ceil(duration * sample_rate / buckets))
+        chunk_size = samples_per_bucket * 64  # échantillons lus par bloc
+
+        process = FFmpegRunner.popen(
+            ffmpeg.input(audio_file_path)
+            .output("pipe:", format="s16le", acodec="pcm_s16le", ac=1, ar=sample_rate)
+            .global_args("-hide_banner", "-loglevel", "error"),
+            "fast",
+            duration,
+        )
+
+        peaks = []
+        pending = np.empty(0, dtype=np.int16)
+        try:
+            while True:
+                data = process.stdout.read(chunk_size * 2)
+                if not data:
+                    break
+                samples = np.concatenate(
+                    (pending, np.frombuffer(data[: len(data) // 2 * 2], dtype="<i2"))
+                )
+                full = len(samples) // samples_per_bucket * samples_per_bucket
+                if full:
+                    blocks = samples[:full].reshape(-1, samples_per_bucket)
+                    peaks.append(np.abs(blocks.astype(np.int32)).max(axis=1))
+                pending = samples[full:]
+        finally:
+            process.stdout.close()
+
+        if FFmpegRunner.wait(process) != 0:
+            raise RuntimeError("FFmpeg n'a pas pu décoder le fichier audio")
+
+        if len(pending):
+            peaks.append(np.abs(pending.astype(np.int32)).max(keepdims=True))
+        if not peaks:
+            raise RuntimeError("Aucun échantillon audio décodé")
+
+        peaks = np.concatenate(peaks)
+        # Normaliser sur le pic le plus fort pour que les pistes calmes restent lisibles
+        loudest = peaks.max() or 1
+        return (peaks * 127 // loudest).astype(np.int8).tolist()
+
+
 class VideoProcessingService:
     """Service pour le traitement des fichiers vidéo"""
 
+    # Plafond (kbps) quand le bitrate de la source est inconnu
+    MAX_TARGET_BITRATE = 8000
+
     @staticmethod
     def add_watermark_to_video(video_file_path, output_path=None):
         """
@@ -149,7 +840,7 @@ class VideoProcessingService:
         """
         try:
             if not output_path:
-                temp_dir = tempfile.gettempdir()
+                temp_dir = MediaStorageService.get_staging_dir()
                 filename = os.path.basename(video_file_path)
                 name, ext = os.path.splitext(filename)
                 output_path = os.path.join(temp_dir, f"{name}_watermarked{ext}")
@@ -168,6 +859,8 @@ class VideoProcessingService:
                     x="W-w-10",  # 10 pixels du bord droit
                     y="H-h-10",  # 10 pixels du bord bas
                 ),
+                # Conserver la piste audio si la vidéo en a une
+                input_video["a?"],
                 output_path,
                 vcodec="libx264",
                 acodec="aac",
@@ -175,7 +868,7 @@ class VideoProcessingService:
             )
 
             # Exécuter la commande FFmpeg
-            ffmpeg.run(output_stream, overwrite_output=True, quiet=True)
+            FFmpegRunner.run(output_stream, "heavy")
 
             logger.info(f"Watermark vidéo ajouté : {output_path}")
             return output_path
@@ -184,6 +877,18 @@ class VideoProcessingService:
             logger.error(f"Erreur lors du watermarking vidéo : {e}")
             return None
 
+    @staticmethod
+    def build_thumbnail_output(video_file_path, output_path, time_offset=3):
+        """
+        Construit la commande FFmpeg d'extraction de miniature (JPEG).
+        `output_path` peut être "pipe:" pour une sortie en flux
+        """
+        # Extraire une frame à `time_offset` secondes
+        input_stream = ffmpeg.input(video_file_path, ss=time_offset)
+        return ffmpeg.output(
+            input_stream, output_path, vframes=1, format="image2", vcodec="mjpeg"
+        )
+
     @staticmethod
     def generate_thumbnail(video_file_path, output_path=None, time_offset=3):
         """
@@ -191,18 +896,16 @@ class VideoProcessingService:
         """
         try:
             if not output_path:
-                temp_dir = tempfile.gettempdir()
+                temp_dir = MediaStorageService.get_staging_dir()
                 filename = os.path.basename(video_file_path)
                 name, _ = os.path.splitext(filename)
                 output_path = os.path.join(temp_dir, f"{name}_thumb.jpg")
 
-            # Extraire une frame à 3 secondes
-            input_stream = ffmpeg.input(video_file_path, ss=time_offset)
-            output_stream = ffmpeg.output(
-                input_stream, output_path, vframes=1, format="image2", vcodec="mjpeg"
+            output_stream = VideoProcessingService.build_thumbnail_output(
+                video_file_path, output_path, time_offset
             )
 
-            ffmpeg.run(output_stream, overwrite_output=True, quiet=True)
+            FFmpegRunner.run(output_stream, "fast")
 
             logger.info(f"Miniature générée : {output_path}")
             return output_path
@@ -213,121 +916,388 @@ class VideoProcessingService:
 
     @staticmethod
     def get_video_duration(video_file_path):
-        """Récupère la durée d'un fichier vidéo en secondes"""
+        """
+        Récupère la durée d'un fichier vidéo en secondes
+
+        Le pipeline lit plutôt MediaMetadata.duration (voir MediaProbeService)
+        """
         try:
-            probe = ffmpeg.probe(video_file_path)
-            duration = float(probe["streams"][0]["duration"])
-            return int(duration)
+            return int(MediaProbeService.probe(video_file_path)["duration"] or 0)
         except Exception as e:
             logger.error(f"Erreur lors de la lecture de la durée vidéo : {e}")
             return 0
 
     @staticmethod
-    def compress_video(video_file_path, output_path=None, max_size_mb=50):
+    def get_target_bitrate(duration, source_bitrate=None, audio_bitrate=128):
         """
-        Compresse une vidéo pour réduire sa taille
+        Bitrate vidéo cible (kbps) pour que le fichier final tienne dans
+        MAX_VIDEO_SIZE, sans dépasser le bitrate de la source
         """
-        try:
-            if not output_path:
-                temp_dir = tempfile.gettempdir()
-                filename = os.path.basename(video_file_path)
-                name, ext = os.path.splitext(filename)
-                output_path = os.path.join(temp_dir, f"{name}_compressed{ext}")
-
-            # Calcul du bitrate cible basé sur la taille max
-            duration = VideoProcessingService.get_video_duration(video_file_path)
-            if duration > 0:
-                # Bitrate cible en kbps (avec marge de sécurité)
-                target_bitrate = int((max_size_mb * 8 * 1024) / duration * 0.8)
-                target_bitrate = max(target_bitrate, 500)  # Minimum 500 kbps
-            else:
-                target_bitrate = 1000  # Défaut 1000 kbps
+        if not duration or duration <= 0:
+            return 1000  # Défaut 1000 kbps
+
+        # Budget total en kbps (avec marge de sécurité), moins la piste audio
+        max_size_kb = settings.MAX_VIDEO_SIZE * 8 / 1000
+        target_bitrate = int(max_size_kb / duration * 0.9) - audio_bitrate
+        # Inutile de réencoder au-delà de la qualité d'origine
+        ceiling = (
+            source_bitrate // 1000
+            if source_bitrate
+            else VideoProcessingService.MAX_TARGET_BITRATE
+        )
+        target_bitrate = min(target_bitrate, ceiling)
+        return max(target_bitrate, 500)  # Minimum 500 kbps
 
-            input_stream = ffmpeg.input(video_file_path)
-            output_stream = ffmpeg.output(
-                input_stream,
-                output_path,
-                vcodec="libx264",
-                acodec="aac",
-                video_bitrate=f"{target_bitrate}k",
-                audio_bitrate="128k",
-                preset="medium",
+    @staticmethod
+    def _frames_output(stream, frames_dir, count, duration=None):
+        """
+        Sortie JPEG de `count` images régulièrement espacées (au milieu de
+        chaque intervalle, voir get_frame_interval) dans `frames_dir`,
+        numérotées à partir de 000.jpg. Sans durée connue : la première image
+        """
+        if duration:
+            interval = VideoProcessingService.get_frame_interval(duration, count)
+            stream = (
+                stream.trim(start=interval / 2)
+                .setpts("PTS-STARTPTS")
+                .filter("fps", fps=f"{count}/{duration:.3f}")
             )
+        return ffmpeg.output(
+            stream,
+            os.path.join(frames_dir, "%03d.jpg"),
+            vframes=count if duration else 1,
+            start_number=0,
+            format="image2",
+            vcodec="mjpeg",
+            **{"qscale:v": 3},
+        )
 
-            ffmpeg.run(output_stream, overwrite_output=True, quiet=True)
+    @staticmethod
+    def get_frame_interval(duration, count):
+        """Durée (secondes) couverte par chacune des `count` images extraites"""
+        return duration / count
 
-            logger.info(f"Vidéo compressée : {output_path}")
-            return output_path
+    @staticmethod
+    def extract_frames(video_file_path, frames_dir, count, duration=None):
+        """
+        Extraction seule des images (affiche et planche de vignettes), quand
+        la passe d'encodage complète a échoué
+        """
+        FFmpegRunner.run(
+            VideoProcessingService._frames_output(
+                ffmpeg.input(video_file_path).video, frames_dir, count, duration
+            ).global_args("-hide_banner", "-loglevel", "error"),
+            "fast",
+            duration,
+        )
+        return sorted(
+            os.path.join(frames_dir, name)
+            for name in os.listdir(frames_dir)
+            if name.endswith(".jpg")
+        )
 
-        except Exception as e:
-            logger.error(f"Erreur lors de la compression vidéo : {e}")
-            return None
+    @staticmethod
+    def score_frame(frame_path):
+        """
+        Score d'une image candidate à l'affiche, à partir de statistiques
+        peu coûteuses sur une version réduite en niveaux de gris : les images
+        noires, blanches ou unies passent après les autres, puis la plus
+        nette (variance des contours) l'emporte
+        """
+        with Image.open(frame_path) as image:
+            gray = ImageOps.grayscale(image)
+        gray.thumbnail((320, 320))
 
+        stat = ImageStat.Stat(gray)
+        mean, stddev = stat.mean[0], stat.stddev[0]
+        usable = 16 < mean < 240 and stddev > 8
+        sharpness = ImageStat.Stat(gray.filter(ImageFilter.FIND_EDGES)).var[0]
+        return usable, sharpness
 
-class ImageProcessingService:
-    """Service pour le traitement des images"""
+    @staticmethod
+    def build_sprite(frame_paths, sprite_path, columns, tile_width, quality=75):
+        """
+        Assemble les images en une planche JPEG (`columns` vignettes par
+        ligne) et retourne (largeur, hauteur) d'une vignette
+        """
+        with Image.open(frame_paths[0]) as first:
+            tile_height = max(1, round(first.height * tile_width / first.width))
+        rows = math.ceil(len(frame_paths) / columns)
+        sprite = Image.new(
+            "RGB", (tile_width * min(columns, len(frame_paths)), tile_height * rows)
+        )
+        for index, frame_path in enumerate(frame_paths):
+            with Image.open(frame_path) as frame:
+                tile = frame.convert("RGB").resize(
+                    (tile_width, tile_height), Image.Resampling.LANCZOS
+                )
+            row, column = divmod(index, columns)
+            sprite.paste(tile, (column * tile_width, row * tile_height))
+
+        sprite.save(sprite_path, "JPEG", quality=quality, optimize=True)
+        return tile_width, tile_height
 
     @staticmethod
-    def optimize_image(
-        image_file_path, output_path=None, max_width=1920, max_height=1080, quality=85
+    def _vtt_timestamp(seconds):
+        hours, rest = divmod(seconds, 3600)
+        minutes, seconds = divmod(rest, 60)
+        return f"{int(hours):02d}:{int(minutes):02d}:{seconds:06.3f}"
+
+    @staticmethod
+    def build_sprite_vtt(
+        sprite_url, duration, interval, count, columns, tile_width, tile_height
     ):
         """
-        Optimise une image (redimensionnement et compression)
+        Index WebVTT de la planche : une entrée par vignette (chacune couvre
+        `interval` secondes, la dernière va jusqu'à la fin), pointant sur sa
+        zone (`#xywh=`) pour l'aperçu au survol de la barre de lecture
         """
-        try:
-            if not output_path:
-                temp_dir = tempfile.gettempdir()
-                filename = os.path.basename(image_file_path)
-                name, ext = os.path.splitext(filename)
-                output_path = os.path.join(temp_dir, f"{name}_optimized{ext}")
-
-            with Image.open(image_file_path) as img:
-                # Convertir en RGB si nécessaire
-                if img.mode in ("RGBA", "LA", "P"):
-                    background = Image.new("RGB", img.size, (255, 255, 255))
-                    if img.mode == "P":
-                        img = img.convert("RGBA")
-                    background.paste(
-                        img, mask=img.split()[-1] if img.mode == "RGBA" else None
-                    )
-                    img = background
+        timestamp = VideoProcessingService._vtt_timestamp
+        cues = ["WEBVTT", ""]
+        for index in range(count):
+            row, column = divmod(index, columns)
+            end = duration if index == count - 1 else (index + 1) * interval
+            cues += [
+                f"{timestamp(index * interval)} --> {timestamp(end)}",
+                f"{sprite_url}#xywh={column * tile_width},{row * tile_height},"
+                f"{tile_width},{tile_height}",
+                "",
+            ]
+        return "\n".join(cues)
 
-                # Redimensionner si nécessaire
-                if img.width > max_width or img.height > max_height:
-                    img.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
+    @staticmethod
+    def build_encode_output(
+        video_file_path,
+        output_path,
+        frames_dir,
+        target_bitrate,
+        frame_count=1,
+        duration=None,
+        height=None,
+    ):
+        """
+        Construit une commande FFmpeg unique qui décode la vidéo une seule
+        fois et produit à la fois :
+        - la version servie (watermark + H.264 au bitrate cible)
+        - `frame_count` images JPEG de la source, régulièrement espacées
+          (affiche et planche de vignettes, voir _frames_output ; aucune
+          si `frame_count` vaut 0)
+        """
+        watermark_path = MediaProcessingService.get_watermark_path(height)
+
+        input_video = ffmpeg.input(video_file_path)
+        input_watermark = ffmpeg.input(watermark_path)
+        # Un flux pour l'encodage, un autre pour les images
+        source = input_video.video.split() if frame_count else [input_video.video]
+
+        # Positionner le watermark en bas à droite avec transparence
+        watermarked = ffmpeg.overlay(source[0], input_watermark, x="W-w-10", y="H-h-10")
+        video_output = ffmpeg.output(
+            watermarked,
+            # Conserver la piste audio si la vidéo en a une
+            input_video["a?"],
+            output_path,
+            vcodec="libx264",
+            acodec="aac",
+            video_bitrate=f"{target_bitrate}k",
+            maxrate=f"{target_bitrate}k",
+            bufsize=f"{target_bitrate * 2}k",
+            audio_bitrate="128k",
+            preset="medium",
+            movflags="+faststart",
+            **{"metadata": "comment=TalentZik - Plateforme musicale camerounaise"},
+        )
 
-                # Sauvegarder avec compression
-                img.save(output_path, "JPEG", quality=quality, optimize=True)
+        if not frame_count:
+            return video_output
 
-            logger.info(f"Image optimisée : {output_path}")
-            return output_path
+        frames_output = VideoProcessingService._frames_output(
+            source[1], frames_dir, frame_count, duration
+        )
 
-        except Exception as e:
-            logger.error(f"Erreur lors de l'optimisation d'image : {e}")
-            return None
+        return ffmpeg.merge_outputs(video_output, frames_output)
 
     @staticmethod
-    def create_webp_version(image_file_path, output_path=None, quality=80):
+    def encode_video(
+        video_file_path,
+        output_path,
+        frames_dir,
+        target_bitrate,
+        frame_count=1,
+        duration=None,
+        progress=None,
+        height=None,
+    ):
         """
-        Crée une version WebP d'une image pour une meilleure compression
+        Watermark, compression et extraction des images en une seule passe
+        FFmpeg
         """
+        output_stream = VideoProcessingService.build_encode_output(
+            video_file_path,
+            output_path,
+            frames_dir,
+            target_bitrate,
+            frame_count,
+            duration,
+            height,
+        )
         try:
-            if not output_path:
-                temp_dir = tempfile.gettempdir()
-                filename = os.path.basename(image_file_path)
-                name, _ = os.path.splitext(filename)
+            FFmpegRunner.run(
+                output_stream.global_args("-hide_banner", "-loglevel", "error"),
+                "heavy",
+                duration,
+                progress,
+            )
+        except RuntimeError as e:
+            raise RuntimeError(f"Échec de l'encodage vidéo : {e}")
+
+        logger.info(f"Vidéo encodée ({target_bitrate} kbps) : {output_path}")
+        return output_path
+
+    @staticmethod
+    def get_hls_renditions(source_height=None):
+        """
+        Rendus HLS à produire : ceux qui n'agrandissent pas la source (au
+        moins le plus petit de l'échelle)
+        """
+        ladder = sorted(settings.VIDEO_HLS_RENDITIONS, key=lambda r: r["height"])
+        renditions = [
+            r for r in ladder if not source_height or r["height"] <= source_height
+        ]
+        return renditions or ladder[:1]
+
+    @staticmethod
+    def package_hls(
+        video_file_path,
+        output_dir,
+        renditions,
+        has_audio=True,
+        duration=None,
+        progress=None,
+    ):
+        """
+        Encode l'échelle de rendus HLS en une seule commande FFmpeg (décodage
+        unique, un encodeur par rendu) et écrit la playlist maître
+        `master.m3u8` dans `output_dir`
+        """
+        segment_duration = settings.VIDEO_HLS_SEGMENT_DURATION
+        count = len(renditions)
+
+        filters = [f"[0:v]split={count}" + "".join(f"[v{i}]" for i in range(count))]
+        filters += [
+            f"[v{i}]scale=-2:{r['height']}[v{i}out]" for i, r in enumerate(renditions)
+        ]
+
+        args = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y"]
+        args += ["-i", video_file_path, "-filter_complex", ";".join(filters)]
+
+        stream_map = []
+        for i, rendition in enumerate(renditions):
+            args += ["-map", f"[v{i}out]"]
+            if has_audio:
+                args += ["-map", "0:a:0"]
+            bitrate = rendition["video_bitrate"]
+            args += [
+                f"-c:v:{i}", "libx264",
+                f"-b:v:{i}", bitrate,
+                f"-maxrate:v:{i}", bitrate,
+                f"-bufsize:v:{i}", f"{int(bitrate.rstrip('k')) * 2}k",
+            ]
+            if has_audio:
+                args += [f"-c:a:{i}", "aac", f"-b:a:{i}", rendition["audio_bitrate"]]
+                stream_map.append(f"v:{i},a:{i},name:{rendition['name']}")
+            else:
+                stream_map.append(f"v:{i},name:{rendition['name']}")
+
+        args += [
+            "-preset", "veryfast",
+            # Images clés alignées sur les segments pour pouvoir changer de rendu
+            "-sc_threshold", "0",
+            "-force_key_frames", f"expr:gte(t,n_forced*{segment_duration})",
+            "-f", "hls",
+            "-hls_time", str(segment_duration),
+            "-hls_playlist_type", "vod",
+            "-hls_segment_filename", os.path.join(output_dir, "%v", "segment_%03d.ts"),
+            "-master_pl_name", "master.m3u8",
+            "-var_stream_map", " ".join(stream_map),
+            os.path.join(output_dir, "%v", "index.m3u8"),
+        ]
+
+        os.makedirs(output_dir, exist_ok=True)
+        try:
+            FFmpegRunner.run(args, "heavy", duration, progress)
+        except RuntimeError as e:
+            raise RuntimeError(f"Échec de l'empaquetage HLS : {e}")
+
+        master_path = os.path.join(output_dir, "master.m3u8")
+        logger.info(f"Rendus HLS générés : {master_path}")
+        return master_path
+
+
+class ImageProcessingService:
+    """Service pour le traitement des images"""
+
+    @staticmethod
+    def _to_rgb(img):
+        """
+        Convertit une image en RGB ; la transparence (RGBA, LA, P) est
+        aplatie sur fond blanc
+        """
+        if img.mode in ("RGBA", "LA", "P"):
+            if img.mode == "P":
+                img = img.convert("RGBA")
+            background = Image.new("RGB", img.size, (255, 255, 255))
+            background.paste(img, mask=img.split()[-1] if img.mode == "RGBA" else None)
+            return background
+        if img.mode != "RGB":
+            return img.convert("RGB")
+        return img
+
+    @staticmethod
+    def optimize_image(
+        image_file_path, output_path=None, max_width=1920, max_height=1080, quality=85
+    ):
+        """
+        Optimise une image (redimensionnement et compression)
+        """
+        try:
+            if not output_path:
+                temp_dir = MediaStorageService.get_staging_dir()
+                filename = os.path.basename(image_file_path)
+                name, ext = os.path.splitext(filename)
+                output_path = os.path.join(temp_dir, f"{name}_optimized{ext}")
+
+            with Image.open(image_file_path) as img:
+                img = ImageProcessingService._to_rgb(img)
+
+                # Redimensionner si nécessaire
+                if img.width > max_width or img.height > max_height:
+                    img.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
+
+                # Sauvegarder avec compression
+                img.save(output_path, "JPEG", quality=quality, optimize=True)
+
+            logger.info(f"Image optimisée : {output_path}")
+            return output_path
+
+        except Exception as e:
+            logger.error(f"Erreur lors de l'optimisation d'image : {e}")
+            return None
+
+    @staticmethod
+    def create_webp_version(image_file_path, output_path=None, quality=80):
+        """
+        Crée une version WebP d'une image pour une meilleure compression
+        """
+        try:
+            if not output_path:
+                temp_dir = MediaStorageService.get_staging_dir()
+                filename = os.path.basename(image_file_path)
+                name, _ = os.path.splitext(filename)
                 output_path = os.path.join(temp_dir, f"{name}.webp")
 
             with Image.open(image_file_path) as img:
-                # Convertir en RGB si nécessaire
-                if img.mode in ("RGBA", "LA", "P"):
-                    background = Image.new("RGB", img.size, (255, 255, 255))
-                    if img.mode == "P":
-                        img = img.convert("RGBA")
-                    background.paste(
-                        img, mask=img.split()[-1] if img.mode == "RGBA" else None
-                    )
-                    img = background
+                img = ImageProcessingService._to_rgb(img)
 
                 # Sauvegarder en WebP
                 img.save(output_path, "WEBP", quality=quality, optimize=True)
@@ -340,6 +1310,1688 @@ class ImageProcessingService:
             return None
 
 
+    @staticmethod
+    def resize_image(image_file_path, output_path, width, height=0, quality=85):
+        """
+        Redimensionne une image en JPEG : recadrage centré aux dimensions
+        exactes si `width` et `height` sont donnés, sinon proportionnel
+        (0 = dimension libre)
+        """
+        with Image.open(image_file_path) as img:
+            img = ImageOps.exif_transpose(img)
+            img = ImageProcessingService._to_rgb(img)
+
+            if width and height:
+                img = ImageOps.fit(img, (width, height), Image.Resampling.LANCZOS)
+            else:
+                # Ne jamais agrandir l'original
+                img.thumbnail(
+                    (width or img.width, height or img.height),
+                    Image.Resampling.LANCZOS,
+                )
+            img.save(output_path, "JPEG", quality=quality, optimize=True)
+
+        return output_path
+
+    @staticmethod
+    def create_variants(image_file_path, widths, quality=80):
+        """
+        Génère les variantes responsive d'une image : pour chaque largeur,
+        une version JPEG et une version WebP dans le staging.
+        Les largeurs supérieures à l'original sont ignorées (sauf la plus
+        petite, pour toujours produire au moins une variante)
+        """
+        variants = []
+        with Image.open(image_file_path) as img:
+            img = ImageOps.exif_transpose(img)
+            img = ImageProcessingService._to_rgb(img)
+
+            widths = sorted(set(widths))
+            targets = [w for w in widths if w < img.width] or widths[:1]
+            for width in targets:
+                width = min(width, img.width)
+                height = max(1, round(img.height * width / img.width))
+                resized = img.resize((width, height), Image.Resampling.LANCZOS)
+                for image_format, mime_type, suffix in (
+                    ("WEBP", "image/webp", ".webp"),
+                    ("JPEG", "image/jpeg", ".jpg"),
+                ):
+                    output_path = MediaStorageService.staging_path(suffix)
+                    resized.save(output_path, image_format, quality=quality, optimize=True)
+                    variants.append(
+                        {
+                            "path": output_path,
+                            "width": width,
+                            "height": height,
+                            "mime_type": mime_type,
+                            "suffix": suffix,
+                        }
+                    )
+
+        logger.info(f"{len(variants)} variantes générées : {image_file_path}")
+        return variants
+
+
+class DocumentProcessingService:
+    """Service pour le traitement des documents PDF (outils poppler et qpdf)"""
+
+    @staticmethod
+    def _run(args, success_codes=(0,)):
+        """Exécute un outil en ligne de commande ; RuntimeError en cas d'échec"""
+        timeout = settings.DOCUMENT_TOOL_TIMEOUT
+        try:
+            result = subprocess.run(args, capture_output=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            raise RuntimeError(f"{args[0]} a dépassé son budget de {timeout} s")
+        if result.returncode not in success_codes:
+            stderr = result.stderr.decode(errors="replace")
+            raise RuntimeError(f"Échec de {args[0]} : {stderr[-500:]}")
+        return result
+
+    @staticmethod
+    def get_info(pdf_path):
+        """Nombre de pages et linéarisation, lus par pdfinfo"""
+        output = DocumentProcessingService._run(["pdfinfo", pdf_path]).stdout
+        info = {}
+        for line in output.decode(errors="replace").splitlines():
+            key, _, value = line.partition(":")
+            info[key.strip()] = value.strip()
+        return {
+            "page_count": MediaProbeService._to_int(info.get("Pages")),
+            "is_linearized": info.get("Optimized") == "yes",
+        }
+
+    @staticmethod
+    def render_first_page(pdf_path, output_path, width):
+        """Rendu PNG de la première page, à `width` pixels de large"""
+        prefix, _ = os.path.splitext(output_path)
+        DocumentProcessingService._run(
+            [
+                "pdftoppm",
+                *("-f", "1", "-l", "1"),  # première page uniquement
+                "-singlefile",
+                "-png",
+                *("-scale-to-x", str(width), "-scale-to-y", "-1"),
+                pdf_path,
+                prefix,
+            ]
+        )
+        return f"{prefix}.png"
+
+    @staticmethod
+    def linearize(pdf_path, output_path):
+        """
+        Linéarise le PDF ("fast web view") : la première page et les objets
+        dont elle dépend sont placés en tête du fichier, ce qui permet au
+        navigateur de l'afficher dès les premières requêtes Range
+        """
+        # Code 3 : fichier produit valide, avec des avertissements
+        DocumentProcessingService._run(
+            ["qpdf", "--linearize", "--object-streams=generate", pdf_path, output_path],
+            success_codes=(0, 3),
+        )
+        return output_path
+
+
+class MediaAccessService:
+    """
+    Autorisations de la passerelle média (/media/) : un fichier actif est
+    public, un fichier désactivé n'est servi qu'à son propriétaire (ou via
+    un lien signé à durée limitée). Le propriétaire et l'état de chaque
+    chemin sont mis en cache : une seule lecture du cache par requête
+    """
+
+    SALT = "media_files.gateway"
+    CACHE_PREFIX = "media-access"
+
+    @staticmethod
+    def get_cache_key(name):
+        digest = hashlib.sha1(name.encode()).hexdigest()
+        return f"{MediaAccessService.CACHE_PREFIX}:{digest}"
+
+    @staticmethod
+    def _get_owners(model, lookup):
+        return list(model.objects.filter(lookup).values_list("artist_id", "is_active"))
+
+    @staticmethod
+    def resolve(name):
+        """
+        Recherche en base les lignes qui référencent ce fichier. Renvoie
+        {"public": bool, "artists": [...]} ou None si le fichier n'est pas
+        un média référencé (staging, fichiers orphelins...)
+        """
+        from django.contrib.contenttypes.models import ContentType
+        from apps.accounts.models import ArtistProfile, OrganizerProfile
+        from .models import (
+            AudioFile,
+            DocumentFile,
+            MediaDerivative,
+            PhotoFile,
+            VideoFile,
+        )
+
+        public = {"public": True, "artists": []}
+
+        # Photos de profil (une photo du portfolio peut aussi en être une)
+        if ArtistProfile.objects.filter(profile_picture=name).exists():
+            return public
+        if name.startswith("profiles/"):
+            exists = OrganizerProfile.objects.filter(profile_picture=name).exists()
+            return public if exists else None
+
+        owners = []
+        if name.startswith(("media/derivatives/", "media/video/hls/")):
+            if name.startswith("media/video/hls/"):
+                # Playlists de rendu et segments : rattachés à la playlist maîtresse
+                name = "/".join(name.split("/")[:6] + ["master.m3u8"])
+            derivatives = MediaDerivative.objects.filter(file=name).values_list(
+                "content_type_id", "object_id"
+            )
+            for content_type_id, object_id in derivatives:
+                model = ContentType.objects.get_for_id(content_type_id).model_class()
+                if model is ArtistProfile:
+                    return public
+                owners += MediaAccessService._get_owners(model, Q(pk=object_id))
+        elif name.startswith("media/video/"):
+            owners = MediaAccessService._get_owners(
+                VideoFile, Q(file=name) | Q(thumbnail=name)
+            )
+        elif name.startswith("media/documents/"):
+            owners = MediaAccessService._get_owners(
+                DocumentFile, Q(file=name) | Q(thumbnail=name)
+            )
+        else:
+            for prefix, model in (
+                ("media/audio/", AudioFile),
+                ("media/photos/", PhotoFile),
+            ):
+                if name.startswith(prefix):
+                    owners = MediaAccessService._get_owners(model, Q(file=name))
+
+        if not owners:
+            return None
+        return {
+            # Fichier partagé entre doublons : public si une des lignes est active
+            "public": any(is_active for _, is_active in owners),
+            "artists": sorted({artist_id for artist_id, _ in owners}),
+        }
+
+    @staticmethod
+    def get_access(name):
+        """Autorisations du fichier (voir resolve), depuis le cache si possible"""
+        key = MediaAccessService.get_cache_key(name)
+        access = cache.get(key)
+        if access is None:
+            # {} : fichier inconnu, mis en cache lui aussi
+            access = MediaAccessService.resolve(name) or {}
+            cache.set(key, access, settings.MEDIA_ACCESS_CACHE_TIMEOUT)
+        return access or None
+
+    @staticmethod
+    def invalidate(media_file):
+        """Oublie les autorisations en cache des fichiers d'un média"""
+        names = [
+            field_file.name
+            for field_file in (
+                getattr(media_file, "file", None),
+                getattr(media_file, "thumbnail", None),
+            )
+            if field_file
+        ]
+        names += [
+            derivative.file.name
+            for derivative in media_file.derivatives.all()
+            if derivative.file
+        ]
+        cache.delete_many([MediaAccessService.get_cache_key(name) for name in names])
+
+    @staticmethod
+    def sign(name, expires):
+        return Signer(salt=MediaAccessService.SALT).signature(f"{expires}/{name}")
+
+    @staticmethod
+    def get_signed_url(name, max_age=None):
+        """Lien vers un fichier média valable `max_age` secondes, même désactivé"""
+        expires = int(time.time()) + (max_age or settings.MEDIA_SIGNED_URL_MAX_AGE)
+        query = urlencode(
+            {"expires": expires, "signature": MediaAccessService.sign(name, expires)}
+        )
+        return f"{settings.MEDIA_URL}{quote(name)}?{query}"
+
+    @staticmethod
+    def is_signed(name, expires, signature):
+        """Vérifie un lien signé et sa date d'expiration"""
+        try:
+            expires = int(expires)
+        except (TypeError, ValueError):
+            return False
+        if expires < time.time():
+            return False
+        return constant_time_compare(
+            signature or "", MediaAccessService.sign(name, expires)
+        )
+
+    @staticmethod
+    def get_cache_control(access):
+        """
+        Directives Cache-Control d'un média servi : durée courte et
+        revalidation obligatoire, pour qu'un fichier désactivé cesse d'être
+        servi depuis les caches (navigateurs, proxys) ; cache privé seulement
+        pour un fichier non public
+        """
+        return {
+            "public" if access["public"] else "private": True,
+            "max_age": settings.MEDIA_CACHE_MAX_AGE,
+            "must_revalidate": True,
+        }
+
+    @staticmethod
+    def can_access(request, access):
+        """Fichier public, ou désactivé et demandé par son propriétaire / l'équipe"""
+        if access["public"] or request.user.is_staff:
+            return True
+        if not hasattr(request.user, "artist_profile"):
+            return False
+        return request.user.artist_profile.pk in access["artists"]
+
+
+class ThumbnailService:
+    """
+    Miniatures redimensionnées à la demande, derrière des URLs signées
+    (seules les dimensions générées par l'application sont servies) et
+    mises en cache sur disque avec éviction LRU
+    """
+
+    SALT = "media_files.thumbnail"
+    # Taille courante du cache disque, tenue à jour à chaque génération
+    # (partagée entre processus via le cache Django)
+    SIZE_CACHE_KEY = "media_files:thumbnail_cache_size"
+
+    @staticmethod
+    def sign(path, width, height):
+        """Signature de l'URL de miniature (chemin + dimensions)"""
+        return Signer(salt=ThumbnailService.SALT).signature(f"{width}x{height}/{path}")
+
+    @staticmethod
+    def get_url(path, width, height=0):
+        """URL signée de la miniature `width`x`height` d'un fichier média"""
+        return reverse(
+            "media_thumbnail",
+            kwargs={
+                "signature": ThumbnailService.sign(path, width, height),
+                "width": width,
+                "height": height,
+                "path": path,
+            },
+        )
+
+    @staticmethod
+    def is_valid(signature, path, width, height):
+        """Vérifie la signature et les paramètres demandés"""
+        max_dimension = settings.MEDIA_THUMBNAIL_MAX_DIMENSION
+        if not (0 < width <= max_dimension and 0 <= height <= max_dimension):
+            return False
+        if ".." in path.split("/") or not path.startswith(
+            tuple(settings.MEDIA_THUMBNAIL_SOURCES)
+        ):
+            return False
+        return constant_time_compare(
+            signature, ThumbnailService.sign(path, width, height)
+        )
+
+    @staticmethod
+    def get_cache_path(path, width, height):
+        """Emplacement de la miniature dans le cache disque"""
+        digest = hashlib.sha1(f"{width}x{height}/{path}".encode()).hexdigest()
+        return os.path.join(
+            settings.MEDIA_THUMBNAIL_CACHE_DIR, digest[:2], f"{digest}.jpg"
+        )
+
+    @staticmethod
+    def get_thumbnail(path, width, height):
+        """
+        Retourne le chemin de la miniature en cache, en la générant au
+        premier appel. Renvoie None si la source n'existe pas (ou plus)
+        """
+        source_path = os.path.join(settings.MEDIA_ROOT, path)
+        if not os.path.isfile(source_path):
+            return None
+
+        cache_path = ThumbnailService.get_cache_path(path, width, height)
+        if os.path.exists(cache_path):
+            # Date de modification = date du dernier accès (pour l'éviction LRU)
+            os.utime(cache_path)
+            return cache_path
+
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(suffix=".jpg", dir=os.path.dirname(cache_path))
+        os.close(fd)
+        try:
+            ImageProcessingService.resize_image(source_path, tmp_path, width, height)
+            # Remplacement atomique : pas de fichier partiel servi en concurrence
+            os.replace(tmp_path, cache_path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+        logger.info(f"Miniature {width}x{height} générée : {path}")
+        ThumbnailService.track_size(os.path.getsize(cache_path))
+        return cache_path
+
+    @staticmethod
+    def track_size(added):
+        """
+        Ajoute `added` octets au compteur de taille du cache ; le dossier
+        n'est parcouru (éviction) que lorsque la taille maximale est
+        dépassée, ou pour réinitialiser un compteur perdu
+        """
+        try:
+            total_size = cache.incr(ThumbnailService.SIZE_CACHE_KEY, added)
+        except ValueError:
+            # Compteur absent (premier appel, cache vidé) : recréé par evict
+            total_size = None
+        if total_size is None or total_size > settings.MEDIA_THUMBNAIL_CACHE_MAX_SIZE:
+            ThumbnailService.evict()
+
+    @staticmethod
+    def evict(max_size=None):
+        """
+        Supprime les miniatures les moins récemment servies tant que le
+        cache dépasse sa taille maximale (jusqu'à 90 % de celle-ci)
+        """
+        max_size = max_size or settings.MEDIA_THUMBNAIL_CACHE_MAX_SIZE
+        entries = []
+        total_size = 0
+        for root, _, files in os.walk(settings.MEDIA_THUMBNAIL_CACHE_DIR):
+            for filename in files:
+                try:
+                    stat = os.stat(os.path.join(root, filename))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, os.path.join(root, filename)))
+                total_size += stat.st_size
+
+        evicted = 0
+        if total_size > max_size:
+            for _, size, file_path in sorted(entries):
+                if total_size <= max_size * 0.9:
+                    break
+                try:
+                    os.unlink(file_path)
+                except FileNotFoundError:
+                    pass
+                total_size -= size
+                evicted += 1
+            logger.info(f"Cache des miniatures : {evicted} fichiers évincés")
+
+        # Le parcours fait foi : recale le compteur de track_size
+        cache.set(ThumbnailService.SIZE_CACHE_KEY, total_size, None)
+        return evicted
+
+
+class MediaBlobService:
+    """
+    Stockage adressé par contenu : un fichier déjà uploadé (même empreinte,
+    même type de média) réutilise le résultat de son premier traitement.
+    Les fichiers stockés peuvent donc être partagés entre plusieurs lignes :
+    ils ne sont supprimés qu'une fois plus aucune ligne ne les référence.
+    """
+
+    # Champs fichiers copiés depuis le fichier source, selon le modèle
+    PROCESSED_FIELDS = [
+        "file",
+        "file_size",
+        "duration",
+        "thumbnail",
+        "has_watermark",
+        "watermark_version",
+        "original",
+        "page_count",
+        "is_linearized",
+    ]
+
+    @staticmethod
+    def get_content_hash(uploaded_file):
+        """
+        Empreinte SHA-256 calculée pendant l'upload (voir upload_handlers),
+        ou à défaut en relisant le fichier par blocs
+        """
+        content_hash = getattr(uploaded_file, "content_hash", None)
+        if content_hash:
+            return content_hash
+
+        hasher = hashlib.sha256()
+        for chunk in uploaded_file.chunks():
+            hasher.update(chunk)
+        uploaded_file.seek(0)
+        return hasher.hexdigest()
+
+    @staticmethod
+    def acquire(media_file, content_hash, size):
+        """Rattache le fichier à son contenu et incrémente le compteur de références"""
+        from .models import MediaBlob
+
+        blob, _ = MediaBlob.objects.get_or_create(
+            content_hash=content_hash,
+            media_type=media_file._meta.model_name,
+            defaults={"size": size},
+        )
+        MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F("ref_count") + 1)
+        media_file.blob = blob
+        return blob
+
+    @staticmethod
+    def find_source(media_file, blob):
+        """
+        Fichier déjà traité partageant ce contenu (traitement terminé et
+        fichier toujours présent), ou None
+        """
+        candidates = (
+            type(media_file)
+            .objects.filter(blob=blob)
+            .exclude(pk=media_file.pk)
+            .prefetch_related("processing_jobs", "derivatives")
+            .order_by("pk")
+        )
+        for candidate in candidates:
+            if candidate.processing_status == "ready" and candidate.file.storage.exists(
+                candidate.file.name
+            ):
+                return candidate
+        return None
+
+    @staticmethod
+    def save_upload(media_file):
+        """
+        Enregistre un fichier uploadé. Si le même contenu a déjà été traité,
+        le fichier stocké et ses déclinaisons sont réutilisés (rien n'est
+        écrit sur le disque) et True est renvoyé : aucun traitement à lancer
+        """
+        uploaded_file = media_file.file.file
+        if isinstance(uploaded_file, RemoteUploadedFile):
+            # Upload direct : l'empreinte sera calculée par le worker
+            DirectUploadService.attach(media_file, uploaded_file)
+            return False
+
+        blob = MediaBlobService.acquire(
+            media_file,
+            MediaBlobService.get_content_hash(uploaded_file),
+            uploaded_file.size,
+        )
+        source = MediaBlobService.find_source(media_file, blob)
+        if source is None:
+            media_file.save()
+            return False
+
+        MediaBlobService.reuse(media_file, source)
+        return True
+
+    @staticmethod
+    def reuse(media_file, source):
+        """
+        Reprend le fichier stocké, les métadonnées et les déclinaisons de
+        `source` (même contenu, déjà traité) et enregistre `media_file`
+        """
+        for field_name in MediaBlobService.PROCESSED_FIELDS:
+            if hasattr(source, field_name):
+                value = getattr(source, field_name)
+                # Les FileField pointent sur les fichiers déjà stockés
+                setattr(media_file, field_name, getattr(value, "name", value))
+        media_file.save()
+
+        # Métadonnées techniques (audio/vidéo uniquement)
+        metadata = getattr(source, "metadata", None)
+        if metadata is not None:
+            metadata.pk = None
+            if metadata.audio_file_id:
+                metadata.audio_file = media_file
+            else:
+                metadata.video_file = media_file
+            metadata.save()
+
+        for derivative in source.derivatives.all():
+            derivative.pk = None
+            derivative.content_object = media_file
+            derivative.save()
+
+        logger.info(
+            f"Contenu déjà traité réutilisé : {media_file._meta.model_name} "
+            f"#{media_file.pk} <- #{source.pk}"
+        )
+
+    @staticmethod
+    def is_referenced(name):
+        """Indique si un fichier stocké est encore référencé par une ligne"""
+        from apps.accounts.models import ArtistProfile
+        from .models import (
+            AudioFile,
+            DocumentFile,
+            MediaDerivative,
+            PhotoFile,
+            VideoFile,
+        )
+
+        querysets = [
+            AudioFile.objects.filter(file=name),
+            VideoFile.objects.filter(
+                Q(file=name) | Q(thumbnail=name) | Q(original=name)
+            ),
+            PhotoFile.objects.filter(file=name),
+            DocumentFile.objects.filter(Q(file=name) | Q(thumbnail=name)),
+            MediaDerivative.objects.filter(file=name),
+            ArtistProfile.objects.filter(profile_picture=name),
+        ]
+        return any(queryset.exists() for queryset in querysets)
+
+    @staticmethod
+    def release(media_file):
+        """
+        À appeler après la suppression d'un fichier du portfolio : libère sa
+        référence au contenu et supprime les fichiers stockés orphelins
+        """
+        from .models import MediaBlob
+
+        if media_file.blob_id:
+            MediaBlob.objects.filter(pk=media_file.blob_id).update(
+                ref_count=F("ref_count") - 1
+            )
+            MediaBlob.objects.filter(pk=media_file.blob_id, ref_count__lte=0).delete()
+
+        if media_file.is_pending_upload:
+            DirectUploadService.delete_object(media_file.file.name)
+            return
+
+        for field_name in ("file", "thumbnail", "original"):
+            field_file = getattr(media_file, field_name, None)
+            if field_file and not MediaBlobService.is_referenced(field_file.name):
+                field_file.storage.delete(field_file.name)
+
+
+class UploadOffsetMismatch(Exception):
+    """Le morceau reçu ne commence pas à l'offset attendu par le serveur"""
+
+    def __init__(self, offset):
+        super().__init__(f"Offset attendu : {offset}")
+        self.offset = offset
+
+
+class ChunkedUploadService:
+    """
+    Uploads audio/vidéo en plusieurs morceaux, avec reprise : chaque requête
+    reste petite et un échec ne renvoie que le morceau en cours
+    """
+
+    @staticmethod
+    def get_max_size(media_type):
+        """Taille maximale acceptée pour ce type de média"""
+        return {
+            "audio": settings.MAX_AUDIO_SIZE,
+            "video": settings.MAX_VIDEO_SIZE,
+        }[media_type]
+
+    @staticmethod
+    def get_path(upload_session):
+        """Fichier de staging dans lequel les morceaux sont assemblés"""
+        upload_dir = os.path.join(MediaStorageService.get_staging_dir(), "uploads")
+        os.makedirs(upload_dir, exist_ok=True)
+        return os.path.join(upload_dir, f"{upload_session.pk}.part")
+
+    @staticmethod
+    def validate(artist, media_type, filename, size):
+        """Vérifie le type, la taille et le quota avant d'ouvrir un upload"""
+        from .models import UploadSession
+
+        if media_type not in dict(UploadSession.MEDIA_TYPE_CHOICES):
+            raise ValidationError("Type de média non supporté.")
+        if not filename or size <= 0:
+            raise ValidationError("Fichier vide ou sans nom.")
+        max_size = ChunkedUploadService.get_max_size(media_type)
+        if size > max_size:
+            raise ValidationError(
+                f"Le fichier ne doit pas dépasser {max_size // (1024 * 1024)} MB."
+            )
+        if not QuotaService.check_upload_permission(artist, media_type):
+            raise ValidationError("Vous avez atteint la limite de fichiers pour ce type.")
+
+    @staticmethod
+    def create(artist, media_type, filename, size):
+        """Ouvre un upload après vérification du type, de la taille et du quota"""
+        from .models import UploadSession
+
+        ChunkedUploadService.validate(artist, media_type, filename, size)
+        ChunkedUploadService.cleanup_expired(artist.upload_sessions.all())
+
+        upload_session = UploadSession.objects.create(
+            artist=artist,
+            media_type=media_type,
+            filename=os.path.basename(filename)[:255],
+            size=size,
+        )
+        open(ChunkedUploadService.get_path(upload_session), "wb").close()
+        return upload_session
+
+    @staticmethod
+    def append(upload_session, offset, stream):
+        """
+        Ajoute un morceau à partir de `offset` (doit correspondre aux octets
+        déjà reçus) en le lisant par blocs depuis `stream`. Un morceau
+        interrompu n'avance pas l'offset : le client le renvoie simplement
+        """
+        from .models import UploadSession
+
+        if offset != upload_session.offset:
+            raise UploadOffsetMismatch(upload_session.offset)
+
+        # Écriture hors transaction : aucun verrou n'est tenu pendant que le
+        # corps de la requête arrive. Les octets au-delà de l'offset ne
+        # comptent pas tant que celui-ci n'a pas avancé (un morceau
+        # interrompu est simplement réécrit par le suivant)
+        max_chunk = min(settings.UPLOAD_CHUNK_SIZE, upload_session.size - offset)
+        received = 0
+        with open(ChunkedUploadService.get_path(upload_session), "r+b") as part:
+            part.seek(offset)
+            while True:
+                block = stream.read(64 * 1024)
+                if not block:
+                    break
+                received += len(block)
+                if received > max_chunk:
+                    raise ValidationError("Morceau trop volumineux.")
+                part.write(block)
+
+        # Avance conditionnelle : si un envoi concurrent du même morceau a
+        # déjà fait avancer l'offset, celui-ci est refusé (409)
+        updated = UploadSession.objects.filter(
+            pk=upload_session.pk, offset=offset
+        ).update(offset=offset + received, updated_at=timezone.now())
+        if not updated:
+            upload_session.refresh_from_db(fields=["offset"])
+            raise UploadOffsetMismatch(upload_session.offset)
+
+        upload_session.offset = offset + received
+        return upload_session
+
+    @staticmethod
+    def get_uploaded_file(upload_session):
+        """
+        Fichier assemblé, prêt à être passé au formulaire d'upload (son
+        enregistrement dans le stockage est un simple déplacement)
+        """
+        if not upload_session.is_complete:
+            raise ValidationError("L'upload n'est pas terminé.")
+
+        path = ChunkedUploadService.get_path(upload_session)
+        uploaded_file = StagedUploadedFile(
+            path, upload_session.filename, upload_session.size
+        )
+        # Empreinte pour la détection des doublons (voir MediaBlobService)
+        hasher = hashlib.sha256()
+        for chunk in uploaded_file.chunks():
+            hasher.update(chunk)
+        uploaded_file.seek(0)
+        uploaded_file.content_hash = hasher.hexdigest()
+        return uploaded_file
+
+    @staticmethod
+    def discard(upload_session):
+        """
+        Supprime l'upload et son fichier de staging ou, pour un upload
+        direct, l'objet déposé dans le bucket (s'il existe encore)
+        """
+        if upload_session.object_key:
+            DirectUploadService.delete_object(upload_session.object_key)
+        else:
+            path = ChunkedUploadService.get_path(upload_session)
+            if os.path.exists(path):
+                os.unlink(path)
+        upload_session.delete()
+
+    @staticmethod
+    def cleanup_expired(queryset=None):
+        """Supprime les uploads inachevés plus anciens que UPLOAD_SESSION_TTL"""
+        from .models import UploadSession
+
+        if queryset is None:
+            queryset = UploadSession.objects.all()
+        expired = queryset.filter(
+            updated_at__lt=timezone.now()
+            - timedelta(seconds=settings.UPLOAD_SESSION_TTL)
+        )
+        count = 0
+        for upload_session in expired:
+            ChunkedUploadService.discard(upload_session)
+            count += 1
+        return count
+
+
+class DirectUploadService:
+    """
+    Upload direct des originaux audio/vidéo vers un bucket S3-compatible
+    (formulaire pré-signé) : les octets ne passent plus par Gunicorn. Le
+    worker rapatrie ensuite l'original dans MEDIA_ROOT, où se fait le
+    traitement FFmpeg habituel
+    """
+
+    @staticmethod
+    def get_storage():
+        """Stockage S3 du bucket d'upload (django-storages + boto3)"""
+        from storages.backends.s3 import S3Storage
+
+        return S3Storage(bucket_name=settings.AWS_STORAGE_BUCKET_NAME, location="")
+
+    @staticmethod
+    def create(artist, media_type, filename, size):
+        """Ouvre un upload direct (mêmes vérifications qu'un upload par morceaux)"""
+        from .models import UploadSession
+
+        ChunkedUploadService.validate(artist, media_type, filename, size)
+        ChunkedUploadService.cleanup_expired(artist.upload_sessions.all())
+
+        upload_session = UploadSession(
+            artist=artist,
+            media_type=media_type,
+            filename=os.path.basename(filename)[:255],
+            size=size,
+        )
+        upload_session.object_key = (
+            f"{settings.DIRECT_UPLOAD_PREFIX}{upload_session.pk}/"
+            f"{get_valid_filename(upload_session.filename)}"
+        )
+        upload_session.save()
+        return upload_session
+
+    @staticmethod
+    def get_presigned_post(upload_session):
+        """
+        URL et champs du formulaire d'envoi vers le bucket ; la taille
+        annoncée est imposée par la signature
+        """
+        storage = DirectUploadService.get_storage()
+        return storage.connection.meta.client.generate_presigned_post(
+            Bucket=storage.bucket_name,
+            Key=upload_session.object_key,
+            Conditions=[
+                ["content-length-range", upload_session.size, upload_session.size]
+            ],
+            ExpiresIn=settings.DIRECT_UPLOAD_URL_EXPIRY,
+        )
+
+    @staticmethod
+    def complete(upload_session):
+        """Vérifie que l'objet a bien été déposé dans le bucket, à la bonne taille"""
+        if upload_session.is_complete:
+            return upload_session
+
+        storage = DirectUploadService.get_storage()
+        try:
+            size = storage.size(upload_session.object_key)
+        except Exception:
+            raise ValidationError("Le fichier n'a pas été reçu.")
+        if size != upload_session.size:
+            raise ValidationError("Le fichier reçu est incomplet.")
+
+        upload_session.offset = size
+        upload_session.save(update_fields=["offset", "updated_at"])
+        return upload_session
+
+    @staticmethod
+    def get_uploaded_file(upload_session):
+        """Fichier déposé dans le bucket, présenté au formulaire d'upload"""
+        return RemoteUploadedFile(
+            upload_session.object_key, upload_session.filename, upload_session.size
+        )
+
+    @staticmethod
+    def attach(media_file, uploaded_file):
+        """
+        Enregistre le fichier du portfolio avec l'original encore dans le
+        bucket ; son rapatriement est fait par le worker (voir fetch)
+        """
+        media_file.file = uploaded_file.object_key
+        media_file.file_size = uploaded_file.size
+        media_file.save()
+
+    @staticmethod
+    def fetch(media_file):
+        """
+        Rapatrie l'original depuis le bucket (par blocs, empreinte calculée
+        au passage) puis le supprime du bucket. Comme pour un upload par
+        formulaire (voir MediaBlobService.save_upload), un contenu déjà
+        traité est réutilisé au lieu d'être stocké : renvoie alors True,
+        aucun traitement n'est à lancer
+        """
+        object_key = media_file.file.name
+        storage = DirectUploadService.get_storage()
+        local_path = MediaStorageService.staging_path(os.path.splitext(object_key)[1])
+
+        hasher = hashlib.sha256()
+        size = 0
+        with storage.open(object_key, "rb") as remote, open(local_path, "wb") as local:
+            for chunk in iter(lambda: remote.read(1024 * 1024), b""):
+                hasher.update(chunk)
+                local.write(chunk)
+                size += len(chunk)
+
+        blob = MediaBlobService.acquire(media_file, hasher.hexdigest(), size)
+        source = MediaBlobService.find_source(media_file, blob)
+        if source is not None:
+            os.unlink(local_path)
+            MediaBlobService.reuse(media_file, source)
+            DirectUploadService.delete_object(object_key)
+            return True
+
+        MediaStorageService.save_processed(
+            media_file.file, local_path, os.path.basename(object_key), replace=False
+        )
+        media_file.file_size = size
+        media_file.save(update_fields=["file", "file_size", "blob"])
+
+        DirectUploadService.delete_object(object_key)
+        logger.info(
+            f"Original rapatrié depuis le bucket : {object_key} -> {media_file.file.name}"
+        )
+        return False
+
+    @staticmethod
+    def delete_object(object_key):
+        """Supprime un original du bucket (sans erreur s'il n'existe plus)"""
+        try:
+            DirectUploadService.get_storage().delete(object_key)
+        except Exception as e:
+            logger.warning(f"Impossible de supprimer {object_key} du bucket : {e}")
+
+
+class ProcessingProgressService:
+    """
+    Avancement des traitements, stocké en cache (Redis) sous une forme
+    compacte ("statut:pourcentage"). Le portfolio le consulte via un jeton
+    signé, sans requête en base
+    """
+
+    CACHE_PREFIX = "media-progress"
+    SALT = "media_files.progress"
+    TIMEOUT = 24 * 60 * 60  # 24 heures
+
+    @staticmethod
+    def get_key(media_file):
+        """Identifiant d'un fichier dans les réponses de l'API ("audiofile:12")"""
+        return f"{media_file._meta.model_name}:{media_file.pk}"
+
+    @staticmethod
+    def _cache_key(key):
+        return f"{ProcessingProgressService.CACHE_PREFIX}:{key}"
+
+    @staticmethod
+    def set(media_file, status, percent=0):
+        cache.set(
+            ProcessingProgressService._cache_key(
+                ProcessingProgressService.get_key(media_file)
+            ),
+            f"{status}:{int(percent)}",
+            ProcessingProgressService.TIMEOUT,
+        )
+
+    @staticmethod
+    def step(media_file, start, end):
+        """
+        Callback d'avancement (fraction 0-1) d'une étape couvrant
+        `start`-`end` % du traitement ; n'écrit en cache qu'à chaque
+        changement de pourcentage
+        """
+        last = [None]
+
+        def report(fraction):
+            percent = int(start + (end - start) * fraction)
+            if percent != last[0]:
+                last[0] = percent
+                ProcessingProgressService.set(media_file, "processing", percent)
+
+        report(0)
+        return report
+
+    @staticmethod
+    def get_many(keys):
+        """
+        Statut et pourcentage de chaque fichier. Sans entrée en cache, le
+        fichier est considéré prêt (comme MediaFileBase.processing_status)
+        """
+        cache_keys = {ProcessingProgressService._cache_key(key): key for key in keys}
+        values = cache.get_many(list(cache_keys))
+        result = {}
+        for cache_key, key in cache_keys.items():
+            status, _, percent = values.get(cache_key, "ready:100").partition(":")
+            result[key] = {"status": status, "progress": int(percent or 0)}
+        return result
+
+    @staticmethod
+    def get_token(media_files):
+        """Jeton signé listant les fichiers dont l'avancement peut être suivi"""
+        keys = [ProcessingProgressService.get_key(f) for f in media_files]
+        return signing.dumps(keys, salt=ProcessingProgressService.SALT, compress=True)
+
+    @staticmethod
+    def read_token(token):
+        """Fichiers listés par le jeton ; BadSignature s'il est invalide ou expiré"""
+        return signing.loads(
+            token,
+            salt=ProcessingProgressService.SALT,
+            max_age=ProcessingProgressService.TIMEOUT,
+        )
+
+
+class MediaPipelineService:
+    """
+    Orchestration des traitements asynchrones : la vue enregistre l'original
+    et crée un ProcessingJob, le worker Celery remplace ensuite le fichier
+    par sa version traitée.
+    """
+
+    @staticmethod
+    def enqueue(media_file, task=None):
+        """
+        Crée un traitement "en attente" pour ce fichier et le confie à Celery
+        une fois la transaction validée (par défaut, la tâche de traitement
+        de son modèle)
+        """
+        from .models import ProcessingJob
+        from . import tasks
+
+        task = task or tasks.PROCESSING_TASKS[media_file._meta.model_name]
+        job = ProcessingJob.objects.create(content_object=media_file)
+        ProcessingProgressService.set(media_file, "pending")
+
+        def _send():
+            result = task.delay(job.pk)
+            ProcessingJob.objects.filter(pk=job.pk).update(task_id=result.id or "")
+
+        transaction.on_commit(_send)
+        return job
+
+    @staticmethod
+    def run(job_id, processor):
+        """
+        Exécute `processor(media_file)` pour le traitement donné en tenant
+        à jour son statut
+        """
+        from .models import ProcessingJob
+
+        try:
+            job = ProcessingJob.objects.select_related("content_type").get(pk=job_id)
+        except ProcessingJob.DoesNotExist:
+            logger.warning(f"Traitement introuvable : {job_id}")
+            return None
+
+        media_file = job.content_object
+        if media_file is None:
+            job.mark_failed("Le fichier a été supprimé avant son traitement.")
+            return job.status
+
+        job.mark_processing()
+        ProcessingProgressService.set(media_file, "processing")
+        try:
+            # Upload direct d'un contenu déjà traité : rien à recalculer
+            reused = media_file.is_pending_upload and DirectUploadService.fetch(
+                media_file
+            )
+            if not reused:
+                processor(media_file)
+        except Exception as e:
+            logger.error(f"Erreur lors du traitement {job_id} : {e}")
+            job.mark_failed(str(e))
+            ProcessingProgressService.set(media_file, "failed")
+        else:
+            job.mark_ready()
+            ProcessingProgressService.set(media_file, "ready", 100)
+
+        return job.status
+
+    @staticmethod
+    def _processed_name(field_file, suffix):
+        """Nom du fichier traité, dérivé du nom de l'original"""
+        name, _ = os.path.splitext(os.path.basename(field_file.name))
+        return f"{name}{suffix}"
+
+    @staticmethod
+    def process_audio(audio_file):
+        """
+        Analyse, forme d'onde et watermark (métadonnées pour le MVP) d'un
+        fichier audio
+
+        La loudness est mesurée sur l'original et le gain appliqué dans
+        l'encodage même du watermark : le fichier servi reste une seule
+        génération avec pertes. L'original n'étant pas conservé (contrairement
+        aux vidéos), un nouveau rendu repartirait du MP3 watermarké ; il n'est
+        alors pas renormalisé (voir get_loudness_gain)
+        """
+        metadata = MediaProbeService.probe_and_store(audio_file)
+        audio_file.duration = int(metadata.duration or 0)
+
+        try:
+            MediaPipelineService.store_waveform(audio_file, metadata.duration)
+        except Exception as e:
+            logger.warning(f"Impossible de calculer la forme d'onde ({audio_file.pk}) : {e}")
+
+        try:
+            gain = MediaPipelineService.get_loudness_gain(audio_file, metadata)
+        except Exception as e:
+            gain = None
+            logger.warning(f"Impossible de mesurer la loudness ({audio_file.pk}) : {e}")
+        ProcessingProgressService.set(audio_file, "processing", 30)
+
+        # Le MP3 se prête à une sortie en flux : FFmpeg -> stockage par blocs.
+        # Les rendus AAC (moov atom en tête) sont écrits dans le staging par
+        # la même commande, pour ne décoder la piste qu'une fois
+        preview_window = AudioProcessingService.get_preview_window(metadata.duration)
+        # Noms dérivés de l'original, avant son remplacement
+        renditions = [
+            (kind, MediaPipelineService._processed_name(audio_file.file, suffix))
+            for kind, suffix in (("audio", "_mobile.m4a"), ("preview", "_preview.m4a"))
+        ]
+        mobile_path = MediaStorageService.staging_path(".m4a")
+        preview_path = MediaStorageService.staging_path(".m4a")
+        try:
+            MediaStorageService.save_ffmpeg_output(
+                audio_file.file,
+                MediaPipelineService._processed_name(audio_file.file, "_watermarked.mp3"),
+                AudioProcessingService.build_renditions_output(
+                    audio_file.file.path,
+                    "pipe:",
+                    mobile_path,
+                    preview_path,
+                    preview_window,
+                    gain,
+                ),
+                duration=metadata.duration,
+            )
+        except Exception:
+            for path in (mobile_path, preview_path):
+                os.unlink(path)
+            raise
+        audio_file.save(update_fields=["file", "file_size", "duration"])
+        if gain is not None:
+            MediaPipelineService.store_normalized_loudness(audio_file, metadata, gain)
+        ProcessingProgressService.set(audio_file, "processing", 90)
+
+        bit_rate = int(settings.AUDIO_MOBILE_BITRATE.rstrip("k")) * 1000
+        for (kind, name), path in zip(renditions, (mobile_path, preview_path)):
+            if os.path.getsize(path):
+                MediaPipelineService.store_audio_rendition(
+                    audio_file, kind, path, name, bit_rate
+                )
+            else:
+                os.unlink(path)
+
+    @staticmethod
+    def get_loudness_gain(audio_file, metadata):
+        """
+        Gain de normalisation du fichier audio. La mesure EBU R128 est
+        réutilisée si elle correspond au fichier actuel (nouveau rendu),
+        sinon la passe d'analyse est relancée et enregistrée.
+
+        Aucun gain n'est retourné pour un fichier déjà normalisé : le rendu
+        issu du MP3 watermarké ne doit pas recevoir un second gain
+        """
+        if metadata.loudness_source == audio_file.file.name and metadata.loudness_gain:
+            return None
+
+        if (
+            metadata.loudness_source != audio_file.file.name
+            or metadata.loudness_integrated is None
+        ):
+            measurement = AudioProcessingService.measure_loudness(
+                audio_file.file.path, metadata.duration
+            )
+            for field, value in measurement.items():
+                setattr(metadata, field, value)
+            metadata.loudness_gain = 0
+            metadata.loudness_source = audio_file.file.name
+            metadata.save(
+                update_fields=[
+                    *measurement,
+                    "loudness_gain",
+                    "loudness_source",
+                    "probed_at",
+                ]
+            )
+
+        return AudioProcessingService.get_normalization_gain(
+            metadata.loudness_integrated, metadata.loudness_true_peak
+        )
+
+    @staticmethod
+    def store_normalized_loudness(audio_file, metadata, gain):
+        """
+        Reporte le gain appliqué sur la mesure, qui correspond désormais au
+        fichier servi (l'original, seul mesuré, vient d'être remplacé) : un
+        nouveau rendu n'a pas à le réanalyser
+        """
+        for field in ("loudness_integrated", "loudness_true_peak", "loudness_threshold"):
+            value = getattr(metadata, field)
+            if value is not None:
+                setattr(metadata, field, round(value + gain, 2))
+        metadata.loudness_gain = round((metadata.loudness_gain or 0) + gain, 2)
+        metadata.loudness_source = audio_file.file.name
+        metadata.save(
+            update_fields=[
+                "loudness_integrated",
+                "loudness_true_peak",
+                "loudness_threshold",
+                "loudness_gain",
+                "loudness_source",
+                "probed_at",
+            ]
+        )
+
+    @staticmethod
+    def store_audio_rendition(audio_file, kind, path, name, bit_rate):
+        """Enregistre un rendu audio du staging comme déclinaison du fichier"""
+        from .models import MediaDerivative
+
+        for previous in audio_file.derivatives.filter(kind=kind):
+            previous.delete()
+
+        derivative = MediaDerivative(
+            content_object=audio_file,
+            kind=kind,
+            label=settings.AUDIO_MOBILE_BITRATE,
+            bit_rate=bit_rate,
+            mime_type="audio/mp4",
+            file_size=os.path.getsize(path),
+        )
+        MediaStorageService.save_processed(derivative.file, path, name, replace=False)
+        derivative.save()
+
+    @staticmethod
+    def store_waveform(audio_file, duration):
+        """
+        Calcule les pics de la forme d'onde et les enregistre en JSON
+        (quelques Ko) comme déclinaison du fichier audio
+        """
+        from .models import MediaDerivative
+
+        peaks = AudioProcessingService.compute_waveform_peaks(
+            audio_file.file.path, duration, buckets=settings.AUDIO_WAVEFORM_PEAKS
+        )
+        content = json.dumps(
+            {"duration": duration, "peaks": peaks}, separators=(",", ":")
+        ).encode()
+
+        for previous in audio_file.derivatives.filter(kind="waveform"):
+            previous.delete()
+
+        derivative = MediaDerivative(
+            content_object=audio_file,
+            kind="waveform",
+            label=f"{len(peaks)} pics",
+            mime_type="application/json",
+            file_size=len(content),
+        )
+        derivative.file.save(
+            MediaPipelineService._processed_name(audio_file.file, "_waveform.json"),
+            ContentFile(content),
+            save=False,
+        )
+        derivative.save()
+
+    @staticmethod
+    def process_video(video_file):
+        """
+        Analyse puis encodage en une seule passe (watermark, bitrate cible
+        et miniature) d'un fichier vidéo
+        """
+        update_fields = ["duration"]
+        # Nouveau traitement d'une vidéo déjà servie : repartir de l'original
+        source_path = (video_file.original or video_file.file).path
+        metadata = MediaProbeService.probe_and_store(video_file, source_path)
+        video_file.duration = int(metadata.duration or 0)
+        frame_count = settings.VIDEO_SPRITE_FRAMES if metadata.duration else 1
+        watermark_version = MediaProcessingService.get_current_watermark_version()
+
+        # Le MP4 (moov atom en tête) a besoin d'une sortie seekable : FFmpeg
+        # écrit dans le staging, sur le volume média, puis les fichiers sont
+        # déplacés sans copie
+        staged_path = MediaStorageService.staging_path(".mp4")
+        frames_dir = tempfile.mkdtemp(
+            prefix="frames_", dir=MediaStorageService.get_staging_dir()
+        )
+        try:
+            try:
+                VideoProcessingService.encode_video(
+                    source_path,
+                    staged_path,
+                    frames_dir,
+                    VideoProcessingService.get_target_bitrate(
+                        metadata.duration, metadata.video_bit_rate or metadata.bit_rate
+                    ),
+                    frame_count,
+                    duration=metadata.duration,
+                    progress=ProcessingProgressService.step(video_file, 0, 60),
+                    height=metadata.height,
+                )
+            except Exception as e:
+                os.unlink(staged_path)
+                staged_path = None
+                logger.warning(f"Impossible d'encoder la vidéo ({video_file.pk}) : {e}")
+                # Repli : extraction des images seule si la passe complète a échoué
+                shutil.rmtree(frames_dir)
+                os.makedirs(frames_dir)
+                try:
+                    VideoProcessingService.extract_frames(
+                        source_path, frames_dir, frame_count, metadata.duration
+                    )
+                except Exception as e:
+                    logger.warning(
+                        f"Impossible d'extraire les images ({video_file.pk}) : {e}"
+                    )
+
+            try:
+                if MediaPipelineService.store_frames(
+                    video_file, frames_dir, metadata.duration
+                ):
+                    update_fields.append("thumbnail")
+            except Exception as e:
+                logger.warning(
+                    f"Impossible de générer la miniature ({video_file.pk}) : {e}"
+                )
+        finally:
+            shutil.rmtree(frames_dir, ignore_errors=True)
+
+        video_file.save(update_fields=update_fields)
+        if staged_path:
+            MediaPipelineService.store_watermarked(
+                video_file, staged_path, watermark_version
+            )
+
+        # Rendus HLS à partir de la version servie (watermarkée)
+        try:
+            MediaPipelineService.package_hls(video_file, metadata)
+        except Exception as e:
+            logger.warning(f"Impossible de générer les rendus HLS ({video_file.pk}) : {e}")
+
+    @staticmethod
+    def store_watermarked(video_file, staged_path, watermark_version):
+        """
+        Remplace la version servie par la vidéo watermarkée du staging.
+        L'original uploadé est conservé (non servi) pour pouvoir réappliquer
+        un nouveau watermark ; seule une ancienne version servie est supprimée
+        """
+        previous = video_file.file.name
+        MediaStorageService.save_processed(
+            video_file.file,
+            staged_path,
+            MediaPipelineService._processed_name(
+                video_file.original or video_file.file, "_watermarked.mp4"
+            ),
+            replace=False,
+        )
+        stale = previous if video_file.original else None
+        if not video_file.original:
+            video_file.original = previous
+        video_file.has_watermark = True
+        video_file.watermark_version = watermark_version
+        video_file.save(
+            update_fields=[
+                "file",
+                "file_size",
+                "original",
+                "has_watermark",
+                "watermark_version",
+            ]
+        )
+
+        # Version servie partagée entre doublons : seulement à la dernière référence
+        if stale and not MediaBlobService.is_referenced(stale):
+            video_file.file.storage.delete(stale)
+
+    @staticmethod
+    def rewatermark_video(video_file):
+        """
+        Réapplique le watermark courant à partir de l'original conservé :
+        nouvel encodage et nouveaux rendus HLS (affiche et vignettes,
+        extraites de l'original, restent inchangées)
+        """
+        if not video_file.original:
+            raise RuntimeError("Original non conservé : impossible de réappliquer le watermark.")
+
+        metadata = MediaProbeService.probe_and_store(video_file, video_file.original.path)
+        watermark_version = MediaProcessingService.get_current_watermark_version()
+        staged_path = MediaStorageService.staging_path(".mp4")
+        try:
+            VideoProcessingService.encode_video(
+                video_file.original.path,
+                staged_path,
+                None,
+                VideoProcessingService.get_target_bitrate(
+                    metadata.duration, metadata.video_bit_rate or metadata.bit_rate
+                ),
+                frame_count=0,
+                duration=metadata.duration,
+                progress=ProcessingProgressService.step(video_file, 0, 60),
+                height=metadata.height,
+            )
+        except Exception:
+            os.unlink(staged_path)
+            raise
+        MediaPipelineService.store_watermarked(video_file, staged_path, watermark_version)
+        MediaPipelineService.package_hls(video_file, metadata)
+
+    @staticmethod
+    def schedule_rewatermark():
+        """
+        Confie à Celery le nouveau rendu des vidéos marquées avec une autre
+        version du watermark (et dont l'original a été conservé). Retourne
+        le nombre de vidéos planifiées
+        """
+        from .models import VideoFile
+        from . import tasks
+
+        watermark_version = MediaProcessingService.get_current_watermark_version()
+        # Un seul planificateur par version, quel que soit le nombre de workers
+        if not cache.add(f"media-watermark:{watermark_version}", True, 60 * 60):
+            return 0
+
+        videos = (
+            VideoFile.objects.filter(has_watermark=True)
+            .exclude(original="")
+            .exclude(original__isnull=True)
+            .exclude(watermark_version=watermark_version)
+            .exclude(processing_jobs__status__in=["pending", "processing"])
+        )
+        count = 0
+        for video_file in videos.iterator():
+            MediaPipelineService.enqueue(video_file, tasks.rewatermark_video_file)
+            count += 1
+
+        if count:
+            logger.info(f"Watermark {watermark_version} : {count} vidéo(s) à réencoder")
+        return count
+
+    @staticmethod
+    def store_frames(video_file, frames_dir, duration):
+        """
+        Choisit l'affiche parmi les images extraites (voir score_frame) et
+        enregistre la planche de vignettes et son index WebVTT. Retourne
+        True si la miniature a été remplacée
+        """
+        frame_paths = sorted(
+            os.path.join(frames_dir, name)
+            for name in os.listdir(frames_dir)
+            if name.endswith(".jpg") and os.path.getsize(os.path.join(frames_dir, name))
+        )
+        if not frame_paths:
+            return False
+
+        if duration and len(frame_paths) > 1:
+            MediaPipelineService.store_sprite(video_file, frame_paths, duration)
+
+        poster_path = max(frame_paths, key=VideoProcessingService.score_frame)
+        MediaStorageService.save_processed(
+            video_file.thumbnail,
+            poster_path,
+            MediaPipelineService._processed_name(video_file.file, "_thumb.jpg"),
+        )
+        return True
+
+    @staticmethod
+    def store_sprite(video_file, frame_paths, duration):
+        """
+        Enregistre la planche de vignettes (JPEG) et son index WebVTT comme
+        déclinaisons de la vidéo
+        """
+        from .models import MediaDerivative
+
+        columns = settings.VIDEO_SPRITE_COLUMNS
+        sprite_path = MediaStorageService.staging_path(".jpg")
+        try:
+            tile_width, tile_height = VideoProcessingService.build_sprite(
+                frame_paths, sprite_path, columns, settings.VIDEO_SPRITE_TILE_WIDTH
+            )
+        except Exception:
+            os.unlink(sprite_path)
+            raise
+
+        for previous in video_file.derivatives.filter(kind__in=["sprite", "vtt"]):
+            previous.delete()
+
+        with Image.open(sprite_path) as sprite_image:
+            width, height = sprite_image.size
+        sprite = MediaDerivative(
+            content_object=video_file,
+            kind="sprite",
+            label=f"{len(frame_paths)} vignettes",
+            width=width,
+            height=height,
+            mime_type="image/jpeg",
+            file_size=os.path.getsize(sprite_path),
+        )
+        MediaStorageService.save_processed(
+            sprite.file,
+            sprite_path,
+            MediaPipelineService._processed_name(video_file.file, "_sprite.jpg"),
+            replace=False,
+        )
+        sprite.save()
+
+        # Les vignettes sont référencées relativement à l'index (même dossier)
+        content = VideoProcessingService.build_sprite_vtt(
+            os.path.basename(sprite.file.name),
+            duration,
+            VideoProcessingService.get_frame_interval(
+                duration, settings.VIDEO_SPRITE_FRAMES
+            ),
+            len(frame_paths),
+            columns,
+            tile_width,
+            tile_height,
+        ).encode()
+        vtt = MediaDerivative(
+            content_object=video_file,
+            kind="vtt",
+            label=f"{tile_width}x{tile_height}",
+            width=tile_width,
+            height=tile_height,
+            mime_type="text/vtt",
+            file_size=len(content),
+        )
+        vtt.file.save(
+            MediaPipelineService._processed_name(video_file.file, "_sprite.vtt"),
+            ContentFile(content),
+            save=False,
+        )
+        vtt.save()
+
+    @staticmethod
+    def package_hls(video_file, metadata):
+        """
+        Génère l'échelle de rendus HLS d'une vidéo et l'enregistre comme
+        déclinaison, à côté de l'original
+        """
+        from .models import MediaDerivative
+
+        renditions = VideoProcessingService.get_hls_renditions(metadata.height)
+        output_dir = os.path.join(
+            MediaStorageService.get_staging_dir(), f"hls_{uuid.uuid4().hex}"
+        )
+        try:
+            VideoProcessingService.package_hls(
+                video_file.file.path,
+                output_dir,
+                renditions,
+                has_audio=metadata.has_audio,
+                duration=metadata.duration,
+                progress=ProcessingProgressService.step(video_file, 60, 100),
+            )
+            prefix = timezone.now().strftime(
+                f"media/video/hls/%Y/%m/{video_file.pk}_{uuid.uuid4().hex[:8]}"
+            )
+            MediaStorageService.save_directory(output_dir, prefix)
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+        # Une seule playlist par vidéo : remplacer l'éventuelle précédente
+        for previous in video_file.derivatives.filter(kind="hls"):
+            previous.delete()
+
+        MediaDerivative.objects.create(
+            content_object=video_file,
+            kind="hls",
+            label=" / ".join(r["name"] for r in renditions),
+            file=f"{prefix}/master.m3u8",
+            height=renditions[-1]["height"],
+        )
+
+    @staticmethod
+    def process_photo(photo_file):
+        """Optimisation d'une photo (redimensionnement et compression)"""
+        old_name = photo_file.file.name
+
+        staged_path = MediaStorageService.staging_path(".jpg")
+        optimized_path = ImageProcessingService.optimize_image(
+            photo_file.file.path, staged_path
+        )
+        if not optimized_path:
+            os.unlink(staged_path)
+            raise RuntimeError("L'optimisation de l'image a échoué.")
+
+        MediaStorageService.save_processed(
+            photo_file.file,
+            optimized_path,
+            MediaPipelineService._processed_name(photo_file.file, "_optimized.jpg"),
+        )
+        photo_file.save(update_fields=["file", "file_size"])
+
+        try:
+            MediaPipelineService.generate_image_variants(photo_file, photo_file.file)
+        except Exception as e:
+            logger.warning(f"Impossible de générer les variantes ({photo_file.pk}) : {e}")
+
+        # La photo de profil pointait sur l'original qui vient d'être remplacé
+        # (ses variantes sont régénérées par le signal post_save)
+        artist = photo_file.artist
+        if artist.profile_picture and artist.profile_picture.name == old_name:
+            artist.profile_picture = photo_file.file.name
+            artist.save(update_fields=["profile_picture"])
+
+    @staticmethod
+    def process_document(document_file):
+        """
+        Nombre de pages, aperçu de la première page (et ses variantes
+        responsive) et linéarisation d'un document PDF
+        """
+        update_fields = ["page_count", "is_linearized"]
+        try:
+            info = DocumentProcessingService.get_info(document_file.file.path)
+        except Exception as e:
+            info = {"page_count": None, "is_linearized": False}
+            logger.warning(f"Impossible d'analyser le document ({document_file.pk}) : {e}")
+        document_file.page_count = info["page_count"]
+
+        preview_path = MediaStorageService.staging_path(".png")
+        try:
+            preview_path = DocumentProcessingService.render_first_page(
+                document_file.file.path,
+                preview_path,
+                settings.DOCUMENT_PREVIEW_WIDTH,
+            )
+            MediaStorageService.save_processed(
+                document_file.thumbnail,
+                preview_path,
+                MediaPipelineService._processed_name(document_file.file, "_preview.png"),
+            )
+            update_fields.append("thumbnail")
+        except Exception as e:
+            if os.path.exists(preview_path):
+                os.unlink(preview_path)
+            logger.warning(f"Impossible de générer l'aperçu ({document_file.pk}) : {e}")
+
+        if not info["is_linearized"]:
+            staged_path = MediaStorageService.staging_path(".pdf")
+            try:
+                DocumentProcessingService.linearize(document_file.file.path, staged_path)
+            except Exception as e:
+                os.unlink(staged_path)
+                logger.warning(
+                    f"Impossible de linéariser le document ({document_file.pk}) : {e}"
+                )
+            else:
+                MediaStorageService.save_processed(
+                    document_file.file,
+                    staged_path,
+                    MediaPipelineService._processed_name(document_file.file, "_web.pdf"),
+                )
+                info["is_linearized"] = True
+                update_fields += ["file", "file_size"]
+        document_file.is_linearized = info["is_linearized"]
+
+        document_file.save(update_fields=update_fields)
+
+        if document_file.thumbnail:
+            try:
+                MediaPipelineService.generate_image_variants(
+                    document_file, document_file.thumbnail
+                )
+            except Exception as e:
+                logger.warning(
+                    f"Impossible de générer les variantes ({document_file.pk}) : {e}"
+                )
+
+    @staticmethod
+    def generate_image_variants(owner, image):
+        """
+        (Re)génère les variantes responsive de `image` et les rattache à
+        `owner` (PhotoFile, DocumentFile, ArtistProfile) en remplaçant les
+        précédentes
+        """
+        from .models import MediaDerivative
+
+        name, _ = os.path.splitext(os.path.basename(image.name))
+        variants = ImageProcessingService.create_variants(
+            image.path, settings.IMAGE_VARIANT_WIDTHS
+        )
+
+        for previous in owner.derivatives.filter(kind="image"):
+            previous.delete()
+
+        for variant in variants:
+            derivative = MediaDerivative(
+                content_object=owner,
+                kind="image",
+                label=f"{variant['width']}w",
+                width=variant["width"],
+                height=variant["height"],
+                mime_type=variant["mime_type"],
+                file_size=os.path.getsize(variant["path"]),
+            )
+            MediaStorageService.save_processed(
+                derivative.file,
+                variant["path"],
+                f"{name}_{variant['width']}w{variant['suffix']}",
+                replace=False,
+            )
+            derivative.save()
+
+    @staticmethod
+    def refresh_profile_picture_variants(artist_id):
+        """Régénère (ou supprime) les variantes de la photo de profil d'un artiste"""
+        from apps.accounts.models import ArtistProfile
+
+        artist = ArtistProfile.objects.filter(pk=artist_id).first()
+        if artist is None:
+            return
+
+        if not artist.profile_picture:
+            for previous in artist.derivatives.filter(kind="image"):
+                previous.delete()
+            return
+
+        if not artist.profile_picture.storage.exists(artist.profile_picture.name):
+            # Fichier remplacé entre-temps : le traitement suivant s'en charge
+            logger.warning(f"Photo de profil introuvable : {artist.profile_picture.name}")
+            return
+
+        MediaPipelineService.generate_image_variants(artist, artist.profile_picture)
+
+
 class QuotaService:
     """Service pour la gestion des quotas de fichiers"""
 
@@ -0,0 +1,73 @@
+"""
+Signaux de l'application media_files
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.accounts.models import ArtistProfile
+
+from .models import AudioFile, DocumentFile, MediaDerivative, PhotoFile, VideoFile
+from .services import MediaAccessService, MediaBlobService
+
+
+@receiver(post_delete, sender=MediaDerivative)
+def delete_derivative_files(sender, instance, **kwargs):
+    """Supprime les fichiers d'une déclinaison (y compris lors des suppressions en cascade)"""
+    # Déclinaisons partagées entre doublons : seulement à la dernière référence
+    if instance.file and not MediaBlobService.is_referenced(instance.file.name):
+        instance.delete_files()
+
+
+@receiver(post_delete, sender=AudioFile)
+@receiver(post_delete, sender=VideoFile)
+@receiver(post_delete, sender=PhotoFile)
+@receiver(post_delete, sender=DocumentFile)
+def release_media_file(sender, instance, **kwargs):
+    """Libère le contenu d'un fichier supprimé (fichiers stockés orphelins inclus)"""
+    MediaBlobService.release(instance)
+
+
+@receiver(post_save, sender=AudioFile)
+@receiver(post_save, sender=VideoFile)
+@receiver(post_save, sender=PhotoFile)
+@receiver(post_save, sender=DocumentFile)
+@receiver(post_delete, sender=AudioFile)
+@receiver(post_delete, sender=VideoFile)
+@receiver(post_delete, sender=PhotoFile)
+@receiver(post_delete, sender=DocumentFile)
+def invalidate_media_access(sender, instance, **kwargs):
+    """Oublie les autorisations en cache (activation, remplacement, suppression)"""
+    MediaAccessService.invalidate(instance)
+
+
+@receiver(pre_save, sender=ArtistProfile)
+def detect_profile_picture_change(sender, instance, update_fields=None, **kwargs):
+    """Repère un changement de photo de profil avant l'enregistrement"""
+    if update_fields is not None and "profile_picture" not in update_fields:
+        instance._profile_picture_changed = False
+        return
+
+    previous = (
+        ArtistProfile.objects.filter(pk=instance.pk)
+        .values_list("profile_picture", flat=True)
+        .first()
+        if instance.pk
+        else None
+    )
+    instance._profile_picture_changed = (previous or "") != (
+        instance.profile_picture.name or ""
+    )
+
+
+@receiver(post_save, sender=ArtistProfile)
+def generate_profile_picture_variants(sender, instance, **kwargs):
+    """Confie la génération des variantes de la nouvelle photo de profil à Celery"""
+    if not getattr(instance, "_profile_picture_changed", False):
+        return
+
+    from .tasks import generate_profile_picture_variants as task
+
+    artist_id = instance.pk
+    transaction.on_commit(lambda: task.delay(artist_id))
@@ -0,0 +1,90 @@
+"""
+Tâches Celery pour le traitement asynchrone des fichiers multimédia
+"""
+
+from celery import shared_task
+from celery.signals import worker_init, worker_ready
+
+from .services import ChunkedUploadService, MediaPipelineService, MediaProcessingService
+
+
+# Limites de temps par file (la limite globale vaut pour les autres tâches) ;
+# chaque commande FFmpeg a en plus son propre budget (voir FFmpegRunner)
+FAST_TASK_LIMITS = {"soft_time_limit": 15 * 60, "time_limit": 16 * 60}
+HEAVY_TASK_LIMITS = {
+    "soft_time_limit": 3 * 60 * 60,
+    "time_limit": 3 * 60 * 60 + 60,
+    "acks_late": True,
+}
+
+
+@shared_task(**FAST_TASK_LIMITS)
+def process_audio_file(job_id):
+    """Traite un fichier audio uploadé (durée, watermark)"""
+    return MediaPipelineService.run(job_id, MediaPipelineService.process_audio)
+
+
+@shared_task(**HEAVY_TASK_LIMITS)
+def process_video_file(job_id):
+    """Traite un fichier vidéo uploadé (durée, miniature, watermark)"""
+    return MediaPipelineService.run(job_id, MediaPipelineService.process_video)
+
+
+@shared_task(**HEAVY_TASK_LIMITS)
+def rewatermark_video_file(job_id):
+    """Réapplique le watermark courant à une vidéo (à partir de son original)"""
+    return MediaPipelineService.run(job_id, MediaPipelineService.rewatermark_video)
+
+
+@shared_task
+def rewatermark_videos():
+    """Planifie le nouveau rendu des vidéos marquées avec un ancien watermark"""
+    return MediaPipelineService.schedule_rewatermark()
+
+
+@shared_task(**FAST_TASK_LIMITS)
+def process_photo_file(job_id):
+    """Optimise une photo uploadée"""
+    return MediaPipelineService.run(job_id, MediaPipelineService.process_photo)
+
+
+@shared_task(**FAST_TASK_LIMITS)
+def process_document_file(job_id):
+    """Traite un document PDF uploadé (aperçu, pages, linéarisation)"""
+    return MediaPipelineService.run(job_id, MediaPipelineService.process_document)
+
+
+@shared_task(**FAST_TASK_LIMITS)
+def generate_profile_picture_variants(artist_id):
+    """Génère les variantes responsive de la photo de profil d'un artiste"""
+    MediaPipelineService.refresh_profile_picture_variants(artist_id)
+
+
+@shared_task
+def cleanup_upload_sessions():
+    """Supprime les uploads par morceaux abandonnés (et leurs fichiers)"""
+    return ChunkedUploadService.cleanup_expired()
+
+
+# Tâche de traitement associée à chaque modèle (clé : model_name)
+PROCESSING_TASKS = {
+    "audiofile": process_audio_file,
+    "videofile": process_video_file,
+    "photofile": process_photo_file,
+    "documentfile": process_document_file,
+}
+
+
+@worker_init.connect
+def prepare_watermarks(**kwargs):
+    """
+    Rend et valide le watermark une seule fois, avant la création des
+    processus du worker (qui héritent du cache)
+    """
+    MediaProcessingService.prepare_watermarks()
+
+
+@worker_ready.connect
+def schedule_rewatermark(**kwargs):
+    """Un watermark modifié (nouvelle version) déclenche le réencodage des vidéos"""
+    rewatermark_videos.delay()
@@ -3,6 +3,9 @@ Filtres de template pour les fichiers média
 """
 
 from django import template
+from django.utils.html import format_html, format_html_join
+
+from ..services import MediaAccessService, ThumbnailService
 
 register = template.Library()
 
@@ -96,4 +99,68 @@ def file_type_badge(obj):
     elif class_name == 'DocumentFile':
         return '<span class="px-2 py-1 bg-orange-100 text-orange-800 text-xs rounded-full">Document</span>'
     else:
-        return '<span class="px-2 py-1 bg-gray-100 text-gray-800 text-xs rounded-full">Fichier</span>' 
\ No newline at end of file
+        return '<span class="px-2 py-1 bg-gray-100 text-gray-800 text-xs rounded-full">Fichier</span>' 
+
+
+@register.filter
+def thumbnail_url(image, size):
+    """
+    URL signée d'une miniature générée à la demande
+    Usage: {{ photo.file|thumbnail_url:"300x200" }} (0 = dimension libre)
+    """
+    if not image:
+        return ""
+    width, _, height = str(size).partition("x")
+    return ThumbnailService.get_url(image.name, int(width), int(height or 0))
+
+
+@register.filter
+def signed_url(media_file):
+    """
+    Lien à durée limitée vers un fichier média, valable même s'il est désactivé
+    Usage: {{ audio.file|signed_url }}
+    """
+    if not media_file:
+        return ""
+    return MediaAccessService.get_signed_url(media_file.name)
+
+
+@register.simple_tag
+def responsive_image(obj, image, sizes="100vw", **attrs):
+    """
+    Génère une balise <picture> (WebP + JPEG en srcset) à partir des
+    variantes d'images de `obj`, ou une simple <img> en leur absence
+    Usage: {% responsive_image artist artist.profile_picture sizes="64px" class="h-16 w-16" alt=artist.get_display_name %}
+    Penser au prefetch_related("derivatives") dans les listes
+    """
+    if not image:
+        return ""
+
+    srcsets = {}
+    # .all() pour profiter d'un éventuel prefetch_related("derivatives")
+    for variant in obj.derivatives.all():
+        if variant.kind == "image":
+            srcsets.setdefault(variant.mime_type, []).append(
+                f"{variant.file.url} {variant.width}w"
+            )
+
+    img_attrs = format_html_join(
+        " ", '{}="{}"', ((key.replace("_", "-"), value) for key, value in attrs.items())
+    )
+    if not srcsets:
+        return format_html('<img src="{}" {}>', image.url, img_attrs)
+
+    return format_html(
+        '<picture class="contents">{}<img src="{}" srcset="{}" sizes="{}" {}></picture>',
+        format_html(
+            '<source type="image/webp" srcset="{}" sizes="{}">',
+            ", ".join(srcsets["image/webp"]),
+            sizes,
+        )
+        if "image/webp" in srcsets
+        else "",
+        image.url,
+        ", ".join(srcsets.get("image/jpeg", [])),
+        sizes,
+        img_attrs,
+    )
@@ -1,3 +1,514 @@
-from django.test import TestCase
+import io
+import logging
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from apps.accounts.models import ArtistProfile, User
+
+from .models import AudioFile, MediaBlob, MediaMetadata, PhotoFile, UploadSession
+from .services import (
+    AudioProcessingService,
+    ChunkedUploadService,
+    ImageProcessingService,
+    MediaAccessService,
+    MediaPipelineService,
+    ProcessingProgressService,
+    ThumbnailService,
+    UploadOffsetMismatch,
+)
+
+
+def make_artist(email):
+    user = User.objects.create_user(
+        email=email,
+        password="motdepasse123",
+        first_name="Jean",
+        last_name="Dupont",
+        user_type="artist",
+    )
+    return ArtistProfile.objects.create(user=user)
+
+
+def make_image(width=800, height=600, color="red"):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buffer, "JPEG")
+    return SimpleUploadedFile("concert.jpg", buffer.getvalue(), "image/jpeg")
+
+
+class MediaTestCase(TestCase):
+    """
+    Stockage et cache des miniatures dans un dossier temporaire (rien n'est
+    écrit dans le dépôt), journaux coupés, cache vidé, artiste connecté
+    """
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(
+            MEDIA_ROOT=media_root,
+            MEDIA_THUMBNAIL_CACHE_DIR=f"{media_root}/thumbnails",
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+        cache.clear()
+        self.artist = make_artist("artiste@example.com")
+        self.client.force_login(self.artist.user)
+
+    def upload_photo(self, image=None, title="Concert"):
+        """Upload par la vue ; le traitement (Celery eager) suit le commit"""
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("media_files:upload_photo"),
+                {"title": title, "file": image or make_image()},
+            )
+        self.assertEqual(response.status_code, 302)
+        return PhotoFile.objects.filter(title=title).latest("pk")
+
+
+class ProcessingJobTests(MediaTestCase):
+    def test_upload_runs_job_to_ready(self):
+        photo = self.upload_photo()
+
+        job = photo.get_processing_job()
+        self.assertEqual(job.status, "ready")
+        self.assertIsNotNone(job.started_at)
+        self.assertIsNotNone(job.completed_at)
+        self.assertEqual(photo.processing_status, "ready")
+        key = ProcessingProgressService.get_key(photo)
+        progress = ProcessingProgressService.get_many([key])[key]
+        self.assertEqual(progress, {"status": "ready", "progress": 100})
+
+    def test_job_pending_until_commit(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.client.post(
+                reverse("media_files:upload_photo"),
+                {"title": "Concert", "file": make_image()},
+            )
+        photo = PhotoFile.objects.get()
+        self.assertEqual(photo.get_processing_job().status, "pending")
+        self.assertEqual(len(callbacks), 1)
+
+    def test_failed_processor(self):
+        photo = self.upload_photo()
+        job = MediaPipelineService.enqueue(photo)
+
+        def processor(media_file):
+            raise RuntimeError("Fichier illisible")
+
+        self.assertEqual(MediaPipelineService.run(job.pk, processor), "failed")
+        job.refresh_from_db()
+        self.assertEqual(job.error_message, "Fichier illisible")
+        self.assertIsNotNone(job.completed_at)
+        self.assertEqual(photo.processing_status, "failed")
+
+    def test_deleted_file(self):
+        photo = self.upload_photo()
+        job = MediaPipelineService.enqueue(photo)
+        photo.delete()
+
+        # Traitements supprimés avec le fichier : la tâche ne fait rien
+        def processor(media_file):
+            self.fail("Fichier supprimé traité")
+
+        self.assertIsNone(MediaPipelineService.run(job.pk, processor))
+
+
+class ProcessingProgressTests(MediaTestCase):
+    def test_progress_api(self):
+        photo = self.upload_photo()
+        ProcessingProgressService.step(photo, 20, 60)(0.5)
+        token = ProcessingProgressService.get_token([photo])
+
+        # Jeton seul : pas d'authentification requise
+        self.client.logout()
+        url = reverse("media_files:api_progress")
+        response = self.client.get(url, {"token": token})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["files"],
+            {f"photofile:{photo.pk}": {"status": "processing", "progress": 40}},
+        )
+        self.assertIn("no-store", response["Cache-Control"])
+
+    def test_invalid_token(self):
+        response = self.client.get(
+            reverse("media_files:api_progress"), {"token": "falsifié"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class LoudnessNormalizationTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.audio_file = AudioFile.objects.create(
+            artist=self.artist,
+            title="Makossa",
+            file=ContentFile(b"wav", name="morceau.wav"),
+        )
+        self.metadata = MediaMetadata.objects.create(
+            audio_file=self.audio_file,
+            duration=180,
+            loudness_integrated=-20.0,
+            loudness_true_peak=-10.0,
+            loudness_gain=0,
+            loudness_source=self.audio_file.file.name,
+        )
+
+    def test_gain_capped_by_true_peak(self):
+        gain = AudioProcessingService.get_normalization_gain
+        self.assertEqual(gain(-20.0, -10.0), 6.0)
+        self.assertEqual(gain(-20.0, -3.0), 2.0)
+        self.assertIsNone(gain(None, None))
+
+    def test_gain_applied_once_before_split(self):
+        args = AudioProcessingService.build_renditions_output(
+            "morceau.wav", "pipe:", "mobile.m4a", "extrait.m4a", (30, 30), 6.0
+        ).compile()
+        graph = args[args.index("-filter_complex") + 1]
+        self.assertEqual(graph.count("volume=6.0dB"), 1)
+        self.assertIn("asplit=3", graph)
+
+        args = AudioProcessingService.build_renditions_output(
+            "morceau.wav", "pipe:", "mobile.m4a"
+        ).compile()
+        self.assertNotIn("volume", " ".join(args))
+
+    def test_measurement_reused_then_not_renormalized(self):
+        with mock.patch.object(AudioProcessingService, "measure_loudness") as measure:
+            gain = MediaPipelineService.get_loudness_gain(
+                self.audio_file, self.metadata
+            )
+            self.assertEqual(gain, 6.0)
+            measure.assert_not_called()
+
+            # Le fichier servi porte désormais le gain : pas de second gain
+            MediaPipelineService.store_normalized_loudness(
+                self.audio_file, self.metadata, gain
+            )
+            self.metadata.refresh_from_db()
+            self.assertEqual(self.metadata.loudness_integrated, -14.0)
+            self.assertIsNone(
+                MediaPipelineService.get_loudness_gain(self.audio_file, self.metadata)
+            )
+            measure.assert_not_called()
+
+    def test_new_file_measured(self):
+        self.metadata.loudness_source = "media/audio/ancien.wav"
+        measurement = {
+            "loudness_integrated": -10.0,
+            "loudness_true_peak": -0.5,
+            "loudness_range": 4.0,
+            "loudness_threshold": -20.0,
+        }
+        with mock.patch.object(
+            AudioProcessingService, "measure_loudness", return_value=measurement
+        ):
+            gain = MediaPipelineService.get_loudness_gain(
+                self.audio_file, self.metadata
+            )
+        self.assertEqual(gain, -4.0)
+        self.metadata.refresh_from_db()
+        self.assertEqual(self.metadata.loudness_source, self.audio_file.file.name)
+        self.assertEqual(self.metadata.loudness_integrated, -10.0)
+
+
+class DerivativeTests(MediaTestCase):
+    def test_photo_optimized_with_variants(self):
+        photo = self.upload_photo(make_image(800, 600))
+
+        self.assertTrue(photo.file.name.endswith("_optimized.jpg"))
+        variants = photo.derivatives.filter(kind="image")
+        # Largeurs inférieures à l'original, chacune en JPEG et en WebP
+        self.assertCountEqual(
+            variants.values_list("width", "mime_type"),
+            [
+                (width, mime_type)
+                for width in (128, 384, 768)
+                for mime_type in ("image/jpeg", "image/webp")
+            ],
+        )
+        for variant in variants:
+            self.assertTrue(default_storage.exists(variant.file.name))
+            self.assertEqual(variant.height, round(600 * variant.width / 800))
+
+    def test_small_photo_keeps_one_variant(self):
+        photo = self.upload_photo(make_image(100, 100))
+        self.assertEqual(set(photo.derivatives.values_list("width", flat=True)), {100})
+
+    def test_transparency_flattened_on_white(self):
+        for mode in ("RGBA", "LA", "P", "L"):
+            rgb = ImageProcessingService._to_rgb(Image.new(mode, (4, 4)))
+            self.assertEqual(rgb.mode, "RGB")
+        rgba = Image.new("RGBA", (4, 4), (0, 0, 0, 0))
+        self.assertEqual(
+            ImageProcessingService._to_rgb(rgba).getpixel((0, 0)), (255, 255, 255)
+        )
+
+
+class MediaBlobTests(MediaTestCase):
+    def test_duplicate_reuses_processed_file(self):
+        first = self.upload_photo(title="Premier")
+        second = self.upload_photo(title="Doublon")
+
+        self.assertEqual(second.file.name, first.file.name)
+        self.assertEqual(second.blob_id, first.blob_id)
+        self.assertEqual(MediaBlob.objects.get().ref_count, 2)
+        # Aucun traitement relancé ; déclinaisons reprises telles quelles
+        self.assertIsNone(second.get_processing_job())
+        self.assertCountEqual(
+            second.derivatives.values_list("file", flat=True),
+            first.derivatives.values_list("file", flat=True),
+        )
+
+    def test_different_content_not_shared(self):
+        first = self.upload_photo(make_image(color="red"), title="Rouge")
+        second = self.upload_photo(make_image(color="blue"), title="Bleu")
+
+        self.assertNotEqual(second.file.name, first.file.name)
+        self.assertEqual(MediaBlob.objects.count(), 2)
+
+    def test_release_deletes_last_reference(self):
+        first = self.upload_photo(title="Premier")
+        second = self.upload_photo(title="Doublon")
+        names = [first.file.name, *first.derivatives.values_list("file", flat=True)]
+
+        first.delete()
+        self.assertEqual(MediaBlob.objects.get().ref_count, 1)
+        for name in names:
+            self.assertTrue(default_storage.exists(name))
+
+        second.delete()
+        self.assertFalse(MediaBlob.objects.exists())
+        for name in names:
+            self.assertFalse(default_storage.exists(name))
+
+
+class ChunkedUploadTests(MediaTestCase):
+    def create_session(self, size=10):
+        response = self.client.post(
+            reverse("media_files:chunked_upload_create"),
+            {"media_type": "audio", "filename": "morceau.mp3", "size": size},
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def send(self, url, data, offset):
+        return self.client.patch(
+            url,
+            data,
+            content_type="application/offset+octet-stream",
+            HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def test_chunks_advance_offset(self):
+        session = self.create_session(size=10)
+
+        response = self.send(session["url"], b"01234", 0)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Upload-Offset"], "5")
+        response = self.send(session["url"], b"56789", 5)
+        self.assertTrue(response.json()["complete"])
+
+        upload_session = UploadSession.objects.get()
+        with open(ChunkedUploadService.get_path(upload_session), "rb") as part:
+            self.assertEqual(part.read(), b"0123456789")
+
+    def test_offset_mismatch(self):
+        session = self.create_session()
+        self.send(session["url"], b"01234", 0)
+
+        # Morceau déjà reçu renvoyé, ou morceau en avance : offset attendu
+        for offset in (0, 8):
+            response = self.send(session["url"], b"56789", offset)
+            self.assertEqual(response.status_code, 409)
+            self.assertEqual(response["Upload-Offset"], "5")
+        self.assertEqual(UploadSession.objects.get().offset, 5)
+
+    def test_resume_after_interrupted_chunk(self):
+        session = self.create_session()
+        upload_session = UploadSession.objects.get()
+        with open(ChunkedUploadService.get_path(upload_session), "wb") as part:
+            part.write(b"012")  # morceau interrompu : offset inchangé
+
+        self.assertEqual(self.client.get(session["url"]).json()["offset"], 0)
+        self.send(session["url"], b"01234", 0)
+        with open(ChunkedUploadService.get_path(upload_session), "rb") as part:
+            self.assertEqual(part.read(), b"01234")
+
+    def test_invalid_chunks(self):
+        session = self.create_session(size=4)
+        response = self.client.patch(
+            session["url"], b"0123", content_type="application/offset+octet-stream"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.send(session["url"], b"01234", 0).status_code, 413)
+        self.assertEqual(UploadSession.objects.get().offset, 0)
+
+    def test_other_artist_session(self):
+        session = self.create_session()
+        self.client.force_login(make_artist("autre@example.com").user)
+        self.assertEqual(self.send(session["url"], b"01234", 0).status_code, 404)
+
+    def test_discard(self):
+        session = self.create_session()
+        path = ChunkedUploadService.get_path(UploadSession.objects.get())
+
+        self.assertEqual(self.client.delete(session["url"]).status_code, 204)
+        self.assertFalse(UploadSession.objects.exists())
+        self.assertFalse(os.path.exists(path))
+
+    def test_concurrent_chunk_refused(self):
+        self.create_session()
+        stale = UploadSession.objects.get()
+        upload_session = UploadSession.objects.get()
+        ChunkedUploadService.append(upload_session, 0, io.BytesIO(b"01234"))
+
+        # Même morceau envoyé en parallèle : l'offset a déjà avancé
+        with self.assertRaises(UploadOffsetMismatch) as raised:
+            ChunkedUploadService.append(stale, 0, io.BytesIO(b"01234"))
+        self.assertEqual(raised.exception.offset, 5)
+        self.assertEqual(UploadSession.objects.get().offset, 5)
+
+
+
+class ThumbnailCacheTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = "media/photos/concert.jpg"
+        source_path = os.path.join(settings.MEDIA_ROOT, self.path)
+        os.makedirs(os.path.dirname(source_path))
+        Image.new("RGB", (800, 600), "red").save(source_path, "JPEG")
+
+    def test_cache_walked_only_over_limit(self):
+        with mock.patch.object(
+            ThumbnailService, "evict", wraps=ThumbnailService.evict
+        ) as evict:
+            # Premier appel : compteur absent, recréé par un parcours
+            first = ThumbnailService.get_thumbnail(self.path, 200, 0)
+            self.assertEqual(evict.call_count, 1)
+            size = cache.get(ThumbnailService.SIZE_CACHE_KEY)
+            self.assertEqual(size, os.path.getsize(first))
+
+            # Sous la limite : le compteur suffit, pas de parcours
+            second = ThumbnailService.get_thumbnail(self.path, 100, 0)
+            self.assertEqual(evict.call_count, 1)
+            self.assertEqual(
+                cache.get(ThumbnailService.SIZE_CACHE_KEY),
+                size + os.path.getsize(second),
+            )
+
+            # Au-delà : la miniature la moins récemment servie est évincée
+            os.utime(first, (0, 0))
+            with self.settings(MEDIA_THUMBNAIL_CACHE_MAX_SIZE=size + 1):
+                third = ThumbnailService.get_thumbnail(self.path, 50, 0)
+            self.assertEqual(evict.call_count, 2)
+        self.assertFalse(os.path.exists(first))
+        self.assertTrue(os.path.exists(third))
+
+
+class MediaGatewayTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.photo = self.upload_photo()
+        self.url = self.photo.file.url
+        self.owner = self.client
+        self.anonymous = self.client_class()
+
+    def deactivate(self):
+        self.photo.is_active = False
+        self.photo.save()
+
+    def test_active_file_is_public(self):
+        response = self.anonymous.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("public", response["Cache-Control"])
+        self.assertIn("must-revalidate", response["Cache-Control"])
+
+    def test_inactive_file_owner_only(self):
+        self.deactivate()
+
+        self.assertEqual(self.anonymous.get(self.url).status_code, 404)
+        other = self.client_class()
+        other.force_login(make_artist("autre@example.com").user)
+        self.assertEqual(other.get(self.url).status_code, 404)
+
+        response = self.owner.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("private", response["Cache-Control"])
+
+    def test_inactive_derivatives(self):
+        variant = self.photo.derivatives.first()
+        self.assertEqual(self.anonymous.get(variant.file.url).status_code, 200)
+        self.deactivate()
+        self.assertEqual(self.anonymous.get(variant.file.url).status_code, 404)
+
+    def test_inactive_thumbnail(self):
+        url = ThumbnailService.get_url(self.photo.file.name, 64, 64)
+        self.assertEqual(self.anonymous.get(url).status_code, 200)
+        self.deactivate()
+        self.assertEqual(self.anonymous.get(url).status_code, 404)
+        self.assertEqual(self.owner.get(url).status_code, 200)
+
+    def test_accel_redirect(self):
+        with self.settings(MEDIA_ACCEL_REDIRECT=True):
+            response = self.anonymous.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response["X-Accel-Redirect"],
+            settings.MEDIA_ACCEL_PREFIX + self.photo.file.name,
+        )
+        self.assertEqual(response.content, b"")
+
+    def test_unknown_paths(self):
+        self.assertEqual(self.anonymous.get("/media/tmp/inconnu.jpg").status_code, 404)
+        self.assertEqual(self.anonymous.get("/media/../manage.py").status_code, 404)
+
+
+class SignedUrlTests(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        photo = self.upload_photo()
+        photo.is_active = False
+        photo.save()
+        self.name = photo.file.name
+        self.client.logout()
+
+    def test_signed_url_serves_inactive_file(self):
+        url = MediaAccessService.get_signed_url(self.name)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_tampered_signature(self):
+        url = MediaAccessService.get_signed_url(self.name)
+        self.assertEqual(self.client.get(url[:-3] + "xyz").status_code, 404)
+
+    def test_signature_bound_to_file(self):
+        url = MediaAccessService.get_signed_url("media/photos/autre.jpg")
+        query = url.partition("?")[2]
+        self.assertEqual(
+            self.client.get(f"/media/{self.name}?{query}").status_code, 404
+        )
+
+    def test_expired_url(self):
+        expires = int(time.time()) - 10
+        self.assertFalse(
+            MediaAccessService.is_signed(
+                self.name, expires, MediaAccessService.sign(self.name, expires)
+            )
+        )
+        url = MediaAccessService.get_signed_url(self.name, max_age=-10)
+        self.assertEqual(self.client.get(url).status_code, 404)
@@ -0,0 +1,48 @@
+"""
+Gestionnaires d'upload calculant l'empreinte SHA-256 des fichiers au fil de
+la réception (aucune relecture du fichier après coup)
+"""
+
+import hashlib
+
+from django.core.files.uploadhandler import (
+    MemoryFileUploadHandler,
+    TemporaryFileUploadHandler,
+)
+
+
+class HashingMemoryFileUploadHandler(MemoryFileUploadHandler):
+    """Upload en mémoire (petits fichiers) + empreinte SHA-256"""
+
+    def new_file(self, *args, **kwargs):
+        # Avant super() : MemoryFileUploadHandler lève StopFutureHandlers
+        self.hasher = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.activated:
+            self.hasher.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        uploaded_file = super().file_complete(file_size)
+        if uploaded_file is not None:
+            uploaded_file.content_hash = self.hasher.hexdigest()
+        return uploaded_file
+
+
+class HashingTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """Upload sur disque (gros fichiers) + empreinte SHA-256"""
+
+    def new_file(self, *args, **kwargs):
+        self.hasher = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.hasher.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        uploaded_file = super().file_complete(file_size)
+        uploaded_file.content_hash = self.hasher.hexdigest()
+        return uploaded_file
@@ -19,6 +19,17 @@ urlpatterns = [
     path(
         "upload/document/", views.DocumentUploadView.as_view(), name="upload_document"
     ),
+    # Upload par morceaux (reprise possible) pour l'audio et la vidéo
+    path(
+        "upload/chunked/",
+        views.ChunkedUploadCreateView.as_view(),
+        name="chunked_upload_create",
+    ),
+    path(
+        "upload/chunked/<uuid:pk>/",
+        views.ChunkedUploadView.as_view(),
+        name="chunked_upload",
+    ),
     # Édition de fichiers
     path("edit/audio/<int:pk>/", views.EditAudioView.as_view(), name="edit_audio"),
     path("edit/video/<int:pk>/", views.EditVideoView.as_view(), name="edit_video"),
@@ -45,4 +56,8 @@ urlpatterns = [
     ),
     # API pour les statistiques
     path("api/stats/", views.MediaStatsAPIView.as_view(), name="api_stats"),
+    # API d'avancement des traitements (lue depuis le cache uniquement)
+    path(
+        "api/progress/", views.ProcessingProgressView.as_view(), name="api_progress"
+    ),
 ]
@@ -2,10 +2,12 @@
 Vues pour la gestion des fichiers multimédia avec traitement FFmpeg
 """
 
-import os
-import tempfile
 import logging
+import os
+from urllib.parse import quote
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404, redirect
+from django.views import View
 from django.views.generic import (
     TemplateView,
     CreateView,
@@ -13,16 +15,31 @@ from django.views.generic import (
     DeleteView,
     ListView,
 )
-from django.http import HttpResponseRedirect, JsonResponse
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseRedirect,
+    JsonResponse,
+)
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
 from django.contrib import messages
-from django.core.files.base import ContentFile
-from django.core.exceptions import PermissionDenied
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.core.signing import BadSignature
 from django.db import transaction
 from django.urls import reverse_lazy, reverse
-
-from .models import AudioFile, VideoFile, PhotoFile, DocumentFile, MediaFileQuota
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control
+
+from .models import (
+    AudioFile,
+    VideoFile,
+    PhotoFile,
+    DocumentFile,
+    MediaFileQuota,
+    UploadSession,
+)
 from .forms import (
     AudioFileForm,
     VideoFileForm,
@@ -35,10 +52,15 @@ from .forms import (
     BulkActionForm,
 )
 from .services import (
-    AudioProcessingService,
-    VideoProcessingService,
-    ImageProcessingService,
+    ChunkedUploadService,
+    DirectUploadService,
+    MediaAccessService,
+    MediaBlobService,
+    MediaPipelineService,
+    ProcessingProgressService,
     QuotaService,
+    ThumbnailService,
+    UploadOffsetMismatch,
 )
 
 logger = logging.getLogger(__name__)
@@ -71,20 +93,36 @@ class MyFilesView(MediaFilesMixin, TemplateView):
         context = super().get_context_data(**kwargs)
         artist = self.get_artist()
 
-        # Récupérer tous les fichiers
-        audio_files = AudioFile.objects.filter(artist=artist).order_by(
-            "order", "-upload_date"
+        # Récupérer tous les fichiers (avec leur statut de traitement)
+        audio_files = (
+            AudioFile.objects.filter(artist=artist)
+            .prefetch_related("processing_jobs")
+            .order_by("order", "-upload_date")
         )
-        video_files = VideoFile.objects.filter(artist=artist).order_by(
-            "order", "-upload_date"
+        video_files = (
+            VideoFile.objects.filter(artist=artist)
+            .prefetch_related("processing_jobs")
+            .order_by("order", "-upload_date")
         )
-        photo_files = PhotoFile.objects.filter(artist=artist).order_by(
-            "order", "-upload_date"
+        photo_files = (
+            PhotoFile.objects.filter(artist=artist)
+            .prefetch_related("processing_jobs")
+            .order_by("order", "-upload_date")
         )
-        document_files = DocumentFile.objects.filter(artist=artist).order_by(
-            "order", "-upload_date"
+        document_files = (
+            DocumentFile.objects.filter(artist=artist)
+            .prefetch_related("processing_jobs", "derivatives")
+            .order_by("order", "-upload_date")
         )
 
+        # Fichiers en cours de traitement, suivis par l'API de progression
+        processing = [
+            media_file
+            for queryset in (audio_files, video_files, photo_files, document_files)
+            for media_file in queryset
+            if media_file.is_processing
+        ]
+
         # Statistiques des quotas
         quota_status = QuotaService.get_quota_status(artist)
 
@@ -97,6 +135,11 @@ class MyFilesView(MediaFilesMixin, TemplateView):
                 "quota_status": quota_status,
                 "page_title": "Mes fichiers multimédia",
                 "bulk_form": BulkActionForm(),
+                "progress_token": (
+                    ProcessingProgressService.get_token(processing)
+                    if processing
+                    else ""
+                ),
             }
         )
 
@@ -135,15 +178,20 @@ class MyFilesView(MediaFilesMixin, TemplateView):
 
     def _bulk_activate(self, file_ids):
         """Active les fichiers sélectionnés"""
-        artist = self.get_artist()
-        for model in [AudioFile, VideoFile, PhotoFile, DocumentFile]:
-            model.objects.filter(id__in=file_ids, artist=artist).update(is_active=True)
+        self._bulk_set_active(file_ids, True)
 
     def _bulk_deactivate(self, file_ids):
         """Désactive les fichiers sélectionnés"""
+        self._bulk_set_active(file_ids, False)
+
+    def _bulk_set_active(self, file_ids, is_active):
         artist = self.get_artist()
         for model in [AudioFile, VideoFile, PhotoFile, DocumentFile]:
-            model.objects.filter(id__in=file_ids, artist=artist).update(is_active=False)
+            files = model.objects.filter(id__in=file_ids, artist=artist)
+            # update() n'envoie pas de signal : oublier les accès en cache
+            for media_file in files.prefetch_related("derivatives"):
+                MediaAccessService.invalidate(media_file)
+            files.update(is_active=is_active)
 
     def _bulk_delete(self, file_ids):
         """Supprime les fichiers sélectionnés"""
@@ -152,12 +200,8 @@ class MyFilesView(MediaFilesMixin, TemplateView):
             for model in [AudioFile, VideoFile, PhotoFile, DocumentFile]:
                 files_to_delete = model.objects.filter(id__in=file_ids, artist=artist)
                 for file_obj in files_to_delete:
-                    # Supprimer le fichier physique
-                    if hasattr(file_obj, "file") and file_obj.file:
-                        try:
-                            file_obj.file.delete(save=False)
-                        except:
-                            pass
+                    # Les fichiers physiques non partagés sont supprimés par
+                    # le signal post_delete (voir MediaBlobService.release)
                     file_obj.delete()
 
             # Mettre à jour les quotas
@@ -165,13 +209,74 @@ class MyFilesView(MediaFilesMixin, TemplateView):
             quota.update_counts()
 
 
-class AudioUploadView(MediaFilesMixin, CreateView):
+class ChunkedUploadMixin:
+    """
+    Accepte, à la place du fichier, l'identifiant d'un upload par morceaux
+    terminé (champ `upload_session`) : le fichier assemblé passe par la
+    même validation que le fichier envoyé directement
+    """
+
+    upload_media_type = None
+
+    def get_upload_session(self):
+        session_id = self.request.POST.get("upload_session")
+        if not session_id:
+            return None
+        try:
+            upload_session = UploadSession.objects.get(
+                pk=session_id,
+                artist=self.get_artist(),
+                media_type=self.upload_media_type,
+            )
+        except (UploadSession.DoesNotExist, ValidationError):
+            raise Http404("Upload introuvable")
+        if upload_session.object_key:
+            try:
+                DirectUploadService.complete(upload_session)
+            except ValidationError:
+                raise Http404("Upload incomplet")
+        if not upload_session.is_complete:
+            raise Http404("Upload incomplet")
+        return upload_session
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        self.upload_session = None
+        if self.request.method == "POST":
+            self.upload_session = self.get_upload_session()
+        if self.upload_session is not None:
+            service = (
+                DirectUploadService
+                if self.upload_session.object_key
+                else ChunkedUploadService
+            )
+            files = kwargs["files"].copy()
+            files["file"] = service.get_uploaded_file(self.upload_session)
+            kwargs["files"] = files
+        return kwargs
+
+    def post(self, request, *args, **kwargs):
+        response = super().post(request, *args, **kwargs)
+        # Upload enregistré : le fichier de staging a été déplacé (ou était
+        # un doublon), la session n'a plus lieu d'être. Un original déposé
+        # dans le bucket y reste jusqu'à son rapatriement par le worker
+        upload_session = getattr(self, "upload_session", None)
+        if upload_session is not None and getattr(self.object, "pk", None):
+            if upload_session.object_key:
+                upload_session.delete()
+            else:
+                ChunkedUploadService.discard(upload_session)
+        return response
+
+
+class AudioUploadView(ChunkedUploadMixin, MediaFilesMixin, CreateView):
     """Vue d'upload de fichiers audio"""
 
     model = AudioFile
     form_class = AudioFileForm
     template_name = "media_files/upload_audio.html"
     success_url = reverse_lazy("media_files:my_files")
+    upload_media_type = "audio"
 
     def get_form_kwargs(self):
         """Passer l'artiste au formulaire"""
@@ -180,40 +285,17 @@ class AudioUploadView(MediaFilesMixin, CreateView):
         return kwargs
 
     def form_valid(self, form):
-        """Traitement du fichier audio avec FFmpeg"""
+        """Enregistre l'original et confie le traitement FFmpeg à Celery"""
         try:
             with transaction.atomic():
-                # Sauvegarder temporairement
                 audio_file = form.save(commit=False)
                 audio_file.artist = self.get_artist()
+                self.object = audio_file
 
-                # Traitement du fichier audio
-                if audio_file.file:
-                    # Obtenir la durée
-                    duration = AudioProcessingService.get_audio_duration(
-                        audio_file.file.path
-                    )
-                    audio_file.duration = duration
-
-                    # Ajouter watermark (métadonnées pour le MVP)
-                    watermarked_path = AudioProcessingService.add_watermark_to_audio(
-                        audio_file.file.path
-                    )
-
-                    if watermarked_path and os.path.exists(watermarked_path):
-                        # Remplacer le fichier original par la version watermarkée
-                        with open(watermarked_path, "rb") as f:
-                            watermarked_content = ContentFile(f.read())
-                            audio_file.file.save(
-                                os.path.basename(watermarked_path),
-                                watermarked_content,
-                                save=False,
-                            )
-
-                        # Nettoyer le fichier temporaire
-                        os.unlink(watermarked_path)
-
-                audio_file.save()
+                # Durée et watermark calculés par le worker, sauf si ce
+                # fichier a déjà été uploadé et traité
+                if not MediaBlobService.save_upload(audio_file):
+                    MediaPipelineService.enqueue(audio_file)
 
                 # Mettre à jour les quotas
                 quota, _ = MediaFileQuota.objects.get_or_create(
@@ -224,7 +306,7 @@ class AudioUploadView(MediaFilesMixin, CreateView):
                 messages.success(
                     self.request,
                     f"Fichier audio '{audio_file.title}' uploadé avec succès ! "
-                    f"Durée: {audio_file.get_duration_display()}",
+                    "Son traitement est en cours.",
                 )
 
         except Exception as e:
@@ -235,16 +317,17 @@ class AudioUploadView(MediaFilesMixin, CreateView):
             )
             return self.form_invalid(form)
 
-        return super().form_valid(form)
+        return HttpResponseRedirect(self.get_success_url())
 
 
-class VideoUploadView(MediaFilesMixin, CreateView):
+class VideoUploadView(ChunkedUploadMixin, MediaFilesMixin, CreateView):
     """Vue d'upload de fichiers vidéo"""
 
     model = VideoFile
     form_class = VideoFileForm
     template_name = "media_files/upload_video.html"
     success_url = reverse_lazy("media_files:my_files")
+    upload_media_type = "video"
 
     def get_form_kwargs(self):
         """Passer l'artiste au formulaire"""
@@ -253,75 +336,24 @@ class VideoUploadView(MediaFilesMixin, CreateView):
         return kwargs
 
     def form_valid(self, form):
-        """Traitement du fichier vidéo avec FFmpeg"""
+        """Enregistre l'original et confie le traitement FFmpeg à Celery"""
         try:
             with transaction.atomic():
                 video_file = form.save(commit=False)
                 video_file.artist = self.get_artist()
 
-                # Traitement du fichier vidéo si uploadé (pas pour les URLs)
-                if video_file.file and hasattr(video_file.file, "path"):
-                    # Vérifier que le fichier_size est défini pour les fichiers uploadés
-                    if hasattr(video_file.file, "size") and video_file.file.size:
-                        video_file.file_size = video_file.file.size
-
-                    # Obtenir la durée
-                    try:
-                        duration = VideoProcessingService.get_video_duration(
-                            video_file.file.path
-                        )
-                        video_file.duration = duration
-                    except Exception as e:
-                        logger.warning(
-                            f"Impossible d'obtenir la durée de la vidéo: {e}"
-                        )
-
-                    # Générer une miniature
-                    try:
-                        thumbnail_path = VideoProcessingService.generate_thumbnail(
-                            video_file.file.path
-                        )
-
-                        if thumbnail_path and os.path.exists(thumbnail_path):
-                            with open(thumbnail_path, "rb") as f:
-                                thumbnail_content = ContentFile(f.read())
-                                video_file.thumbnail.save(
-                                    f"thumb_{os.path.basename(thumbnail_path)}",
-                                    thumbnail_content,
-                                    save=False,
-                                )
-                            os.unlink(thumbnail_path)
-                    except Exception as e:
-                        logger.warning(f"Impossible de générer la miniature: {e}")
-
-                    # Ajouter watermark
-                    try:
-                        watermarked_path = (
-                            VideoProcessingService.add_watermark_to_video(
-                                video_file.file.path
-                            )
-                        )
-
-                        if watermarked_path and os.path.exists(watermarked_path):
-                            # Remplacer le fichier original
-                            with open(watermarked_path, "rb") as f:
-                                watermarked_content = ContentFile(f.read())
-                                video_file.file.save(
-                                    os.path.basename(watermarked_path),
-                                    watermarked_content,
-                                    save=False,
-                                )
-
-                            video_file.has_watermark = True
-                            os.unlink(watermarked_path)
-                    except Exception as e:
-                        logger.warning(f"Impossible d'ajouter le watermark: {e}")
-
-                elif video_file.video_url:
+                if video_file.video_url and not video_file.file:
                     # Pour les URLs (YouTube, etc.), définir file_size à 0
                     video_file.file_size = 0
 
-                video_file.save()
+                self.object = video_file
+
+                # Durée, miniature et watermark calculés par le worker
+                # (pas de traitement pour les URLs externes ni les doublons)
+                if not video_file.file:
+                    video_file.save()
+                elif not MediaBlobService.save_upload(video_file):
+                    MediaPipelineService.enqueue(video_file)
 
                 # Mettre à jour les quotas
                 quota, _ = MediaFileQuota.objects.get_or_create(
@@ -337,7 +369,8 @@ class VideoUploadView(MediaFilesMixin, CreateView):
                 else:
                     messages.success(
                         self.request,
-                        f"Fichier vidéo '{video_file.title}' uploadé avec succès !",
+                        f"Fichier vidéo '{video_file.title}' uploadé avec succès ! "
+                        "Son traitement est en cours.",
                     )
 
         except Exception as e:
@@ -348,7 +381,7 @@ class VideoUploadView(MediaFilesMixin, CreateView):
             )
             return self.form_invalid(form)
 
-        return super().form_valid(form)
+        return HttpResponseRedirect(self.get_success_url())
 
 
 class PhotoUploadView(MediaFilesMixin, CreateView):
@@ -366,37 +399,24 @@ class PhotoUploadView(MediaFilesMixin, CreateView):
         return kwargs
 
     def form_valid(self, form):
-        """Traitement de l'image avec optimisation"""
+        """Enregistre l'original et confie l'optimisation à Celery"""
         try:
             with transaction.atomic():
                 photo_file = form.save(commit=False)
                 photo_file.artist = self.get_artist()
-
-                # Optimiser l'image
-                if photo_file.file:
-                    optimized_path = ImageProcessingService.optimize_image(
-                        photo_file.file.path
-                    )
-
-                    if optimized_path and os.path.exists(optimized_path):
-                        # Remplacer par la version optimisée
-                        with open(optimized_path, "rb") as f:
-                            optimized_content = ContentFile(f.read())
-                            photo_file.file.save(
-                                os.path.basename(optimized_path),
-                                optimized_content,
-                                save=False,
-                            )
-                        os.unlink(optimized_path)
-
-                photo_file.save()
+                self.object = photo_file
+                reused = MediaBlobService.save_upload(photo_file)
 
                 # Mettre à jour la photo de profil si demandé
+                # (le worker la fera pointer sur la version optimisée)
                 if form.cleaned_data.get("is_profile_picture"):
                     artist = self.get_artist()
                     artist.profile_picture = photo_file.file
                     artist.save(update_fields=["profile_picture"])
 
+                if not reused:
+                    MediaPipelineService.enqueue(photo_file)
+
                 # Mettre à jour les quotas
                 quota, _ = MediaFileQuota.objects.get_or_create(
                     artist=self.get_artist()
@@ -415,7 +435,7 @@ class PhotoUploadView(MediaFilesMixin, CreateView):
             )
             return self.form_invalid(form)
 
-        return super().form_valid(form)
+        return HttpResponseRedirect(self.get_success_url())
 
 
 class DocumentUploadView(MediaFilesMixin, CreateView):
@@ -433,12 +453,14 @@ class DocumentUploadView(MediaFilesMixin, CreateView):
         return kwargs
 
     def form_valid(self, form):
-        """Sauvegarde du document"""
+        """Enregistre le document et confie l'aperçu et la linéarisation à Celery"""
         try:
             with transaction.atomic():
                 document_file = form.save(commit=False)
                 document_file.artist = self.get_artist()
-                document_file.save()
+                self.object = document_file
+                if not MediaBlobService.save_upload(document_file):
+                    MediaPipelineService.enqueue(document_file)
 
                 # Mettre à jour les quotas
                 quota, _ = MediaFileQuota.objects.get_or_create(
@@ -459,7 +481,7 @@ class DocumentUploadView(MediaFilesMixin, CreateView):
             )
             return self.form_invalid(form)
 
-        return super().form_valid(form)
+        return HttpResponseRedirect(self.get_success_url())
 
 
 # Vues d'édition
@@ -655,3 +677,184 @@ class MediaStatsAPIView(MediaFilesMixin, TemplateView):
             total_bytes += sum(f.file_size for f in files if f.file_size)
 
         return round(total_bytes / (1024 * 1024), 2)  # Convertir en MB
+
+
+class ProcessingProgressView(View):
+    """
+    API d'avancement des traitements, interrogée en boucle par le portfolio.
+
+    Les fichiers suivis sont listés dans un jeton signé émis par
+    MyFilesView : pas d'authentification ni de requête en base, seul le
+    cache est lu
+    """
+
+    def get(self, request, *args, **kwargs):
+        try:
+            keys = ProcessingProgressService.read_token(request.GET.get("token", ""))
+        except BadSignature:
+            return JsonResponse({"error": "Jeton invalide ou expiré."}, status=400)
+
+        response = JsonResponse({"files": ProcessingProgressService.get_many(keys)})
+        patch_cache_control(response, no_store=True)
+        return response
+
+
+class ChunkedUploadCreateView(MediaFilesMixin, View):
+    """
+    Ouvre un upload par morceaux (taille et quota vérifiés d'avance) ou,
+    si un bucket est configuré, un upload direct vers le bucket
+    """
+
+    def post(self, request, *args, **kwargs):
+        try:
+            size = int(request.POST.get("size", 0))
+        except ValueError:
+            size = 0
+        service = (
+            DirectUploadService
+            if settings.MEDIA_DIRECT_UPLOAD
+            else ChunkedUploadService
+        )
+        try:
+            upload_session = service.create(
+                self.get_artist(),
+                request.POST.get("media_type"),
+                request.POST.get("filename", ""),
+                size,
+            )
+        except ValidationError as e:
+            return JsonResponse({"error": e.messages[0]}, status=400)
+
+        payload = {
+            "id": str(upload_session.pk),
+            "offset": upload_session.offset,
+            "chunk_size": settings.UPLOAD_CHUNK_SIZE,
+            "url": reverse(
+                "media_files:chunked_upload", kwargs={"pk": upload_session.pk}
+            ),
+        }
+        if upload_session.object_key:
+            payload["direct"] = DirectUploadService.get_presigned_post(upload_session)
+        return JsonResponse(payload, status=201)
+
+
+class ChunkedUploadView(MediaFilesMixin, View):
+    """
+    État (GET), envoi d'un morceau (PATCH, en-tête Upload-Offset) et
+    abandon (DELETE) d'un upload par morceaux
+    """
+
+    def get_upload_session(self):
+        return get_object_or_404(
+            UploadSession, pk=self.kwargs["pk"], artist=self.get_artist()
+        )
+
+    def render_offset(self, upload_session, status=200):
+        response = JsonResponse(
+            {
+                "offset": upload_session.offset,
+                "size": upload_session.size,
+                "complete": upload_session.is_complete,
+            },
+            status=status,
+        )
+        response["Upload-Offset"] = upload_session.offset
+        response["Cache-Control"] = "no-store"
+        return response
+
+    def get(self, request, *args, **kwargs):
+        return self.render_offset(self.get_upload_session())
+
+    def patch(self, request, *args, **kwargs):
+        upload_session = self.get_upload_session()
+        if upload_session.object_key:
+            return JsonResponse(
+                {"error": "Ce fichier doit être envoyé directement au bucket."},
+                status=400,
+            )
+        try:
+            offset = int(request.headers.get("Upload-Offset", ""))
+        except ValueError:
+            return JsonResponse({"error": "En-tête Upload-Offset manquant."}, status=400)
+
+        try:
+            upload_session = ChunkedUploadService.append(
+                upload_session, offset, request
+            )
+        except UploadOffsetMismatch as e:
+            upload_session.offset = e.offset
+            return self.render_offset(upload_session, status=409)
+        except ValidationError as e:
+            return JsonResponse({"error": e.messages[0]}, status=413)
+
+        return self.render_offset(upload_session)
+
+    def delete(self, request, *args, **kwargs):
+        ChunkedUploadService.discard(self.get_upload_session())
+        return HttpResponse(status=204)
+
+
+class ThumbnailView(View):
+    """
+    Miniature redimensionnée à la demande (URL signée, cache disque). La
+    signature ne porte que sur les dimensions : l'accès à la source est
+    vérifié comme par la passerelle (fichier actif ou propriétaire)
+    """
+
+    def get(self, request, signature, width, height, path):
+        if not ThumbnailService.is_valid(signature, path, width, height):
+            raise Http404("Miniature introuvable")
+
+        access = MediaAccessService.get_access(path)
+        if access is None or not MediaAccessService.can_access(request, access):
+            raise Http404("Miniature introuvable")
+
+        try:
+            cache_path = ThumbnailService.get_thumbnail(path, width, height)
+        except Exception as e:
+            logger.error(f"Erreur lors de la génération de miniature ({path}) : {e}")
+            raise Http404("Miniature introuvable")
+        if cache_path is None:
+            raise Http404("Miniature introuvable")
+
+        response = FileResponse(open(cache_path, "rb"), content_type="image/jpeg")
+        patch_cache_control(response, **MediaAccessService.get_cache_control(access))
+        return response
+
+
+class MediaGatewayView(View):
+    """
+    Passerelle des fichiers médias : vérifie l'accès (fichier actif,
+    propriétaire ou lien signé) puis délègue le transfert à nginx via
+    X-Accel-Redirect (sendfile, requêtes Range). Sans nginx (développement),
+    le fichier est servi par Django
+    """
+
+    def get(self, request, path):
+        if ".." in path.split("/"):
+            raise Http404("Fichier introuvable")
+
+        access = MediaAccessService.get_access(path)
+        if access is None:
+            raise Http404("Fichier introuvable")
+
+        signed = MediaAccessService.is_signed(
+            path, request.GET.get("expires"), request.GET.get("signature")
+        )
+        if not (signed or MediaAccessService.can_access(request, access)):
+            # 404 plutôt que 403 : ne pas révéler l'existence du fichier
+            raise Http404("Fichier introuvable")
+
+        if settings.MEDIA_ACCEL_REDIRECT:
+            response = HttpResponse()
+            response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_PREFIX + quote(path)
+            # Type de contenu déterminé par nginx d'après l'extension
+            del response["Content-Type"]
+        else:
+            full_path = safe_join(settings.MEDIA_ROOT, path)
+            if not os.path.isfile(full_path):
+                raise Http404("Fichier introuvable")
+            response = FileResponse(open(full_path, "rb"))
+
+        patch_cache_control(response, **MediaAccessService.get_cache_control(access))
+        return response
@@ -30,6 +30,7 @@ DJANGO_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
 ]
 
 THIRD_PARTY_APPS = [
@@ -153,6 +154,11 @@ DEFAULT_FROM_EMAIL = config("DEFAULT_FROM_EMAIL", default="noreply@talentzik.com
 # Configuration des fichiers uploadés
 FILE_UPLOAD_MAX_MEMORY_SIZE = 26214400  # 25MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 26214400  # 25MB
+# Gestionnaires d'upload calculant l'empreinte SHA-256 pendant la réception
+FILE_UPLOAD_HANDLERS = [
+    "apps.media_files.upload_handlers.HashingMemoryFileUploadHandler",
+    "apps.media_files.upload_handlers.HashingTemporaryFileUploadHandler",
+]
 
 # Limitations des médias (en bytes)
 MAX_AUDIO_SIZE = 25 * 1024 * 1024  # 25MB
@@ -160,6 +166,129 @@ MAX_VIDEO_SIZE = 100 * 1024 * 1024  # 100MB
 MAX_PHOTO_SIZE = 15 * 1024 * 1024  # 15MB
 MAX_DOCUMENT_SIZE = 10 * 1024 * 1024  # 10MB
 
+# Dossier de travail de FFmpeg/PIL (défaut : MEDIA_ROOT/tmp). Doit être sur le
+# même volume que MEDIA_ROOT pour que l'enregistrement final soit un rename.
+MEDIA_PROCESSING_TMP_DIR = config("MEDIA_PROCESSING_TMP_DIR", default="")
+
+# Watermark des vidéos : image source versionnée (empreinte du contenu),
+# déclinée une fois par hauteur de sortie dans MEDIA_WATERMARK_DIR (volume
+# partagé avec les workers). Sans source, un logo texte par défaut est rendu.
+MEDIA_WATERMARK_SOURCE = config(
+    "MEDIA_WATERMARK_SOURCE", default=str(BASE_DIR / "static" / "images" / "watermark.png")
+)
+MEDIA_WATERMARK_DIR = config("MEDIA_WATERMARK_DIR", default="")  # défaut : MEDIA_ROOT/watermarks
+MEDIA_WATERMARK_HEIGHTS = [240, 360, 480, 720, 1080, 1440, 2160]  # hauteurs de sortie
+MEDIA_WATERMARK_HEIGHT_RATIO = 0.07  # hauteur du watermark / hauteur de la vidéo
+
+# Budget de chaque commande FFmpeg selon son profil : threads par sortie,
+# priorité CPU (nice) et durée maximale = base + facteur x durée du média
+MEDIA_FFMPEG_BUDGETS = {
+    "fast": {
+        "threads": 1,
+        "nice": 5,
+        "timeout_base": 60,
+        "timeout_factor": 1,
+        "timeout_max": 10 * 60,
+    },
+    "heavy": {
+        "threads": 2,
+        "nice": 10,
+        "timeout_base": 5 * 60,
+        "timeout_factor": 6,
+        "timeout_max": 80 * 60,
+    },
+}
+
+# Échelle de rendus HLS générés pour les vidéos uploadées (seuls les rendus
+# de hauteur inférieure ou égale à la source sont produits)
+VIDEO_HLS_RENDITIONS = [
+    {"name": "240p", "height": 240, "video_bitrate": "400k", "audio_bitrate": "64k"},
+    {"name": "480p", "height": 480, "video_bitrate": "1000k", "audio_bitrate": "96k"},
+    {"name": "720p", "height": 720, "video_bitrate": "2500k", "audio_bitrate": "128k"},
+]
+VIDEO_HLS_SEGMENT_DURATION = 4  # secondes
+
+# Planche de vignettes des vidéos (aperçu au survol) : images régulièrement
+# espacées, extraites pendant l'encodage, parmi lesquelles l'affiche est choisie
+VIDEO_SPRITE_FRAMES = 24
+VIDEO_SPRITE_COLUMNS = 6
+VIDEO_SPRITE_TILE_WIDTH = 160  # px
+
+# Largeurs (px) des variantes d'images générées (JPEG + WebP) pour srcset
+IMAGE_VARIANT_WIDTHS = [128, 384, 768, 1280]
+
+# Documents PDF : aperçu de la première page (poppler) et linéarisation (qpdf)
+DOCUMENT_PREVIEW_WIDTH = 1280  # px, décliné ensuite en IMAGE_VARIANT_WIDTHS
+DOCUMENT_TOOL_TIMEOUT = 120  # secondes par commande
+
+# Recherche plein texte des artistes (PostgreSQL) : configuration de
+# racinisation du document tsvector et des requêtes
+ARTIST_SEARCH_CONFIG = "french"
+
+# Compteurs de la recherche (facettes) : valeurs affichées par facette et
+# durée de cache par signature de filtres (aussi périmés à chaque modification)
+ARTIST_FACET_LIMIT = 10
+ARTIST_FACET_TIMEOUT = 10 * 60  # secondes
+
+# Autocomplétion (index de préfixes dans le cache Redis) : longueur maximale
+# des préfixes indexés et nombre de suggestions par type
+AUTOCOMPLETE_MAX_PREFIX = 20
+AUTOCOMPLETE_LIMITS = {"artist": 5, "genre": 2, "instrument": 2, "city": 2}
+
+# Nombre de pics des formes d'onde audio précalculées
+AUDIO_WAVEFORM_PEAKS = 1000
+
+# Extraits et rendu mobile des fichiers audio (AAC)
+AUDIO_PREVIEW_START = 30  # secondes (ramené plus tôt pour les pistes courtes)
+AUDIO_PREVIEW_DURATION = 30  # secondes
+AUDIO_MOBILE_BITRATE = "64k"
+
+# Normalisation de loudness (EBU R128) des rendus audio : gain linéaire vers
+# la cible, limité pour que le true peak reste sous le plafond
+AUDIO_LOUDNESS_TARGET = -14.0  # LUFS
+AUDIO_LOUDNESS_TRUE_PEAK = -1.0  # dBTP
+
+# Miniatures à la demande (/media/thumb/<signature>/<l>x<h>/<chemin>) : cache
+# disque hors de MEDIA_ROOT (volume dédié en production, ignoré par git),
+# éviction LRU au-delà de la taille maximale
+MEDIA_THUMBNAIL_CACHE_DIR = config(
+    "MEDIA_THUMBNAIL_CACHE_DIR", default=str(BASE_DIR / "cache" / "thumbnails")
+)
+MEDIA_THUMBNAIL_CACHE_MAX_SIZE = 512 * 1024 * 1024  # 512MB
+MEDIA_THUMBNAIL_MAX_DIMENSION = 2048
+# Dossiers (relatifs à MEDIA_ROOT) dont les images peuvent être redimensionnées
+MEDIA_THUMBNAIL_SOURCES = ["media/photos/", "media/video/thumbnails/", "profiles/"]
+
+# Passerelle média (/media/) : autorisation par Django, transfert des octets
+# par nginx (X-Accel-Redirect vers une location interne) en production
+MEDIA_ACCEL_REDIRECT = config("MEDIA_ACCEL_REDIRECT", default=False, cast=bool)
+MEDIA_ACCEL_PREFIX = "/protected-media/"
+MEDIA_ACCESS_CACHE_TIMEOUT = 60  # secondes
+# Cache HTTP des médias servis, revalidé ensuite (304 de nginx si inchangé)
+MEDIA_CACHE_MAX_AGE = 5 * 60  # secondes
+MEDIA_SIGNED_URL_MAX_AGE = 7 * 24 * 60 * 60  # 7 jours
+
+# Uploads en plusieurs morceaux (audio/vidéo) : taille maximale d'un morceau
+# et durée de vie des uploads inachevés
+UPLOAD_CHUNK_SIZE = 5 * 1024 * 1024  # 5MB
+UPLOAD_SESSION_TTL = 24 * 60 * 60  # 24 heures
+
+# Upload direct vers un bucket S3-compatible (AWS, MinIO...) : le navigateur
+# envoie l'original au bucket via un formulaire pré-signé, sans passer par
+# Gunicorn ; le worker Celery le rapatrie ensuite pour le traitement.
+# Désactivé tant qu'aucun bucket n'est configuré.
+AWS_STORAGE_BUCKET_NAME = config("AWS_STORAGE_BUCKET_NAME", default="")
+AWS_S3_ENDPOINT_URL = config("AWS_S3_ENDPOINT_URL", default="") or None
+AWS_S3_REGION_NAME = config("AWS_S3_REGION_NAME", default="") or None
+AWS_ACCESS_KEY_ID = config("AWS_ACCESS_KEY_ID", default="")
+AWS_SECRET_ACCESS_KEY = config("AWS_SECRET_ACCESS_KEY", default="")
+AWS_S3_ADDRESSING_STYLE = config("AWS_S3_ADDRESSING_STYLE", default="") or None
+AWS_DEFAULT_ACL = None
+MEDIA_DIRECT_UPLOAD = bool(AWS_STORAGE_BUCKET_NAME)
+# Préfixe des originaux en attente (prévoir une règle d'expiration sur le bucket)
+DIRECT_UPLOAD_PREFIX = "incoming/"
+DIRECT_UPLOAD_URL_EXPIRY = 60 * 60  # 1 heure
+
 # Limites par profil
 MAX_AUDIO_FILES = 5
 MAX_VIDEO_FILES = 3
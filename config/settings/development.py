@@ -44,3 +44,7 @@ LOGGING["loggers"]["apps"]["level"] = "DEBUG"
 
 # Désactiver la compression des fichiers statiques
 STATICFILES_STORAGE = "django.contrib.staticfiles.storage.StaticFilesStorage"
+
+# Pas de broker en développement : les traitements média s'exécutent en synchrone
+CELERY_TASK_ALWAYS_EAGER = True
+CELERY_TASK_EAGER_PROPAGATES = True
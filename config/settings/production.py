@@ -71,11 +71,42 @@ CELERY_TIMEZONE = TIME_ZONE
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minutes
 CELERY_TASK_SOFT_TIME_LIMIT = 25 * 60  # 25 minutes
+# Files dédiées aux médias, chacune consommée par ses propres workers (voir
+# docker-compose.yml) : une rafale de vidéos n'attend que sur media_heavy et
+# ne retarde ni les photos ni les emails (file par défaut "celery")
+CELERY_TASK_ROUTES = {
+    "apps.media_files.tasks.process_video_file": {"queue": "media_heavy"},
+    "apps.media_files.tasks.rewatermark_video_file": {"queue": "media_heavy"},
+    "apps.media_files.tasks.process_audio_file": {"queue": "media_fast"},
+    "apps.media_files.tasks.process_photo_file": {"queue": "media_fast"},
+    "apps.media_files.tasks.process_document_file": {"queue": "media_fast"},
+    "apps.media_files.tasks.generate_profile_picture_variants": {
+        "queue": "media_fast"
+    },
+}
+# Un worker ne réserve qu'une tâche à la fois : les suivantes restent dans
+# Redis, disponibles pour un worker libre
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+# Tâches périodiques, planifiées par le service celery_beat (un seul
+# processus beat par déploiement, voir docker-compose.yml)
+CELERY_BEAT_SCHEDULE = {
+    # Uploads par morceaux / directs abandonnés (voir UPLOAD_SESSION_TTL)
+    "cleanup-upload-sessions": {
+        "task": "apps.media_files.tasks.cleanup_upload_sessions",
+        "schedule": 60 * 60,  # toutes les heures
+    },
+}
 
 
 # Configuration des fichiers statiques pour production
 STATIC_ROOT = config("STATIC_ROOT", default="/app/staticfiles")
 MEDIA_ROOT = config("MEDIA_ROOT", default="/app/media")
+# Volume thumbnail_cache (voir docker-compose.yml)
+MEDIA_THUMBNAIL_CACHE_DIR = config(
+    "MEDIA_THUMBNAIL_CACHE_DIR", default="/app/cache/thumbnails"
+)
+# Fichiers médias servis par nginx après autorisation (voir proxy/nginx)
+MEDIA_ACCEL_REDIRECT = config("MEDIA_ACCEL_REDIRECT", default=True, cast=bool)
 
 
 # Configuration email production
@@ -21,6 +21,8 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.views.generic import TemplateView
 
+from apps.media_files.views import MediaGatewayView, ThumbnailView
+
 # Configuration de l'admin
 admin.site.site_header = "TalentZik Administration"
 admin.site.site_title = "TalentZik Admin"
@@ -37,10 +39,17 @@ urlpatterns = [
     path("reviews/", include("apps.reviews.urls")),
     path("files/", include("apps.media_files.urls")),
     path("about/", TemplateView.as_view(template_name="about.html"), name="about"),
+    # Miniatures à la demande, sous MEDIA_URL (voir proxy/nginx/default.conf)
+    path(
+        "media/thumb/<str:signature>/<int:width>x<int:height>/<path:path>",
+        ThumbnailView.as_view(),
+        name="media_thumbnail",
+    ),
+    # Fichiers médias : accès vérifié par Django, transfert par nginx
+    path("media/<path:path>", MediaGatewayView.as_view(), name="media_gateway"),
 ]
 
-# Servir les fichiers médias et statiques uniquement en mode debug/dev.
+# Servir les fichiers statiques uniquement en mode debug/dev.
 # En production, Nginx prend le relais dans Dokploy.
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
@@ -0,0 +1,200 @@
+/*
+ * Upload en plusieurs morceaux avec reprise (audio/vidéo).
+ *
+ * Le fichier est envoyé par morceaux (PATCH + en-tête Upload-Offset) vers
+ * une session d'upload ; en cas de coupure, l'offset reçu est redemandé au
+ * serveur et seuls les octets manquants sont renvoyés. Une fois le fichier
+ * complet, le formulaire est soumis avec l'identifiant de la session à la
+ * place du fichier.
+ *
+ * Si le serveur propose un upload direct (bucket S3), le fichier est envoyé
+ * en une fois au bucket via le formulaire pré-signé renvoyé.
+ */
+(function () {
+    'use strict';
+
+    const MAX_RETRIES = 5;
+
+    function getCookie(name) {
+        const match = document.cookie.match(new RegExp('(?:^|; )' + name + '=([^;]*)'));
+        return match ? decodeURIComponent(match[1]) : null;
+    }
+
+    function sleep(ms) {
+        return new Promise(resolve => setTimeout(resolve, ms));
+    }
+
+    function storageKey(mediaType, file) {
+        return ['chunked-upload', mediaType, file.name, file.size, file.lastModified].join(':');
+    }
+
+    class ChunkedUpload {
+        constructor(options) {
+            this.createUrl = options.createUrl;
+            this.mediaType = options.mediaType;
+            this.onProgress = options.onProgress || function () {};
+            this.csrfToken = getCookie('csrftoken');
+        }
+
+        async request(url, options) {
+            options.headers = Object.assign({'X-CSRFToken': this.csrfToken}, options.headers || {});
+            options.credentials = 'same-origin';
+            return fetch(url, options);
+        }
+
+        // Reprend la session d'un envoi précédent du même fichier, si possible
+        async resume(file) {
+            const saved = JSON.parse(localStorage.getItem(storageKey(this.mediaType, file)) || 'null');
+            if (!saved) {
+                return null;
+            }
+            const response = await this.request(saved.url, {method: 'GET'});
+            if (!response.ok) {
+                localStorage.removeItem(storageKey(this.mediaType, file));
+                return null;
+            }
+            return Object.assign(saved, await response.json());
+        }
+
+        async create(file) {
+            const data = new FormData();
+            data.append('media_type', this.mediaType);
+            data.append('filename', file.name);
+            data.append('size', file.size);
+            const response = await this.request(this.createUrl, {method: 'POST', body: data});
+            const payload = await response.json();
+            if (!response.ok) {
+                throw new Error(payload.error || "Impossible de démarrer l'upload.");
+            }
+            if (!payload.direct) {
+                localStorage.setItem(storageKey(this.mediaType, file), JSON.stringify(payload));
+            }
+            return payload;
+        }
+
+        // Upload direct vers le bucket (formulaire pré-signé) : XHR pour suivre la progression
+        sendDirect(session, file) {
+            return new Promise((resolve, reject) => {
+                const data = new FormData();
+                Object.entries(session.direct.fields).forEach(([key, value]) => data.append(key, value));
+                data.append('file', file);
+
+                const xhr = new XMLHttpRequest();
+                xhr.open('POST', session.direct.url);
+                xhr.upload.addEventListener('progress', e => this.onProgress(e.loaded, file.size));
+                xhr.addEventListener('load', () => {
+                    if (xhr.status >= 200 && xhr.status < 300) {
+                        resolve();
+                    } else {
+                        reject(new Error("Erreur lors de l'envoi du fichier."));
+                    }
+                });
+                xhr.addEventListener('error', () => reject(new Error("Erreur réseau lors de l'envoi du fichier.")));
+                xhr.send(data);
+            });
+        }
+
+        async sendChunk(session, file) {
+            const chunk = file.slice(session.offset, session.offset + session.chunk_size);
+            const response = await this.request(session.url, {
+                method: 'PATCH',
+                headers: {
+                    'Upload-Offset': String(session.offset),
+                    'Content-Type': 'application/offset+octet-stream',
+                },
+                body: chunk,
+            });
+            const payload = await response.json();
+            if (response.ok || response.status === 409) {
+                // 409 : le serveur indique l'offset réellement reçu
+                session.offset = payload.offset;
+                return;
+            }
+            const error = new Error(payload.error || "Erreur lors de l'envoi du fichier.");
+            error.fatal = response.status < 500;
+            throw error;
+        }
+
+        async upload(file) {
+            const session = (await this.resume(file)) || (await this.create(file));
+            if (session.direct) {
+                await this.sendDirect(session, file);
+                this.onProgress(file.size, file.size);
+                return session;
+            }
+            let retries = 0;
+
+            while (session.offset < file.size) {
+                this.onProgress(session.offset, file.size);
+                try {
+                    await this.sendChunk(session, file);
+                    retries = 0;
+                } catch (error) {
+                    if (error.fatal || ++retries > MAX_RETRIES) {
+                        throw error;
+                    }
+                    // Réseau instable : attendre puis redemander l'offset reçu
+                    await sleep(1000 * Math.pow(2, retries));
+                    const response = await this.request(session.url, {method: 'GET'}).catch(() => null);
+                    if (response && response.ok) {
+                        session.offset = (await response.json()).offset;
+                    }
+                }
+            }
+
+            this.onProgress(file.size, file.size);
+            localStorage.removeItem(storageKey(this.mediaType, file));
+            return session;
+        }
+    }
+
+    /*
+     * Branche l'upload par morceaux sur un formulaire d'upload existant :
+     * le fichier est envoyé avant la soumission, puis remplacé par le champ
+     * caché `upload_session`.
+     */
+    ChunkedUpload.attach = function (form, fileInput, options) {
+        const progress = document.getElementById(options.progressId);
+        const progressBar = progress && progress.querySelector('[data-progress-bar]');
+        const progressText = progress && progress.querySelector('[data-progress-text]');
+
+        const uploader = new ChunkedUpload(Object.assign({}, options, {
+            onProgress: function (sent, total) {
+                if (!progress) {
+                    return;
+                }
+                const percent = Math.floor((sent / total) * 100);
+                progress.classList.remove('hidden');
+                progressBar.style.width = percent + '%';
+                progressText.textContent = percent + ' %';
+            },
+        }));
+
+        form.addEventListener('submit', async function (e) {
+            if (form.dataset.chunkedDone || !fileInput.files.length || !window.fetch) {
+                return;
+            }
+            e.preventDefault();
+
+            try {
+                const session = await uploader.upload(fileInput.files[0]);
+                const hidden = document.createElement('input');
+                hidden.type = 'hidden';
+                hidden.name = 'upload_session';
+                hidden.value = session.id;
+                form.appendChild(hidden);
+                fileInput.value = '';
+                form.dataset.chunkedDone = '1';
+                form.submit();
+            } catch (error) {
+                if (options.onError) {
+                    options.onError(error);
+                } else {
+                    alert(error.message);
+                }
+            }
+        });
+    };
+
+    window.ChunkedUpload = ChunkedUpload;
+})();